@@ -1,10 +1,23 @@
+import argparse
+import contextlib
 import csv
-import re
+from Arbol_Sintactico import ArenaArbol
+from Flujo_Tokens import FlujoTokens, abrir_tokens
+from Tabla_Sintactica import load_compiled_table
 
 EPSILON = "''"
+EPSILON_LABEL = "ε"  # Etiqueta de la hoja que se cuelga de las producciones vacias
+
+# Niveles de rastreo de parse_input
+TRACE_OFF = 'off'      # Sin rastreo
+TRACE_RULES = 'rules'  # Solo la posicion del token y la regla aplicada
+TRACE_FULL = 'full'    # Pila, posicion, entrada restante y regla en cada paso
+TRACE_LEVELS = (TRACE_OFF, TRACE_RULES, TRACE_FULL)
+TRACE_WINDOW = 10      # Simbolos de la pila y de la entrada mostrados por fila
+MAX_ERRORS = 50        # Errores reportados por archivo antes de abandonar el analisis
 
 class LLParser:
-    def __init__(self, grammar_file, tokens_file):
+    def __init__(self, grammar_file, tokens_file, compiled_table_file='ll1_table.bin'):
         self.alphabet = []
         self.nonterminals = []
         self.terminals = []
@@ -12,97 +25,278 @@ class LLParser:
         self.tokens = []
         self.rule_table = {}
 
-        self._load_grammar(grammar_file)
+        self._load_rule_table(grammar_file, compiled_table_file)
         self._load_tokens(tokens_file)
-        self._collect_alphabet_and_symbols()
-        self._load_rule_table()
-
-    def _load_grammar(self, grammar_file):
-        with open(grammar_file, 'r') as f:
-            self.rules = [line.strip() for line in f if '->' in line]
 
     def _load_tokens(self, tokens_file):
-        with open(tokens_file, 'r') as f:
-            tokens = f.read().strip().split()
-            # Guardar el tipo y valor de cada token en una tupla
-            self.tokens = [(token.split(':')[0], token.split(':')[1]) for token in tokens]
-
-    def _collect_alphabet_and_symbols(self):
-        for rule in self.rules:
-            lhs, rhs = rule.split('->')
-            nonterminal = lhs.strip()
-            development = rhs.strip().split()
-
-            if nonterminal not in self.nonterminals:
-                self.nonterminals.append(nonterminal)
-
-            for symbol in development:
-                if symbol != EPSILON:
-                    if symbol not in self.alphabet:
-                        self.alphabet.append(symbol)
-
-        self.terminals = [symbol for symbol in self.alphabet if symbol not in self.nonterminals]
-
-    def _load_rule_table(self):
-        # Load the rule table from an external CSV file
-        with open('ll1_table.csv', mode='r') as file:
-            csv_reader = csv.DictReader(file)
-            for row in csv_reader:
-                nonterminal = row['Nonterminal']
-                self.rule_table[nonterminal] = {}
-                for terminal, rule in row.items():
-                    if terminal != 'Nonterminal' and rule:
-                        self.rule_table[nonterminal][terminal] = rule
-
-    def parse_input(self):
-        stack = ['$', self.nonterminals[0]]
+        # Flujo de tokens mapeado en memoria; cada acceso devuelve (tipo, valor)
+        self.tokens = tokens_file if isinstance(tokens_file, FlujoTokens) else abrir_tokens(tokens_file)
+
+    def set_tokens(self, tokens_file):
+        # Analizar otro flujo reutilizando la tabla ya cargada
+        self._load_tokens(tokens_file)
+        self._token_texts = {}
+
+    def _load_rule_table(self, grammar_file, compiled_table_file):
+        # Cargar la tabla LL(1) compilada en una sola lectura; se reconstruye
+        # automaticamente si no existe o si la gramatica cambio
+        compiled = load_compiled_table(grammar_file, compiled_table_file)
+        symbols = compiled.symbols
+        self.compiled = compiled
+        self.nonterminals = compiled.nonterminals
+        self.terminals = compiled.terminals
+        self.alphabet = self.nonterminals + self.terminals
+        self.rules = [compiled.production_text(index) for index in range(len(compiled.productions))]
+        self._token_texts = {}
+
+        # Producciones ya separadas: (no terminal, simbolos del desarrollo)
+        productions = [(symbols[head], tuple(symbols[symbol] for symbol in body))
+                       for head, body in compiled.productions]
+        for nt, nonterminal in enumerate(self.nonterminals):
+            row = self.rule_table[nonterminal] = {}
+            base = nt * compiled.n_columns
+            for column in range(compiled.n_columns):
+                index = compiled.table[base + column]
+                if index >= 0:
+                    row[symbols[compiled.n_nonterminals + column]] = productions[index]
+
+        # Motor entero: los simbolos de la pila son ids (no terminal si id < n_nonterminals,
+        # terminal en la columna id - n_nonterminals). La tabla plana tiene una columna
+        # extra, siempre vacia, para los tipos de token que la gramatica no conoce.
+        self._n_nonterminals = compiled.n_nonterminals
+        self._width = compiled.n_columns + 1
+        self._unknown_column = compiled.n_columns
+        self._end_symbol = len(symbols) - 1
+        self._epsilon_label = len(symbols)
+        self._column_of = {symbol: id_symbol - compiled.n_nonterminals
+                           for id_symbol, symbol in enumerate(symbols) if id_symbol >= compiled.n_nonterminals}
+        self._table = []
+        for nt in range(compiled.n_nonterminals):
+            base = nt * compiled.n_columns
+            self._table.extend(compiled.table[base:base + compiled.n_columns])
+            self._table.append(-1)
+        # Desarrollos invertidos, listos para apilar
+        self._pushes = [tuple(reversed(body)) for _, body in compiled.productions]
+        # Ids de los simbolos de cada desarrollo, que son tambien las etiquetas del arbol
+        self._bodies = [body for _, body in compiled.productions]
+        # FOLLOW de cada no terminal como bitset de columnas, para la recuperacion de errores
+        self._follows = compiled.follows
+        self.errors = []
+        self.tree = None
+
+    def _token_columns(self):
+        # Traducir los ids de tipo del flujo a columnas de la tabla; al final van
+        # '$' y un centinela para que avanzar despues de '$' nunca se salga
+        translation = [self._column_of.get(token_type, self._unknown_column) for token_type in self.tokens.tipos]
+        columns = [translation[token_type] for token_type in self.tokens.ids_tipo]
+        columns.append(self._column_of['$'])
+        columns.append(self._unknown_column)
+        return columns
+
+    def _symbol_name(self, symbol):
+        return self.compiled.symbols[symbol]
+
+    def _token_type(self, index):
+        return self.tokens.tipo(index) if index < len(self.tokens) else '$'
+
+    def parse_input(self, trace_level=TRACE_FULL, trace_file="rastreo.csv", window=TRACE_WINDOW,
+                    max_errors=MAX_ERRORS, build_tree=False, exporter=None):
+        """Analiza el flujo de tokens con la tabla LL(1) y devuelve True si se acepta.
+
+        Los errores no detienen el analisis: con recuperacion en modo panico se
+        descartan tokens hasta uno que tenga regla para el no terminal del tope
+        o que este en su FOLLOW, y un terminal esperado que no aparece se da
+        por insertado. Todos los errores quedan en `self.errors` como tuplas
+        (posicion del token, linea, mensaje); al llegar a `max_errors` el
+        analisis se detiene.
+
+        Con `build_tree` se construye a la vez el arbol sintactico en una
+        `ArenaArbol` (con hojas ε en las producciones vacias); si la entrada se
+        acepta, `self.tree` es la vista `Nodo` de su raiz. Si se pasa un
+        `exporter` (ver Exportar_Arbol) el arbol se construye siempre y cada
+        nodo se le envia en preorden en cuanto se expande o se empareja con su
+        token; quien llama es responsable de su `terminar()`.
+
+        El rastreo se escribe en `trace_file` conforme se produce, segun
+        `trace_level`: TRACE_OFF no escribe nada, TRACE_RULES escribe la posicion
+        del token y la regla aplicada, y TRACE_FULL agrega la pila y la entrada
+        restante, ambas recortadas a `window` simbolos para que cada fila cueste
+        lo mismo sin importar el tamaño del programa.
+        """
+        if trace_level not in TRACE_LEVELS:
+            raise ValueError(f"Nivel de rastreo desconocido: {trace_level}")
+        n_nonterminals = self._n_nonterminals
+        table = self._table
+        width = self._width
+        pushes = self._pushes
+        follows = self._follows
+        end_column = self._column_of['$']
+        columns = self._token_columns()
+        self.errors = []
+        self.tree = None
+        build_tree = build_tree or exporter is not None
+
+        stack = [self._end_symbol, 0]
+        # Pila de indices de nodo paralela a la de simbolos (-1 para '$'); las
+        # etiquetas de la arena son los ids de simbolo, con ε al final
+        if build_tree:
+            arena = ArenaArbol(self.compiled.symbols + [EPSILON_LABEL])
+            nodes = [-1, arena.agregar(0)]
+            # Profundidad de cada nodo de la pila, solo para exportar
+            depths = [0, 0]
+        depth = 0
         index = 0
-        input_tokens = self.tokens + [('$', '$')]
-
-        rows = []
-        while len(stack) > 0:
-            top = stack.pop()
-            current_token_type, current_token_value = input_tokens[index]
-            rule = self.rule_table.get(top, {}).get(current_token_type) if top in self.nonterminals else ""
-
-            if top == current_token_type:
-                # Consumir el token y avanzar
-                index += 1
-            elif top in self.terminals or top == '$':
-                if top == current_token_type:
+        column = columns[0]
+        accepted = False
+
+        with contextlib.ExitStack() as resources:
+            writer = None
+            if trace_level != TRACE_OFF:
+                csvfile = resources.enter_context(open(trace_file, 'w', newline=''))
+                writer = csv.writer(csvfile)
+                writer.writerow(["Position", "Rule"] if trace_level == TRACE_RULES
+                                else ["Stack", "Position", "Input", "Rule"])
+            full = trace_level == TRACE_FULL
+            window_index = -1
+            window_text = ""
+
+            while stack:
+                top = stack.pop()
+                node = nodes.pop() if build_tree else -1
+                if exporter is not None:
+                    depth = depths.pop()
+                production = -1
+                if top < n_nonterminals:
+                    production = table[top * width + column]
+                    if production < 0:
+                        if not self._report_error(index, f"no rule for nonterminal '{self._symbol_name(top)}' "
+                                                         f"with token '{self._token_type(index)}'", writer, max_errors):
+                            break
+                        # Modo panico: descartar tokens hasta uno con regla para el no terminal
+                        # o que este en su FOLLOW (o hasta el fin de la entrada)
+                        base = top * width
+                        follow = follows[top]
+                        while column != end_column and table[base + column] < 0 and not (follow >> column) & 1:
+                            index += 1
+                            column = columns[index]
+                        production = table[base + column]
+                    if production >= 0:
+                        stack.extend(pushes[production])
+                        if build_tree:
+                            nodes.extend(self._expand_node(arena, node, production))
+                            if exporter is not None:
+                                self._export_expansion(exporter, arena, node, production, depth, depths)
+                        if writer and not full:
+                            writer.writerow([index, self.rules[production]])
+                elif top - n_nonterminals == column:
+                    # Consumir el token y avanzar
+                    accepted = top == self._end_symbol
+                    if node >= 0:
+                        arena.asignar_valor(node, self.tokens.valor(index))
+                        if exporter is not None:
+                            exporter.nodo(f'N{node}', arena.etiqueta(node), arena.valor(node), depth)
                     index += 1
-                else:
-                    rows.append(["Error: terminal mismatch."])
-                    break
-            elif top in self.nonterminals:
-                if rule is None:
-                    rows.append([f"Error: no rule for nonterminal '{top}' with token '{current_token_type}'"])
+                    column = columns[index]
+                    if accepted and writer and not full:
+                        writer.writerow([index - 1, "Accept"])
+                elif top == self._end_symbol:
+                    self._report_error(index, f"unexpected token '{self._token_type(index)}' after the end of the program",
+                                       writer, max_errors)
                     break
-                _, rhs = rule.split('->')
-                symbols = rhs.strip().split()
-                if symbols != [EPSILON]:
-                    stack.extend(reversed(symbols))
-            else:
-                rows.append(["Error: unknown symbol on stack."])
-                break
-
-            # Guardar el proceso en el rastreo, incluyendo el valor del token solo en la entrada
-            rows.append([
-                " ".join(stack),
-                " ".join([f"{tok[0]}:{tok[1]}" for tok in input_tokens[index:]]),
-                f"{top} -> {rhs.strip()}" if rule else "Accept" if top == '$' and current_token_type == '$' else ""
-            ])
-
-        self._export_parsing_process_to_csv("rastreo.csv", rows)
-
-    def _export_parsing_process_to_csv(self, csv_filename, rows):
-        with open(csv_filename, 'w', newline='') as csvfile:
-            csv_writer = csv.writer(csvfile)
-            header = ["Stack", "Input", "Rule"]
-            csv_writer.writerow(header)
-            for row in rows:
-                csv_writer.writerow(row)
+                else:
+                    # El terminal esperado se da por insertado y se sigue con la pila
+                    if not self._report_error(index, f"terminal mismatch: expected '{self._symbol_name(top)}' "
+                                                     f"but found '{self._token_type(index)}'", writer, max_errors):
+                        break
+
+                if full:
+                    # La ventana de entrada solo cambia cuando el cursor avanza
+                    if index != window_index:
+                        window_index = index
+                        window_text = self._input_window(index, window)
+                    # Guardar el proceso en el rastreo, incluyendo el valor del token solo en la entrada
+                    writer.writerow([
+                        self._stack_window(stack, window),
+                        index,
+                        window_text,
+                        self.rules[production] if production >= 0 else "Accept" if accepted else ""
+                    ])
+
+        if build_tree and accepted and not self.errors:
+            self.tree = arena.raiz()
+        return accepted and not self.errors
+
+    def _expand_node(self, arena, node, production):
+        # Crear los hijos de `node` para el desarrollo elegido y devolver sus indices
+        # en el orden en que se apilan (invertidos); el desarrollo vacio recibe una hoja ε
+        body = self._bodies[production]
+        if not body:
+            arena.agregar(self._epsilon_label, node)
+            return ()
+        first = arena.agregar_hijos(node, body)
+        return range(first + len(body) - 1, first - 1, -1)
+
+    def _export_expansion(self, exporter, arena, node, production, depth, depths):
+        # Enviar el no terminal recien expandido (y su hoja ε, si el desarrollo es
+        # vacio) y apilar la profundidad de los hijos que se acaban de apilar
+        exporter.nodo(f'N{node}', arena.etiqueta(node), None, depth)
+        body = self._bodies[production]
+        if body:
+            depths.extend([depth + 1] * len(body))
+        else:
+            exporter.nodo(f'N{len(arena) - 1}', EPSILON_LABEL, None, depth + 1)
+
+    def _report_error(self, index, message, writer, max_errors):
+        # Registrar un error; devuelve False si ya se alcanzo el maximo permitido.
+        # Los errores en cascada sobre el mismo token (mientras la recuperacion
+        # no ha consumido nada) no se vuelven a reportar.
+        if self.errors and self.errors[-1][0] == index:
+            return True
+        line = self.tokens.linea(index) if index < len(self.tokens) else (
+            self.tokens.linea(len(self.tokens) - 1) if len(self.tokens) else 0)
+        self.errors.append((index, line, message))
+        if writer:
+            writer.writerow([f"Error at token {index} (line {line}): {message}"])
+        if len(self.errors) >= max_errors:
+            self.errors.append((index, line, f"too many errors ({max_errors}); parsing stopped"))
+            return False
+        return True
+
+    def _token_text(self, index):
+        # Texto "TIPO:valor" de un token, formateado una sola vez por par (tipo, valor)
+        key = (self.tokens.ids_tipo[index], self.tokens.ids_valor[index])
+        text = self._token_texts.get(key)
+        if text is None:
+            token_type, token_value = self.tokens[index]
+            text = self._token_texts[key] = f"{token_type}:{token_value}"
+        return text
+
+    def _stack_window(self, stack, window):
+        # Solo los `window` simbolos del tope; el resto se resume con "..."
+        shown = " ".join(map(self._symbol_name, stack[-window:]))
+        return f"... {shown}" if len(stack) > window else shown
+
+    def _input_window(self, index, window):
+        # Los siguientes `window` tokens desde el cursor; el resto se resume con "..."
+        n_tokens = len(self.tokens)
+        end = min(index + window, n_tokens)
+        shown = [self._token_text(position) for position in range(index, end)]
+        if index <= n_tokens:
+            # Falta '$' (y quiza mas tokens): mostrarlo solo si cabe en la ventana
+            shown.append("..." if end - index == window else "$:$")
+        return " ".join(shown)
 
 if __name__ == "__main__":
-    parser = LLParser("Gramatica.txt", "tokens.txt")
-    parser.parse_input()
\ No newline at end of file
+    arguments = argparse.ArgumentParser(description="Analizador sintactico LL(1)")
+    arguments.add_argument("--rastreo", choices=TRACE_LEVELS, default=TRACE_FULL,
+                           help="nivel de detalle de rastreo.csv")
+    arguments.add_argument("--ventana", type=int, default=TRACE_WINDOW,
+                           help="simbolos de la pila y de la entrada mostrados en el rastreo completo")
+    arguments.add_argument("--max-errores", type=int, default=MAX_ERRORS,
+                           help="errores reportados antes de detener el analisis")
+    options = arguments.parse_args()
+
+    parser = LLParser("Gramatica.txt", "tokens.bin")
+    parser.parse_input(options.rastreo, window=options.ventana, max_errors=options.max_errores)
+    for position, line, message in parser.errors:
+        print(f"Error sintactico en el token {position} (linea {line}): {message}")
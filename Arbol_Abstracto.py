@@ -0,0 +1,253 @@
+import json
+
+# Árbol de sintaxis abstracta (AST).
+# El árbol concreto conserva las cadenas INSTRUCCIONES, los nodos auxiliares
+# EXPRESION'/MASEXPRESION y las hojas ε; construir_ast lo reduce a nodos con
+# tipo y listas planas de instrucciones, que es lo que recorren las etapas
+# siguientes. Los nombres de las clases siguen los del módulo `ast` de Python.
+
+EPSILON = "ε"
+
+# Precedencia de los operadores binarios (mayor número, más fuerte); todos
+# asocian por la izquierda. 'not' une dos condiciones como "y no".
+PRECEDENCIA = {
+    'or': 1,
+    'and': 2, 'not': 2,
+    '==': 3, '!=': 3, '<': 3, '<=': 3, '>': 3, '>=': 3,
+    '+': 4, '-': 4,
+    '*': 5, '/': 5,
+}
+OPERADORES_LOGICOS = ('or', 'and', 'not')
+OPERADORES_COMPARACION = ('==', '!=', '<', '<=', '>', '>=')
+
+
+class ErrorSemantico(ValueError):
+    """Construcción que la gramática acepta pero el lenguaje no define (p. ej. `x = 1, 2@`)."""
+
+
+class NodoAST:
+    """Base de los nodos del AST: los campos se dan en el orden de `_fields`."""
+    _fields = ()
+    __slots__ = ()
+
+    def __init__(self, *valores):
+        for campo, valor in zip(self._fields, valores):
+            setattr(self, campo, valor)
+
+    def __eq__(self, otro):
+        return type(otro) is type(self) and all(getattr(self, campo) == getattr(otro, campo)
+                                                for campo in self._fields)
+
+    def __repr__(self):
+        campos = ", ".join(f"{campo}={getattr(self, campo)!r}" for campo in self._fields)
+        return f"{type(self).__name__}({campos})"
+
+
+class Program(NodoAST):
+    _fields = __slots__ = ('body',)
+
+class Assign(NodoAST):
+    _fields = __slots__ = ('name', 'value')
+
+class Call(NodoAST):
+    _fields = __slots__ = ('func', 'args')        # func es el nombre; print también es una llamada
+
+class If(NodoAST):
+    _fields = __slots__ = ('test', 'body', 'orelse')  # elif se guarda como un If dentro de orelse
+
+class While(NodoAST):
+    _fields = __slots__ = ('test', 'body')
+
+class FunctionDef(NodoAST):
+    _fields = __slots__ = ('name', 'params', 'body')
+
+class Return(NodoAST):
+    _fields = __slots__ = ('value',)
+
+class Break(NodoAST):
+    _fields = __slots__ = ()
+
+class BinOp(NodoAST):
+    _fields = __slots__ = ('left', 'op', 'right')
+
+class Compare(NodoAST):
+    _fields = __slots__ = ('left', 'op', 'right')
+
+class BoolOp(NodoAST):
+    _fields = __slots__ = ('left', 'op', 'right')
+
+class Literal(NodoAST):
+    _fields = __slots__ = ('value',)              # int, float, bool o str
+
+class Name(NodoAST):
+    _fields = __slots__ = ('id',)
+
+
+def _hijos(nodo):
+    return [hijo for hijo in nodo.hijos if hijo.etiqueta != EPSILON]
+
+
+def construir_ast(raiz):
+    """Reduce el árbol concreto (Nodo o vista de arena) a un Program.
+
+    Las cadenas recursivas por la derecha (instrucciones, operandos) se
+    recorren con ciclos; solo el anidamiento real del código fuente (bloques
+    y argumentos de llamadas) se resuelve con recursión.
+
+    La gramática acepta listas separadas por comas en cualquier EXPRESION,
+    pero solo print, las llamadas y los parámetros las usan; en una
+    asignación, un return o una condición se reporta ErrorSemantico (un
+    ValueError) con la instrucción donde apareció.
+    """
+    return Program(_instrucciones(_hijos(raiz)[0]))
+
+
+def _instrucciones(nodo):
+    # INSTRUCCIONES -> INSTRUCCION INSTRUCCIONES | ''
+    cuerpo = []
+    hijos = _hijos(nodo)
+    while hijos:
+        cuerpo.append(_instruccion(hijos[0]))
+        hijos = _hijos(hijos[1])
+    return cuerpo
+
+
+def _instruccion(nodo):
+    hijos = _hijos(nodo)
+    primero = hijos[0]
+    etiqueta = primero.etiqueta
+    if etiqueta == "ASIGNACION":
+        identificador, _, expresion = _hijos(primero)
+        return Assign(identificador.valor, _expresion(expresion, f"asignación a '{identificador.valor}'"))
+    if etiqueta == "Imprimir":
+        # IMPRIMIR PARENTESIS_ABRIR IMPRIMIR' PARENTESIS_CERRAR
+        return Call("print", _lista_expresiones(_hijos(primero)[2]))
+    if etiqueta == "Mientras":
+        # MIENTRAS ( CONDICION ) { INSTRUCCIONES }
+        partes = _hijos(primero)
+        return While(_expresion(partes[2], "condición de while"), _instrucciones(partes[5]))
+    if etiqueta == "FUNCION":
+        # DEF IDENTIFICADOR ( PARAMETROS ) { INSTRUCCIONES }
+        partes = _hijos(primero)
+        parametros = []
+        for parametro in _lista_expresiones(partes[3]):
+            if not isinstance(parametro, Name):
+                raise ValueError(f"Parámetro inválido en la función '{partes[1].valor}': {parametro}")
+            parametros.append(parametro.id)
+        return FunctionDef(partes[1].valor, parametros, _instrucciones(partes[6]))
+    if etiqueta == "RETORNAR":
+        return Return(_expresion(hijos[1], "return"))
+    if etiqueta == "CONDICIONAL":
+        return _condicional(primero)
+    if etiqueta == "ROMPER":
+        return Break()
+    raise ValueError(f"Instrucción desconocida: {etiqueta}")
+
+
+def _condicional(nodo):
+    # SI ( CONDICION ) { INSTRUCCIONES } CONDICIONAL'; cada elif cuelga del
+    # orelse del anterior, así que la cadena se arma con un ciclo
+    partes = _hijos(nodo)
+    raiz = actual = If(_expresion(partes[2], "condición de if"), _instrucciones(partes[5]), [])
+    resto = _hijos(partes[7])
+    while resto:
+        if resto[0].etiqueta == "SINO":
+            # SINO { INSTRUCCIONES }
+            actual.orelse = _instrucciones(resto[2])
+            break
+        # SINOSI ( CONDICION ) { INSTRUCCIONES } CONDICIONAL'
+        siguiente = If(_expresion(resto[2], "condición de elif"), _instrucciones(resto[5]), [])
+        actual.orelse = [siguiente]
+        actual = siguiente
+        resto = _hijos(resto[7])
+    return raiz
+
+
+def _expresion(nodo, donde):
+    expresiones = _lista_expresiones(nodo)
+    if len(expresiones) != 1:
+        raise ErrorSemantico(f"{donde}: se esperaba una sola expresión, no una lista de "
+                             f"{len(expresiones)} separadas por comas")
+    return expresiones[0]
+
+
+def _lista_expresiones(nodo):
+    """Expresiones separadas por comas bajo `nodo` (EXPRESION, CONDICION, PARAMETROS, IMPRIMIR')."""
+    # Los nodos auxiliares solo aportan operandos, operadores y comas en orden;
+    # se aplanan en preorden y cada grupo entre comas se arma por precedencia
+    grupos = [[]]
+    pendientes = [nodo]
+    while pendientes:
+        nodo = pendientes.pop()
+        etiqueta = nodo.etiqueta
+        if etiqueta == "FACTOR":
+            grupos[-1].append(_factor(nodo))
+        elif etiqueta in ("OPERADOR", "COMPARACION", "OPERADORLOG"):
+            grupos[-1].append(nodo.hijos[0].valor)
+        elif etiqueta == "COMA":
+            grupos.append([])
+        else:
+            pendientes.extend(reversed(nodo.hijos))
+    return [_por_precedencia(grupo) for grupo in grupos if grupo]
+
+
+def _por_precedencia(elementos):
+    # Operandos y operadores alternados -> árbol binario (shunting-yard)
+    operandos = [elementos[0]]
+    operadores = []
+    for i in range(1, len(elementos), 2):
+        operador = elementos[i]
+        while operadores and PRECEDENCIA[operadores[-1]] >= PRECEDENCIA[operador]:
+            _reducir(operandos, operadores.pop())
+        operadores.append(operador)
+        operandos.append(elementos[i + 1])
+    while operadores:
+        _reducir(operandos, operadores.pop())
+    return operandos[0]
+
+
+def _reducir(operandos, operador):
+    derecho = operandos.pop()
+    izquierdo = operandos.pop()
+    if operador in OPERADORES_LOGICOS:
+        operandos.append(BoolOp(izquierdo, operador, derecho))
+    elif operador in OPERADORES_COMPARACION:
+        operandos.append(Compare(izquierdo, operador, derecho))
+    else:
+        operandos.append(BinOp(izquierdo, operador, derecho))
+
+
+def _factor(nodo):
+    hijos = _hijos(nodo)
+    primero = hijos[0]
+    etiqueta = primero.etiqueta
+    if etiqueta == "IDENTIFICADOR":
+        # IDENTIFICADOR INVFUNC; INVFUNC -> ( PARAMETROS ) | ''
+        invocacion = _hijos(hijos[1]) if len(hijos) > 1 else []
+        if invocacion:
+            return Call(primero.valor, _lista_expresiones(invocacion[1]))
+        return Name(primero.valor)
+    if etiqueta == "ENTERO":
+        return Literal(int(primero.valor))
+    if etiqueta == "FLOTANTE":
+        return Literal(float(primero.valor))
+    if etiqueta == "BOOLEANO":
+        return Literal(primero.valor == "True")
+    if etiqueta == "CADENA":
+        # Los valores de cadena se guardan serializados con json.dumps
+        return Literal(json.loads(primero.valor))
+    raise ValueError(f"Factor desconocido: {etiqueta}")
+
+
+def contar_nodos(nodo):
+    """Número de nodos del AST bajo `nodo` (incluido)."""
+    total = 0
+    pendientes = [nodo]
+    while pendientes:
+        nodo = pendientes.pop()
+        if isinstance(nodo, list):
+            pendientes.extend(nodo)
+        elif isinstance(nodo, NodoAST):
+            total += 1
+            pendientes.extend(getattr(nodo, campo) for campo in nodo._fields)
+    return total
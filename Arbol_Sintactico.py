@@ -0,0 +1,205 @@
+import array
+
+class Nodo:
+    def __init__(self, etiqueta, identificador, valor=None):
+        self.etiqueta = etiqueta
+        self.identificador = identificador
+        self.valor = valor
+        self.hijos = []
+        self.padre = None  # Atributo para almacenar el nodo padre
+
+    def agregar_hijo(self, hijo):
+        self.hijos.append(hijo)
+        hijo.padre = self  # Asigna el nodo actual como el padre del hijo
+
+    def es_hoja(self):
+        return len(self.hijos) == 0
+
+
+SIN_NODO = -1  # Padre, hijo o hermano inexistente en ArenaArbol
+
+class ArenaArbol:
+    """Árbol sintáctico guardado en arreglos paralelos indexados por nodo.
+
+    Cada nodo es un índice: su etiqueta y su valor son ids en las tablas
+    `etiquetas` y `valores` (el valor 0 es None), y la estructura se guarda
+    como padre, primer hijo y siguiente hermano (SIN_NODO si no hay). Un nodo
+    ocupa unos pocos bytes en lugar de un objeto con diccionario, lista de
+    hijos e identificador propios; `nodo(i)` da una vista con la interfaz de
+    `Nodo` para el código que recorre el árbol.
+    """
+
+    def __init__(self, etiquetas=()):
+        self.etiquetas = list(etiquetas)
+        self._id_etiqueta = {etiqueta: i for i, etiqueta in enumerate(self.etiquetas)}
+        self.valores = [None]
+        self._id_valor = {}
+        self.ids_etiqueta = array.array('I')
+        self.ids_valor = array.array('I')
+        self.padres = array.array('i')
+        self.primeros_hijos = array.array('i')
+        self.siguientes_hermanos = array.array('i')
+        self._ultimos_hijos = array.array('i')  # Para agregar hijos al final en O(1)
+
+    def __len__(self):
+        return len(self.ids_etiqueta)
+
+    def id_etiqueta(self, etiqueta):
+        id_etiqueta = self._id_etiqueta.get(etiqueta)
+        if id_etiqueta is None:
+            id_etiqueta = self._id_etiqueta[etiqueta] = len(self.etiquetas)
+            self.etiquetas.append(etiqueta)
+        return id_etiqueta
+
+    def id_valor(self, valor):
+        if valor is None:
+            return 0
+        id_valor = self._id_valor.get(valor)
+        if id_valor is None:
+            id_valor = self._id_valor[valor] = len(self.valores)
+            self.valores.append(valor)
+        return id_valor
+
+    def agregar(self, id_etiqueta, padre=SIN_NODO, valor=None):
+        """Crea un nodo (como último hijo de `padre`, si se da) y devuelve su índice."""
+        indice = len(self.ids_etiqueta)
+        self.ids_etiqueta.append(id_etiqueta)
+        self.ids_valor.append(self.id_valor(valor))
+        self.padres.append(SIN_NODO)
+        self.primeros_hijos.append(SIN_NODO)
+        self.siguientes_hermanos.append(SIN_NODO)
+        self._ultimos_hijos.append(SIN_NODO)
+        if padre != SIN_NODO:
+            self.enlazar(padre, indice)
+        return indice
+
+    def agregar_hijos(self, padre, ids_etiqueta):
+        """Crea de una vez los hijos de `padre` con las etiquetas dadas.
+
+        Los hijos quedan en índices consecutivos; devuelve el del primero.
+        """
+        primero = len(self.ids_etiqueta)
+        n = len(ids_etiqueta)
+        vacios = [SIN_NODO] * n
+        self.ids_etiqueta.extend(ids_etiqueta)
+        self.ids_valor.extend([0] * n)
+        self.padres.extend([padre] * n)
+        self.primeros_hijos.extend(vacios)
+        self._ultimos_hijos.extend(vacios)
+        self.siguientes_hermanos.extend(range(primero + 1, primero + n))
+        self.siguientes_hermanos.append(SIN_NODO)
+        ultimo = self._ultimos_hijos[padre]
+        if ultimo == SIN_NODO:
+            self.primeros_hijos[padre] = primero
+        else:
+            self.siguientes_hermanos[ultimo] = primero
+        self._ultimos_hijos[padre] = primero + n - 1
+        return primero
+
+    def enlazar(self, padre, hijo):
+        """Agrega el nodo suelto `hijo` como último hijo de `padre`."""
+        self.padres[hijo] = padre
+        ultimo = self._ultimos_hijos[padre]
+        if ultimo == SIN_NODO:
+            self.primeros_hijos[padre] = hijo
+        else:
+            self.siguientes_hermanos[ultimo] = hijo
+        self._ultimos_hijos[padre] = hijo
+
+    def etiqueta(self, indice):
+        return self.etiquetas[self.ids_etiqueta[indice]]
+
+    def valor(self, indice):
+        return self.valores[self.ids_valor[indice]]
+
+    def asignar_valor(self, indice, valor):
+        self.ids_valor[indice] = self.id_valor(valor)
+
+    def hijos(self, indice):
+        """Índices de los hijos de `indice`, en orden."""
+        hijos = []
+        hijo = self.primeros_hijos[indice]
+        while hijo != SIN_NODO:
+            hijos.append(hijo)
+            hijo = self.siguientes_hermanos[hijo]
+        return hijos
+
+    def nodo(self, indice):
+        return NodoArena(self, indice)
+
+    def raiz(self):
+        return NodoArena(self, 0) if len(self) else None
+
+    def a_nodos(self, indice=0):
+        """Copia el subárbol de `indice` a objetos `Nodo` independientes."""
+        raiz = Nodo(self.etiqueta(indice), f'N{indice}', self.valor(indice))
+        pendientes = [(indice, raiz)]
+        while pendientes:
+            indice, nodo = pendientes.pop()
+            for hijo in self.hijos(indice):
+                nodo_hijo = Nodo(self.etiqueta(hijo), f'N{hijo}', self.valor(hijo))
+                nodo.agregar_hijo(nodo_hijo)
+                pendientes.append((hijo, nodo_hijo))
+        return raiz
+
+
+class NodoArena:
+    """Vista ligera de un nodo de ArenaArbol con la misma interfaz que Nodo.
+
+    Las vistas se crean al pedirlas y no guardan nada propio: dos vistas del
+    mismo nodo son iguales. `hijos` devuelve una lista nueva en cada acceso.
+    """
+    __slots__ = ('arena', 'indice')
+
+    def __init__(self, arena, indice):
+        self.arena = arena
+        self.indice = indice
+
+    @property
+    def etiqueta(self):
+        arena = self.arena
+        return arena.etiquetas[arena.ids_etiqueta[self.indice]]
+
+    @property
+    def identificador(self):
+        return f'N{self.indice}'
+
+    @property
+    def valor(self):
+        arena = self.arena
+        return arena.valores[arena.ids_valor[self.indice]]
+
+    @valor.setter
+    def valor(self, valor):
+        self.arena.asignar_valor(self.indice, valor)
+
+    @property
+    def hijos(self):
+        arena = self.arena
+        siguientes = arena.siguientes_hermanos
+        hijos = []
+        hijo = arena.primeros_hijos[self.indice]
+        while hijo != SIN_NODO:
+            hijos.append(NodoArena(arena, hijo))
+            hijo = siguientes[hijo]
+        return hijos
+
+    @property
+    def padre(self):
+        padre = self.arena.padres[self.indice]
+        return None if padre == SIN_NODO else NodoArena(self.arena, padre)
+
+    def agregar_hijo(self, hijo):
+        # `hijo` debe ser un nodo suelto de la misma arena (creado con arena.agregar)
+        if hijo.arena is not self.arena:
+            raise ValueError("El hijo pertenece a otra arena.")
+        self.arena.enlazar(self.indice, hijo.indice)
+
+    def es_hoja(self):
+        return self.arena.primeros_hijos[self.indice] == SIN_NODO
+
+    def __eq__(self, otro):
+        return isinstance(otro, NodoArena) and otro.arena is self.arena and otro.indice == self.indice
+
+    def __hash__(self):
+        return hash((id(self.arena), self.indice))
@@ -0,0 +1,207 @@
+import bisect
+import re
+
+# Asignación de registros por barrido lineal (linear scan).
+# Los generadores SPIM emiten el código con registros virtuales (%0, %1, ...)
+# sin límite; aquí se calcula el intervalo de vida de cada uno en el orden
+# del código, se les asignan los registros físicos $t0-$t7 y $s0-$s7 y, si
+# no alcanzan, los intervalos que terminan más tarde se guardan en ranuras
+# de la pila ($sp + base + 4 * ranura) y se cargan en $t8/$t9 justo al usarlos.
+#
+# Los generadores nunca dejan vivo un registro virtual después de una
+# etiqueta o un salto (cada uno vive dentro de un bloque básico), así que el
+# intervalo en el orden del código es exacto. Un `jal` no termina el bloque,
+# pero la función llamada puede usar los $t: lo que sigue vivo después de
+# una llamada va a un $s, que la función llamada guarda si lo usa.
+
+REGISTRO_VIRTUAL = re.compile(r'%\d+')
+TEMPORALES = tuple(f"$t{i}" for i in range(8))   # Los pisa cualquier llamada
+GUARDADOS = tuple(f"$s{i}" for i in range(8))    # La función llamada los conserva
+AUXILIARES = ('$t8', '$t9')                      # Para cargar y guardar los derramados
+
+# Instrucciones cuyo primer operando es el registro que escriben; en las
+# demás (sw, div, saltos...) todos los registros se leen
+ESCRIBEN_PRIMERO = frozenset((
+    'add', 'addi', 'addu', 'addiu', 'sub', 'subu', 'mul', 'and', 'andi', 'or', 'ori', 'xor', 'nor',
+    'seq', 'sne', 'slt', 'slti', 'sle', 'sgt', 'sge', 'li', 'la', 'lw', 'move', 'mflo', 'mfhi', 'neg', 'not',
+))
+SALTOS = frozenset(('j', 'jr', 'b', 'beq', 'bne', 'blt', 'ble', 'bgt', 'bge', 'beqz', 'bnez'))
+
+
+class Intervalo:
+    """Vida de un registro virtual: de su definición a su último uso, en índices de instrucción."""
+    __slots__ = ('registro', 'inicio', 'fin', 'cruza_llamada', 'fisico', 'ranura')
+
+    def __init__(self, registro, inicio):
+        self.registro = registro
+        self.inicio = inicio
+        self.fin = inicio
+        self.cruza_llamada = False
+        self.fisico = None  # Registro físico asignado, o None si se derramó
+        self.ranura = None  # Ranura de la pila de un registro derramado
+
+
+class Asignacion:
+    """Código con registros físicos, los $s que usa y las ranuras de pila que necesita."""
+    __slots__ = ('lineas', 'guardados', 'ranuras', 'derramados')
+
+    def __init__(self, lineas, guardados, ranuras, derramados):
+        self.lineas = lineas
+        self.guardados = guardados    # Registros $s usados, en orden
+        self.ranuras = ranuras        # Palabras de pila para los derramados
+        self.derramados = derramados  # Registros virtuales que quedaron en la pila
+
+
+def _partir(linea):
+    # "    op a, b, c" -> ("op", ["a", "b", "c"]); las etiquetas dan (None, [])
+    texto = linea.strip()
+    if not texto or texto.endswith(':'):
+        return None, []
+    operacion, _, resto = texto.partition(' ')
+    return operacion, [operando.strip() for operando in resto.split(',')] if resto else []
+
+
+def calcular_intervalos(instrucciones):
+    """Intervalos de los registros virtuales de `instrucciones` (listas de _partir), por inicio.
+
+    Un registro puede redefinirse dentro de su bloque; ValueError si se usa
+    sin definirse antes o fuera del bloque básico donde se definió.
+    """
+    intervalos = {}
+    bloques = {}  # Registro -> bloque donde se definió
+    llamadas = []
+    bloque = 0
+    for indice, (operacion, operandos) in enumerate(instrucciones):
+        if operacion is None:
+            bloque += 1  # Una etiqueta empieza un bloque
+            continue
+        escritos = operandos[:1] if operacion in ESCRIBEN_PRIMERO else []
+        leidos = operandos[1:] if escritos else operandos
+        for operando in leidos:
+            for registro in REGISTRO_VIRTUAL.findall(operando):
+                intervalo = intervalos.get(registro)
+                if intervalo is None or bloques[registro] != bloque:
+                    raise ValueError(f"El registro {registro} se usa fuera del bloque donde se define")
+                intervalo.fin = indice
+        for registro in REGISTRO_VIRTUAL.findall(escritos[0]) if escritos else ():
+            intervalo = intervalos.get(registro)
+            if intervalo is None:
+                intervalos[registro] = Intervalo(registro, indice)
+                bloques[registro] = bloque
+            elif bloques[registro] != bloque:
+                raise ValueError(f"El registro {registro} se redefine fuera del bloque donde se define")
+            else:
+                intervalo.fin = indice  # Redefinido en su bloque (sne r, r, $zero): sigue el mismo intervalo
+        if operacion == 'jal':
+            llamadas.append(indice)
+        elif operacion in SALTOS:
+            bloque += 1
+
+    # Un intervalo cruza una llamada si alguna está estrictamente dentro de él
+    ordenados = sorted(intervalos.values(), key=lambda intervalo: intervalo.inicio)
+    if llamadas:
+        for intervalo in ordenados:
+            posicion = bisect.bisect_right(llamadas, intervalo.inicio)
+            intervalo.cruza_llamada = posicion < len(llamadas) and llamadas[posicion] < intervalo.fin
+    return ordenados
+
+
+def _barrido_lineal(intervalos, temporales, guardados):
+    # Poletto y Sarkar: al llegar a un intervalo se liberan los que ya
+    # terminaron; si no queda registro, se derrama el activo (o el nuevo) que
+    # termina más tarde. Lo que cruza una llamada solo puede ir a un $s.
+    libres_t = list(reversed(temporales))
+    libres_s = list(reversed(guardados))
+    activos = []  # Intervalos con registro, ordenados por fin
+    derramados = []
+    for intervalo in intervalos:
+        while activos and activos[0].fin <= intervalo.inicio:
+            # Terminan en esta instrucción o antes: se leen antes de escribir el nuevo
+            liberado = activos.pop(0).fisico
+            (libres_s if liberado in guardados else libres_t).append(liberado)
+
+        if not intervalo.cruza_llamada and libres_t:
+            intervalo.fisico = libres_t.pop()
+        elif libres_s:
+            intervalo.fisico = libres_s.pop()
+        else:
+            candidatos = [activo for activo in activos
+                          if not intervalo.cruza_llamada or activo.fisico in guardados]
+            victima = max(candidatos, key=lambda activo: activo.fin, default=None)
+            if victima is None or victima.fin <= intervalo.fin:
+                derramados.append(intervalo)
+                continue
+            intervalo.fisico, victima.fisico = victima.fisico, None
+            activos.remove(victima)
+            derramados.append(victima)
+        # Insertar manteniendo el orden por fin
+        posicion = len(activos)
+        while posicion and activos[posicion - 1].fin > intervalo.fin:
+            posicion -= 1
+        activos.insert(posicion, intervalo)
+    return derramados
+
+
+def _asignar_ranuras(derramados):
+    # Los derramados cuyas vidas no se cruzan comparten ranura
+    libres = []
+    ocupadas = []  # (fin, ranura)
+    total = 0
+    for intervalo in sorted(derramados, key=lambda intervalo: intervalo.inicio):
+        ocupadas.sort()
+        while ocupadas and ocupadas[0][0] <= intervalo.inicio:
+            libres.append(ocupadas.pop(0)[1])
+        if libres:
+            intervalo.ranura = libres.pop()
+        else:
+            intervalo.ranura = total
+            total += 1
+        ocupadas.append((intervalo.fin, intervalo.ranura))
+    return total
+
+
+def asignar_registros(lineas, temporales=TEMPORALES, guardados=GUARDADOS, base=0):
+    """Reescribe `lineas` (código SPIM con registros virtuales) con registros físicos.
+
+    Devuelve una Asignacion. Las ranuras de los derramados están en
+    base($sp), base+4($sp), ...: quien arma el marco de la función debe
+    reservarlas y no mover $sp mientras haya registros vivos.
+    """
+    instrucciones = [_partir(linea) for linea in lineas]
+    intervalos = calcular_intervalos(instrucciones)
+    derramados = _barrido_lineal(intervalos, temporales, guardados)
+    ranuras = _asignar_ranuras(derramados)
+    por_registro = {intervalo.registro: intervalo for intervalo in intervalos}
+
+    resultado = []
+    for linea, (operacion, operandos) in zip(lineas, instrucciones):
+        if operacion is None or '%' not in linea:
+            resultado.append(linea)
+            continue
+        escritos = operandos[:1] if operacion in ESCRIBEN_PRIMERO else []
+        leidos = operandos[1:] if escritos else operandos
+        cargados = {}  # Registro derramado -> auxiliar donde se cargó
+        for operando in leidos:
+            for registro in REGISTRO_VIRTUAL.findall(operando):
+                intervalo = por_registro[registro]
+                if intervalo.fisico is None and registro not in cargados:
+                    cargados[registro] = AUXILIARES[len(cargados)]
+                    resultado.append(f"    lw {cargados[registro]}, {base + 4 * intervalo.ranura}($sp)")
+        guardar = None
+        for registro in REGISTRO_VIRTUAL.findall(escritos[0]) if escritos else ():
+            intervalo = por_registro[registro]
+            if intervalo.fisico is None:
+                # Se escribe en un auxiliar (el mismo si también se leyó) y se guarda
+                cargados.setdefault(registro, AUXILIARES[0])
+                guardar = f"    sw {cargados[registro]}, {base + 4 * intervalo.ranura}($sp)"
+
+        def fisico(coincidencia):
+            registro = coincidencia.group()
+            return por_registro[registro].fisico or cargados[registro]
+        resultado.append(REGISTRO_VIRTUAL.sub(fisico, linea))
+        if guardar:
+            resultado.append(guardar)
+
+    usados = {intervalo.fisico for intervalo in intervalos}
+    return Asignacion(resultado, [registro for registro in guardados if registro in usados], ranuras,
+                      [intervalo.registro for intervalo in derramados])
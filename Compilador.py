@@ -0,0 +1,240 @@
+import argparse
+import io
+import os
+import time
+
+import Tabla_Simbolos
+from AnalizadorSintactico import LLParser, TRACE_OFF
+from Arbol_Abstracto import construir_ast
+from Exportar_Arbol import FORMATOS, crear_exportador, exportar_arbol
+from Flujo_Tokens import FlujoTokens
+from Lexer_Python_ES import DIR_CACHE_LEXER, construir_flujo
+from Plegado_Constantes import anotar_tabla, propagar_constantes
+from pruebaSPIM import ASTSPIMGenerator, function_locals
+from Tabla_Sintactica import write_csv, write_nonterminals
+
+# Compilación de principio a fin en memoria.
+# El código fuente pasa por el lexer, el analizador LL(1) (que construye el
+# árbol en la misma pasada), el AST, la tabla de símbolos con las constantes
+# y el generador SPIM sin escribir ni volver a leer archivos intermedios; los
+# tokens, la tabla LL(1) y el árbol solo se escriben si se piden. Cada etapa
+# se cronometra por separado.
+
+ETAPAS = ('tabla', 'lexico', 'sintactico', 'ast', 'simbolos', 'codigo', 'intermedios')
+
+# La tabla LL(1) compilada se guarda en la cache del lexer y no en el
+# directorio actual: una compilación sin intermedios no deja archivos
+TABLA_COMPILADA = os.path.join(DIR_CACHE_LEXER, 'll1_table.bin')
+
+# Intermedio -> archivos que escribe (en el directorio de salida)
+INTERMEDIOS = {
+    'tokens': ('tokens.bin', 'tokens.txt', 'tokens_only.txt'),
+    'tabla': ('ll1_table.csv', 'no_terminales.txt'),
+    'arbol': ('arbol_sintactico',),  # La extensión depende del formato
+}
+
+
+class ResultadoCompilacion:
+    """Lo que produce cada etapa de una compilación.
+
+    `codigo` es el programa SPIM, o None si hubo errores (en `errores`, como
+    mensajes); `tiempos` tiene los segundos de cada etapa que se ejecutó, en
+    el orden de ETAPAS.
+    """
+    __slots__ = ('nombre', 'tokens', 'arbol', 'ast', 'contexto', 'codigo', 'errores', 'tiempos', 'archivos')
+
+    def __init__(self, nombre):
+        self.nombre = nombre
+        self.tokens = None    # FlujoTokens
+        self.arbol = None     # Raíz del árbol sintáctico (vista de arena)
+        self.ast = None       # Program ya plegado, el que se tradujo
+        self.contexto = None  # ContextoCompilacion con la tabla de símbolos
+        self.codigo = None
+        self.errores = []
+        self.tiempos = {}
+        self.archivos = []    # Archivos intermedios escritos
+
+    @property
+    def tiempo_total(self):
+        return sum(self.tiempos.values())
+
+
+class Compilador:
+    """Compila programas en memoria con una tabla LL(1) que se carga una sola vez.
+
+    Un Compilador guarda su analizador entre compilaciones, así que no debe
+    usarse desde varios hilos a la vez; cada hilo puede tener el suyo.
+    """
+
+    def __init__(self, archivo_gramatica="Gramatica.txt", plegar=True):
+        self.archivo_gramatica = archivo_gramatica
+        self.plegar = plegar
+        self._parser = None
+
+    def _analizador(self, tokens, tiempos):
+        if self._parser is None:
+            inicio = time.perf_counter()
+            os.makedirs(os.path.dirname(TABLA_COMPILADA), exist_ok=True)
+            self._parser = LLParser(self.archivo_gramatica, tokens, TABLA_COMPILADA)
+            tiempos['tabla'] = time.perf_counter() - inicio
+        else:
+            self._parser.set_tokens(tokens)
+        return self._parser
+
+    def compilar(self, fuente, nombre="<programa>", intermedios=(), dir_salida=".", formato_arbol='jsonl'):
+        """Compila el texto `fuente` y devuelve un ResultadoCompilacion.
+
+        `intermedios` es una colección con los nombres de INTERMEDIOS que se
+        escriben en `dir_salida` (el árbol, en `formato_arbol`).
+        """
+        resultado = ResultadoCompilacion(nombre)
+        tiempos = {}
+
+        inicio = time.perf_counter()
+        errores_lexicos = []
+        datos_tokens = construir_flujo(io.StringIO(fuente), errores_lexicos).a_bytes()
+        resultado.tokens = FlujoTokens(datos_tokens)
+        tiempos['lexico'] = time.perf_counter() - inicio
+        resultado.errores.extend(f"Línea {linea}: carácter ilegal: {caracter}" for linea, caracter in errores_lexicos)
+
+        parser = self._analizador(resultado.tokens, tiempos)
+        inicio = time.perf_counter()
+        parser.parse_input(TRACE_OFF, build_tree=True)
+        tiempos['sintactico'] = time.perf_counter() - inicio
+        resultado.errores.extend(f"Error sintáctico en el token {posicion} (línea {linea}): {mensaje}"
+                                 for posicion, linea, mensaje in parser.errors)
+        resultado.arbol = parser.tree
+
+        if intermedios:
+            inicio = time.perf_counter()
+            resultado.archivos = self._escribir_intermedios(resultado, datos_tokens, intermedios, dir_salida,
+                                                           formato_arbol)
+            tiempos['intermedios'] = time.perf_counter() - inicio
+
+        try:
+            if resultado.errores or resultado.arbol is None:
+                return resultado
+
+            inicio = time.perf_counter()
+            programa = construir_ast(resultado.arbol)
+            tiempos['ast'] = time.perf_counter() - inicio
+
+            # Los símbolos salen del mismo árbol, sin volver a analizar; las
+            # constantes se propagan una vez y el programa plegado va al generador
+            inicio = time.perf_counter()
+            contexto = Tabla_Simbolos.ContextoCompilacion(nombre)
+            Tabla_Simbolos.agregarSimbolos(resultado.arbol, contexto)
+            locales = function_locals(programa)  # Antes de plegar, como en generate_ast
+            if self.plegar:
+                programa, constantes = propagar_constantes(programa)
+                anotar_tabla(contexto.tabla_simbolos, constantes)
+            resultado.contexto = contexto
+            resultado.ast = programa
+            tiempos['simbolos'] = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            resultado.codigo = ASTSPIMGenerator(fold_constants=False).generate_ast(programa, locales)
+            tiempos['codigo'] = time.perf_counter() - inicio
+        except (ValueError, NotImplementedError, RuntimeError) as error:
+            resultado.errores.append(str(error))
+        finally:
+            resultado.tiempos = {etapa: tiempos[etapa] for etapa in ETAPAS if etapa in tiempos}
+        return resultado
+
+    def _escribir_intermedios(self, resultado, datos_tokens, intermedios, dir_salida, formato_arbol):
+        desconocidos = set(intermedios) - set(INTERMEDIOS)
+        if desconocidos:
+            raise ValueError(f"Intermedios desconocidos: {', '.join(sorted(desconocidos))}")
+        os.makedirs(dir_salida, exist_ok=True)
+        escritos = []
+        if 'tokens' in intermedios:
+            ruta_bin, ruta_texto, ruta_tipos = (os.path.join(dir_salida, nombre) for nombre in INTERMEDIOS['tokens'])
+            with open(ruta_bin, 'wb') as archivo:
+                archivo.write(datos_tokens)
+            escribir_flujo_texto(resultado.tokens, ruta_texto, ruta_tipos)
+            escritos.extend((ruta_bin, ruta_texto, ruta_tipos))
+        if 'tabla' in intermedios:
+            ruta_csv, ruta_no_terminales = (os.path.join(dir_salida, nombre) for nombre in INTERMEDIOS['tabla'])
+            compilada = self._parser.compiled
+            write_csv(tabla_reglas(compilada), ruta_csv)
+            write_nonterminals(compilada.nonterminals, ruta_no_terminales)
+            escritos.extend((ruta_csv, ruta_no_terminales))
+        if 'arbol' in intermedios and resultado.arbol is not None:
+            ruta = os.path.join(dir_salida, INTERMEDIOS['arbol'][0] + FORMATOS[formato_arbol][1])
+            with open(ruta, 'w', encoding='utf-8') as salida:
+                exportar_arbol(resultado.arbol, crear_exportador(formato_arbol, salida))
+            escritos.append(ruta)
+        return escritos
+
+
+def escribir_flujo_texto(tokens, archivo_tokens="tokens.txt", archivo_tipos="tokens_only.txt"):
+    """Escribe un flujo ya tokenizado en el formato de texto ("TIPO:valor"), sin volver a lexear."""
+    with open(archivo_tokens, "w") as salida_tokens, open(archivo_tipos, "w") as salida_tipos:
+        separador = ""
+        for tipo, valor in tokens:
+            salida_tokens.write(f"{separador}{tipo}:{valor}")
+            salida_tipos.write(f"{separador}{tipo}")
+            separador = " "
+
+
+def tabla_reglas(compilada):
+    """Tabla LL(1) compilada -> {no terminal: {terminal: regla o ''}}, la forma que espera write_csv."""
+    columnas = compilada.symbols[compilada.n_nonterminals:]
+    tabla = {}
+    for no_terminal, nombre in enumerate(compilada.nonterminals):
+        base = no_terminal * compilada.n_columns
+        fila = tabla[nombre] = {}
+        for columna, terminal in enumerate(columnas):
+            indice = compilada.table[base + columna]
+            fila[terminal] = compilada.production_text(indice) if indice >= 0 else ''
+    return tabla
+
+
+def compilar(fuente, archivo_gramatica="Gramatica.txt", **opciones):
+    """Compila `fuente` con un Compilador nuevo; ver Compilador.compilar."""
+    return Compilador(archivo_gramatica).compilar(fuente, **opciones)
+
+
+def reportar_tiempos(resultado):
+    print(f"{'Etapa':<12} {'ms':>10}")
+    for etapa, segundos in resultado.tiempos.items():
+        print(f"{etapa:<12} {segundos * 1000:>10.2f}")
+    print(f"{'total':<12} {resultado.tiempo_total * 1000:>10.2f}")
+
+
+def main():
+    argumentos = argparse.ArgumentParser(description="Compilador de principio a fin, en memoria")
+    argumentos.add_argument("fuente", nargs="?", default="codigo.txt", help="programa a compilar")
+    argumentos.add_argument("-o", "--salida", default="output.asm", help="archivo del código SPIM generado")
+    argumentos.add_argument("--intermedios", nargs="+", default=(), choices=sorted(INTERMEDIOS),
+                            help="archivos intermedios que también se escriben")
+    argumentos.add_argument("--dir-intermedios", default=".", help="directorio de los archivos intermedios")
+    argumentos.add_argument("--formato-arbol", choices=sorted(FORMATOS), default='jsonl',
+                            help="formato del árbol cuando se pide como intermedio")
+    argumentos.add_argument("--simbolos", action="store_true", help="imprime la tabla de símbolos")
+    argumentos.add_argument("--sin-plegado", action="store_true",
+                            help="no pliega ni propaga constantes antes de generar")
+    opciones = argumentos.parse_args()
+
+    with open(opciones.fuente, 'r') as archivo:
+        fuente = archivo.read()
+    compilador = Compilador(plegar=not opciones.sin_plegado)
+    resultado = compilador.compilar(fuente, opciones.fuente, opciones.intermedios, opciones.dir_intermedios,
+                                    opciones.formato_arbol)
+    for mensaje in resultado.errores:
+        print(f"{opciones.fuente}: {mensaje}")
+    for ruta in resultado.archivos:
+        print(f"Intermedio escrito: {ruta}")
+    if resultado.codigo is not None:
+        with open(opciones.salida, 'w') as archivo:
+            archivo.write(resultado.codigo)
+        print(f"Código SPIM generado en '{opciones.salida}'")
+        if opciones.simbolos:
+            resultado.contexto.tabla_simbolos.imprimir_tabla()
+    reportar_tiempos(resultado)
+    if resultado.codigo is None:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import json
+
+# Exportación incremental del árbol sintáctico.
+# Los nodos llegan en preorden con su profundidad (`nodo(...)`), ya sea
+# recorriendo un árbol construido o mientras el analizador LL(1) lo construye,
+# y cada exportador escribe su formato en cuanto recibe el nodo, guardando
+# solo la rama abierta: su memoria depende de la profundidad, no del tamaño.
+
+
+class Exportador:
+    """Base de los exportadores: aplica los filtros y cierra los nodos abiertos.
+
+    Con `profundidad_max` solo se escriben los nodos hasta esa profundidad
+    (la raíz es 0). Con `subarbol` solo se escriben los subárboles cuya raíz
+    tiene esa etiqueta, y la profundidad se cuenta desde cada una de ellas.
+    """
+
+    def __init__(self, salida, profundidad_max=None, subarbol=None):
+        self.salida = salida
+        self.profundidad_max = profundidad_max
+        self.subarbol = subarbol
+        self.nodos_escritos = 0
+        self._abiertos = []          # (profundidad, identificador) de los nodos escritos sin cerrar
+        self._raiz_subarbol = None   # Profundidad de la raíz del subárbol en curso
+        self._iniciado = False
+
+    def nodo(self, identificador, etiqueta, valor, profundidad):
+        if not self._iniciado:
+            self._iniciado = True
+            self._inicio()
+        # Un nodo a profundidad p cierra todos los abiertos a profundidad >= p
+        abiertos = self._abiertos
+        while abiertos and abiertos[-1][0] >= profundidad:
+            self._cerrar(*abiertos.pop())
+
+        base = 0
+        if self.subarbol is not None:
+            if self._raiz_subarbol is not None and profundidad <= self._raiz_subarbol:
+                self._raiz_subarbol = None
+            if self._raiz_subarbol is None:
+                if etiqueta != self.subarbol:
+                    return
+                self._raiz_subarbol = profundidad
+            base = self._raiz_subarbol
+        if self.profundidad_max is not None and profundidad - base > self.profundidad_max:
+            return
+
+        padre = abiertos[-1][1] if abiertos else None
+        self._abrir(identificador, padre, etiqueta, valor, profundidad - base)
+        abiertos.append((profundidad, identificador))
+        self.nodos_escritos += 1
+
+    def terminar(self):
+        if not self._iniciado:
+            self._inicio()
+        while self._abiertos:
+            self._cerrar(*self._abiertos.pop())
+        self._fin()
+
+    # Métodos de cada formato
+    def _inicio(self):
+        pass
+
+    def _abrir(self, identificador, padre, etiqueta, valor, profundidad):
+        raise NotImplementedError
+
+    def _cerrar(self, profundidad, identificador):
+        pass
+
+    def _fin(self):
+        pass
+
+
+class ExportadorDot(Exportador):
+    """Grafo de graphviz en formato DOT, un nodo y su arista por línea."""
+
+    def _inicio(self):
+        self.salida.write("// Arbol Sintactico\ndigraph {\n")
+
+    def _abrir(self, identificador, padre, etiqueta, valor, profundidad):
+        texto = f"{etiqueta}\n{valor}" if valor else etiqueta
+        self.salida.write(f"\t{identificador} [label={json.dumps(texto, ensure_ascii=False)}]\n")
+        if padre is not None:
+            self.salida.write(f"\t{padre} -> {identificador}\n")
+
+    def _fin(self):
+        self.salida.write("}\n")
+
+
+class ExportadorJsonl(Exportador):
+    """Un objeto JSON por línea con el identificador, el padre, la etiqueta, el valor y la profundidad."""
+
+    def _abrir(self, identificador, padre, etiqueta, valor, profundidad):
+        self.salida.write(json.dumps({"id": identificador, "padre": padre, "etiqueta": etiqueta,
+                                      "valor": valor, "profundidad": profundidad}, ensure_ascii=False))
+        self.salida.write("\n")
+
+
+# Niveles de sangría máximos de las expresiones S: la lista de instrucciones
+# es recursiva por la derecha y sin tope la sangría crecería con el programa
+SANGRIA_MAX = 40
+
+
+class ExportadorSexp(Exportador):
+    """Expresiones S indentadas: (ETIQUETA "valor" hijos...)."""
+
+    def _abrir(self, identificador, padre, etiqueta, valor, profundidad):
+        if padre is not None:
+            self.salida.write("\n" + "  " * min(profundidad, SANGRIA_MAX))
+        self.salida.write(f"({etiqueta}")
+        if valor is not None:
+            self.salida.write(f" {json.dumps(valor, ensure_ascii=False)}")
+
+    def _cerrar(self, profundidad, identificador):
+        self.salida.write(")")
+        if not self._abiertos:
+            self.salida.write("\n")
+
+
+# Formato -> (clase, extensión del archivo)
+FORMATOS = {
+    'dot': (ExportadorDot, '.dot'),
+    'jsonl': (ExportadorJsonl, '.jsonl'),
+    'sexp': (ExportadorSexp, '.sexp'),
+}
+
+
+def crear_exportador(formato, salida, profundidad_max=None, subarbol=None):
+    clase, _ = FORMATOS[formato]
+    return clase(salida, profundidad_max, subarbol)
+
+
+def exportar_arbol(raiz, exportador):
+    """Recorre en preorden un árbol ya construido (Nodo o vista de arena) y lo exporta."""
+    pendientes = [(raiz, 0)]
+    while pendientes:
+        nodo, profundidad = pendientes.pop()
+        exportador.nodo(nodo.identificador, nodo.etiqueta, nodo.valor, profundidad)
+        pendientes.extend((hijo, profundidad + 1) for hijo in reversed(nodo.hijos))
+    exportador.terminar()
@@ -0,0 +1,193 @@
+import array
+import mmap
+import struct
+import sys
+
+# Formato binario del flujo de tokens (little-endian):
+#   cabecera | ids de tipo (H) | posiciones (I) | longitudes (I) | líneas (I)
+#   | ids de valor (I) | tabla de tipos | tabla de valores
+# Cada tabla de cadenas se guarda como desplazamientos (I, n + 1) seguidos
+# del texto UTF-8 concatenado. Todas las secciones se alinean a 4 bytes.
+MAGICO = b'TOKB'
+VERSION = 1
+_CABECERA = struct.Struct('<4sHHIIIII')
+
+
+def _relleno(tam):
+    return -tam % 4
+
+
+def _a_little_endian(arreglo):
+    if sys.byteorder != 'little':
+        arreglo = array.array(arreglo.typecode, arreglo)
+        arreglo.byteswap()
+    return arreglo
+
+
+def _tabla_cadenas(cadenas):
+    """Codifica una lista de cadenas como (desplazamientos, texto)."""
+    desplazamientos = array.array('I', [0])
+    partes = []
+    total = 0
+    for cadena in cadenas:
+        codificada = cadena.encode('utf-8')
+        partes.append(codificada)
+        total += len(codificada)
+        desplazamientos.append(total)
+    return desplazamientos, b''.join(partes)
+
+
+class ConstructorTokens:
+    """Acumula tokens en arreglos compactos y los serializa al formato binario."""
+
+    def __init__(self):
+        self.ids_tipo = array.array('H')
+        self.posiciones = array.array('I')
+        self.longitudes = array.array('I')
+        self.lineas = array.array('I')
+        self.ids_valor = array.array('I')
+        self._tipos = {}    # Nombre del tipo -> id
+        self._valores = {}  # Texto del valor -> id (valores internados)
+
+    def __len__(self):
+        return len(self.ids_tipo)
+
+    def agregar(self, tipo, valor, posicion=0, longitud=0, linea=0):
+        id_tipo = self._tipos.get(tipo)
+        if id_tipo is None:
+            id_tipo = self._tipos[tipo] = len(self._tipos)
+        id_valor = self._valores.get(valor)
+        if id_valor is None:
+            id_valor = self._valores[valor] = len(self._valores)
+        self.ids_tipo.append(id_tipo)
+        self.posiciones.append(posicion)
+        self.longitudes.append(longitud)
+        self.lineas.append(linea)
+        self.ids_valor.append(id_valor)
+
+    def partes(self):
+        """Genera los bloques de bytes del archivo en orden."""
+        desp_tipos, texto_tipos = _tabla_cadenas(self._tipos)
+        desp_valores, texto_valores = _tabla_cadenas(self._valores)
+        yield _CABECERA.pack(MAGICO, VERSION, 0, len(self), len(self._tipos), len(self._valores),
+                             len(texto_tipos), len(texto_valores))
+        for arreglo in (self.ids_tipo, self.posiciones, self.longitudes, self.lineas,
+                        self.ids_valor, desp_tipos):
+            datos = _a_little_endian(arreglo).tobytes()
+            yield datos + bytes(_relleno(len(datos)))
+        yield texto_tipos + bytes(_relleno(len(texto_tipos)))
+        yield _a_little_endian(desp_valores).tobytes()
+        yield texto_valores
+
+    def a_bytes(self):
+        return b''.join(self.partes())
+
+    def escribir(self, ruta):
+        with open(ruta, 'wb') as archivo:
+            for parte in self.partes():
+                archivo.write(parte)
+
+
+class FlujoTokens:
+    """Vista de solo lectura sobre un flujo de tokens binario.
+
+    Los arreglos se leen directamente del buffer (normalmente un mmap) sin
+    copiarlos; los valores se decodifican sólo cuando se piden y se guardan
+    por id, así que cada valor distinto se convierte a `str` una única vez.
+    """
+
+    def __init__(self, datos):
+        self._datos = datos
+        self._vistas = []
+        vista = self._vista(datos)
+        (magico, version, _, n, n_tipos, n_valores,
+         bytes_tipos, bytes_valores) = _CABECERA.unpack_from(vista, 0)
+        if magico != MAGICO or version != VERSION:
+            raise ValueError("El archivo no es un flujo de tokens binario compatible.")
+
+        pos = _CABECERA.size
+        self.ids_tipo, pos = self._seccion(vista, pos, 'H', n)
+        self.posiciones, pos = self._seccion(vista, pos, 'I', n)
+        self.longitudes, pos = self._seccion(vista, pos, 'I', n)
+        self.lineas, pos = self._seccion(vista, pos, 'I', n)
+        self.ids_valor, pos = self._seccion(vista, pos, 'I', n)
+        desp_tipos, pos = self._seccion(vista, pos, 'I', n_tipos + 1)
+        texto_tipos = bytes(vista[pos:pos + bytes_tipos])
+        pos += bytes_tipos + _relleno(bytes_tipos)
+        self.tipos = [texto_tipos[desp_tipos[i]:desp_tipos[i + 1]].decode('utf-8')
+                      for i in range(n_tipos)]
+        self._desp_valores, pos = self._seccion(vista, pos, 'I', n_valores + 1)
+        self._texto_valores = self._vista(vista[pos:pos + bytes_valores])
+        self._cache_valores = [None] * n_valores
+
+    def _vista(self, datos):
+        vista = memoryview(datos)
+        self._vistas.append(vista)
+        return vista
+
+    def _seccion(self, vista, pos, tipo, cantidad):
+        tam = array.array(tipo).itemsize * cantidad
+        if sys.byteorder == 'little':
+            seccion = self._vista(vista[pos:pos + tam].cast(tipo))
+        else:
+            seccion = array.array(tipo, vista[pos:pos + tam].tobytes())
+            seccion.byteswap()
+        return seccion, pos + tam + _relleno(tam)
+
+    def __len__(self):
+        return len(self.ids_tipo)
+
+    def __getitem__(self, i):
+        return self.tipos[self.ids_tipo[i]], self.valor(i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def tipo(self, i):
+        return self.tipos[self.ids_tipo[i]]
+
+    def valor(self, i):
+        id_valor = self.ids_valor[i]
+        valor = self._cache_valores[id_valor]
+        if valor is None:
+            inicio, fin = self._desp_valores[id_valor], self._desp_valores[id_valor + 1]
+            valor = self._cache_valores[id_valor] = str(self._texto_valores[inicio:fin], 'utf-8')
+        return valor
+
+    def linea(self, i):
+        return self.lineas[i]
+
+    def cerrar(self):
+        # Las vistas deben liberarse antes de cerrar el mmap subyacente
+        for vista in reversed(self._vistas):
+            vista.release()
+        self._vistas = []
+        if isinstance(self._datos, mmap.mmap):
+            self._datos.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+def abrir_tokens(ruta):
+    """Abre un archivo de tokens.
+
+    Los archivos binarios se mapean en memoria. Los archivos de texto con el
+    formato anterior ("TIPO:valor" separados por espacios) se convierten al
+    vuelo para que todas las etapas trabajen con la misma interfaz.
+    """
+    with open(ruta, 'rb') as archivo:
+        if archivo.read(len(MAGICO)) == MAGICO:
+            return FlujoTokens(mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ))
+
+    constructor = ConstructorTokens()
+    with open(ruta, 'r') as archivo:
+        for linea in archivo:
+            for token in linea.split():
+                tipo, _, valor = token.partition(':')
+                constructor.agregar(tipo, valor)
+    return FlujoTokens(constructor.a_bytes())
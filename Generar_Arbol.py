@@ -1,20 +1,11 @@
-import re
-from graphviz import Digraph
-
-class Nodo:
-    def __init__(self, etiqueta, identificador, valor=None):
-        self.etiqueta = etiqueta
-        self.identificador = identificador
-        self.valor = valor
-        self.hijos = []
-        self.padre = None  # Atributo para almacenar el nodo padre
-
-    def agregar_hijo(self, hijo):
-        self.hijos.append(hijo)
-        hijo.padre = self  # Asigna el nodo actual como el padre del hijo
-
-    def es_hoja(self):
-        return len(self.hijos) == 0
+import argparse
+import contextlib
+import os
+from collections import OrderedDict
+from Flujo_Tokens import abrir_tokens
+from Exportar_Arbol import FORMATOS, ExportadorDot, crear_exportador, exportar_arbol
+from Arbol_Sintactico import Nodo
+from AnalizadorSintactico import LLParser, TRACE_OFF
 
 def cargar_gramatica(nombre_archivo):
     gramatica = {}
@@ -31,11 +22,8 @@ def cargar_gramatica(nombre_archivo):
     return gramatica
 
 def cargar_tokens(nombre_archivo):
-    tokens = []
-    with open(nombre_archivo, 'r') as archivo:
-        for linea in archivo:
-            tokens.extend(linea.strip().split())
-    return tokens
+    # Flujo de tokens binario (o de texto, convertido al vuelo); tokens[i] es (tipo, valor)
+    return abrir_tokens(nombre_archivo)
 
 def cargar_no_terminales(nombre_archivo):
     no_terminales = set()
@@ -44,103 +32,255 @@ def cargar_no_terminales(nombre_archivo):
             no_terminales.add(linea.strip())
     return no_terminales
 
-def generar_arbol_sintactico(gramatica, tokens, no_terminales):
-    dot = Digraph(comment='Arbol Sintactico')
+# Entradas máximas de la tabla de memorización del modo packrat
+TAM_MEMO = 200000
+
+# Resultado de una llamada que todavía se está calculando en la pila
+PENDIENTE = object()
+
+class _Marco:
+    """Estado de un no terminal en análisis dentro de generar_arbol_sintactico."""
+    __slots__ = ('no_terminal', 'index', 'producciones', 'produccion', 'simbolo', 'hijos', 'nuevo_index')
+
+    def __init__(self, no_terminal, index, producciones):
+        self.no_terminal = no_terminal
+        self.index = index
+        self.producciones = producciones  # Ordenadas por prioridad
+        self.produccion = 0               # Producción que se está probando
+        self.simbolo = 0                  # Siguiente símbolo de esa producción
+        self.hijos = []
+        self.nuevo_index = index
+
+def generar_arbol_sintactico(gramatica, tokens, no_terminales, packrat=True, tam_memo=TAM_MEMO, estadisticas=None,
+                             exportador=None):
+    """Construye el árbol con el analizador descendente con retroceso.
+
+    En modo packrat el resultado de cada par (no terminal, posición) se guarda
+    en una tabla acotada a `tam_memo` entradas (se desaloja la usada hace más
+    tiempo), así que cada alternativa reintentada no vuelve a analizar lo que
+    ya se analizó. Si se pasa el diccionario `estadisticas`, se llenan los
+    contadores de aciertos y fallos de la tabla, desalojos y retrocesos.
+
+    Las llamadas a cada no terminal se llevan en una pila explícita de
+    marcos, no en la pila de Python, así que el tamaño del programa solo está
+    limitado por la memoria.
+
+    Si se da un `exportador` (ver Exportar_Arbol), el árbol final se le envía
+    al terminar; los intentos descartados nunca se exportan.
+    """
     contador_nodos = 0
-    nodos = {}
+    memo = OrderedDict()
+    if estadisticas is None:
+        estadisticas = {}
+    estadisticas.update(memo_aciertos=0, memo_fallos=0, desalojos=0, retrocesos=0)
+
+    # Tipos de token precalculados (referencias a las cadenas del flujo) y, por
+    # cada no terminal, sus producciones sin EPSILON y si acepta la cadena vacía
+    tipos = [tokens.tipos[id_tipo] for id_tipo in tokens.ids_tipo]
+    n_tokens = len(tipos)
+    producciones_de = {no_terminal: [[simbolo for simbolo in produccion if simbolo != "''"] for produccion in producciones]
+                       for no_terminal, producciones in gramatica.items()}
+    acepta_vacio = {no_terminal: any("''" in produccion for produccion in producciones)
+                    for no_terminal, producciones in gramatica.items()}
 
     def agregar_nodo(etiqueta, valor=None):
         nonlocal contador_nodos
         nodo = Nodo(etiqueta, f'N{contador_nodos}', valor)
-        dot.node(nodo.identificador, f'{etiqueta}\n{valor}' if valor else etiqueta)
         contador_nodos += 1
         return nodo
 
-    def parser(no_terminal, tokens, index):
+    # Pila explícita de llamadas: cada marco es un no terminal en curso de
+    # análisis, así que la profundidad del programa no depende de la pila de Python
+    pila = []
+
+    def llamar(no_terminal, index):
+        # Devuelve (nodo, índice) si el resultado se conoce de inmediato, o
+        # PENDIENTE tras apilar el marco que lo calculará
         if no_terminal not in gramatica:
             print(f"No se encuentra el no terminal: {no_terminal}")
             return None, index
+        if packrat:
+            resultado = memo.get((no_terminal, index))
+            if resultado is not None:
+                estadisticas['memo_aciertos'] += 1
+                memo.move_to_end((no_terminal, index))
+                return resultado
+            estadisticas['memo_fallos'] += 1
+        producciones = sorted(producciones_de[no_terminal], key=lambda p: evaluar_prioridad(p, index), reverse=True)
+        pila.append(_Marco(no_terminal, index, producciones))
+        return PENDIENTE
 
-        producciones = sorted(gramatica[no_terminal], key=lambda p: evaluar_prioridad(p, tokens, index), reverse=True)
-        for produccion in producciones:
-            hijos = []
-            nuevo_index = index
-            exito = True
-            for simbolo in produccion:
-                if simbolo in gramatica:
-                    nodo_hijo, nuevo_index = parser(simbolo, tokens, nuevo_index)
-                    if nodo_hijo is None:
-                        exito = False
-                        break
-                    hijos.append(nodo_hijo)
-                else:
-                    if simbolo == "''":
-                        continue
-                    if nuevo_index < len(tokens) and re.match(f'{simbolo}:.*', tokens[nuevo_index]):
-                        token_tipo, token_valor = tokens[nuevo_index].split(':')
-                        nodo_hijo = agregar_nodo(token_tipo, token_valor)
-                        hijos.append(nodo_hijo)
-                        nuevo_index += 1
-                    else:
-                        exito = False
-                        break
-
-            if exito:
-                nodo_actual = agregar_nodo(no_terminal)
-                for hijo in hijos:
-                    nodo_actual.agregar_hijo(hijo)
-                    dot.edge(nodo_actual.identificador, hijo.identificador)
-                return nodo_actual, nuevo_index
-
-        # Si ninguna producción tiene éxito, aceptar cadena vacía si es posible
-        if "''" in [simbolo for produccion in gramatica[no_terminal] for simbolo in produccion]:
-            return agregar_nodo(no_terminal), index
+    def terminar(marco, resultado):
+        pila.pop()
+        # Una derivación vacía no se memoriza: podría aparecer dos veces en el árbol
+        # final en la misma posición y el nodo quedaría compartido
+        if packrat and (resultado[0] is None or resultado[1] != marco.index):
+            memo[(marco.no_terminal, marco.index)] = resultado
+            if len(memo) > tam_memo:
+                memo.popitem(last=False)
+                estadisticas['desalojos'] += 1
+        return resultado
 
-        return None, index
+    def retroceder(marco):
+        # Descartar la producción actual y pasar a la siguiente
+        estadisticas['retrocesos'] += 1
+        marco.produccion += 1
+        marco.simbolo = 0
+        marco.hijos = []
+        marco.nuevo_index = marco.index
 
-    def evaluar_prioridad(produccion, tokens, index):
+    def evaluar_prioridad(produccion, index):
         # Evaluar cuántos tokens coinciden con la producción desde el índice actual
         coincidencias = 0
         for simbolo in produccion:
-            if index + coincidencias < len(tokens):
-                token = tokens[index + coincidencias]
-                if simbolo in gramatica or re.match(f'{simbolo}:.*', token):
-                    coincidencias += 1
-                else:
-                    break
+            if index + coincidencias < n_tokens and (simbolo in gramatica or tipos[index + coincidencias] == simbolo):
+                coincidencias += 1
             else:
                 break
         return coincidencias
 
-    raiz, _ = parser('PROGRAMA', tokens, 0)
+    resultado = llamar('PROGRAMA', 0)
+    while pila:
+        marco = pila[-1]
+        if resultado is not PENDIENTE:
+            # Volvemos de un no terminal hijo
+            nodo_hijo, nuevo_index = resultado
+            resultado = PENDIENTE
+            if nodo_hijo is None:
+                retroceder(marco)
+            else:
+                marco.hijos.append(nodo_hijo)
+                marco.nuevo_index = nuevo_index
+                marco.simbolo += 1
+
+        while marco.produccion < len(marco.producciones):
+            produccion = marco.producciones[marco.produccion]
+            if marco.simbolo == len(produccion):
+                nodo_actual = agregar_nodo(marco.no_terminal)
+                for hijo in marco.hijos:
+                    nodo_actual.agregar_hijo(hijo)
+                resultado = terminar(marco, (nodo_actual, marco.nuevo_index))
+                break
+            simbolo = produccion[marco.simbolo]
+            if simbolo in gramatica:
+                resultado = llamar(simbolo, marco.nuevo_index)
+                break
+            if marco.nuevo_index < n_tokens and tipos[marco.nuevo_index] == simbolo:
+                marco.hijos.append(agregar_nodo(simbolo, tokens.valor(marco.nuevo_index)))
+                marco.nuevo_index += 1
+                marco.simbolo += 1
+            else:
+                retroceder(marco)
+        else:
+            # Si ninguna producción tiene éxito, aceptar cadena vacía si es posible
+            if acepta_vacio[marco.no_terminal]:
+                resultado = terminar(marco, (agregar_nodo(marco.no_terminal), marco.index))
+            else:
+                resultado = terminar(marco, (None, marco.index))
+
+    raiz, _ = resultado
     if raiz:
-        agregar_epsilon_a_hojas(raiz, dot, no_terminales)
-        dot.render('arbol_sintactico', format='png', cleanup=True)
-        print("Árbol sintáctico generado con éxito y guardado en arbol_sintactico.png")
+        agregar_epsilon_a_hojas(raiz, None, no_terminales)
+        if exportador is not None:
+            exportar_arbol(raiz, exportador)
         return raiz
     else:
-        print("No se pudo generar el árbol sintáctico")
         return None
 
 def agregar_epsilon_a_hojas(nodo, dot, no_terminales):
-    if nodo.es_hoja() and nodo.etiqueta in no_terminales:
-        epsilon_nodo = Nodo("ε", f'N{nodo.identificador}_epsilon')
-        dot.node(epsilon_nodo.identificador, "ε")
-        nodo.agregar_hijo(epsilon_nodo)
-        dot.edge(nodo.identificador, epsilon_nodo.identificador)
-    else:
-        for hijo in nodo.hijos:
-            agregar_epsilon_a_hojas(hijo, dot, no_terminales)
+    pendientes = [nodo]
+    while pendientes:
+        nodo = pendientes.pop()
+        if nodo.es_hoja() and nodo.etiqueta in no_terminales:
+            epsilon_nodo = Nodo("ε", f'N{nodo.identificador}_epsilon')
+            nodo.agregar_hijo(epsilon_nodo)
+            if dot is not None:
+                dot.node(epsilon_nodo.identificador, "ε")
+                dot.edge(nodo.identificador, epsilon_nodo.identificador)
+        else:
+            pendientes.extend(reversed(nodo.hijos))
+
+def construir_arbol(nombre_archivo_gramatica, tokens, exportador=None):
+    """Construye el árbol sintáctico en una sola pasada con la tabla LL(1).
+
+    Devuelve la raíz (con hojas ε en los no terminales vacíos, igual que
+    generar_arbol_sintactico) o None si la entrada tiene errores. Con un
+    `exportador`, cada nodo se escribe en cuanto el analizador lo crea.
+    """
+    analizador = LLParser(nombre_archivo_gramatica, tokens)
+    analizador.parse_input(TRACE_OFF, build_tree=True, exporter=exportador)
+    if exportador is not None:
+        exportador.terminar()
+    for posicion, linea, mensaje in analizador.errors:
+        print(f"Error sintáctico en el token {posicion} (línea {linea}): {mensaje}")
+    return analizador.tree
+
+def renderizar_dot(ruta_dot, nombre_salida='arbol_sintactico'):
+    """Convierte a PNG un archivo DOT ya escrito y lo borra."""
+    # graphviz solo se importa cuando de verdad se va a dibujar
+    import graphviz
+    graphviz.render('dot', 'png', ruta_dot, outfile=f'{nombre_salida}.png')
+    os.remove(ruta_dot)
+
+def dibujar_arbol(raiz, nombre_salida='arbol_sintactico'):
+    """Dibuja con graphviz un árbol ya construido."""
+    ruta_dot = f'{nombre_salida}.dot'
+    with open(ruta_dot, 'w') as salida:
+        exportar_arbol(raiz, ExportadorDot(salida))
+    renderizar_dot(ruta_dot, nombre_salida)
 
 def main():
+    argumentos = argparse.ArgumentParser(description="Generador del árbol sintáctico")
+    argumentos.add_argument('--retroceso', action='store_true',
+                            help='usa el analizador con retroceso en lugar de la tabla LL(1)')
+    argumentos.add_argument('--sin-memo', action='store_true',
+                            help='desactiva la memorización (packrat) del analizador con retroceso')
+    argumentos.add_argument('--formato', choices=['png', *FORMATOS, 'ninguno'], default='png',
+                            help='formato de salida del árbol (png se dibuja con graphviz a partir del DOT)')
+    argumentos.add_argument('--salida', default='arbol_sintactico',
+                            help='nombre del archivo de salida, sin extensión')
+    argumentos.add_argument('--profundidad-max', type=int, default=None,
+                            help='solo exporta los nodos hasta esta profundidad')
+    argumentos.add_argument('--subarbol', default=None,
+                            help='solo exporta los subárboles con raíz en este no terminal')
+    opciones = argumentos.parse_args()
+
     nombre_archivo_gramatica = 'Gramatica.txt'
-    nombre_archivo_tokens = 'tokens.txt'
+    nombre_archivo_tokens = 'tokens.bin'
     nombre_archivo_no_terminales = 'no_terminales.txt'
 
-    gramatica = cargar_gramatica(nombre_archivo_gramatica)
     tokens = cargar_tokens(nombre_archivo_tokens)
-    no_terminales = cargar_no_terminales(nombre_archivo_no_terminales)
-    raiz = generar_arbol_sintactico(gramatica, tokens, no_terminales)
-    
+    # El PNG se dibuja a partir del DOT, que se escribe mientras se construye el árbol
+    formato = 'dot' if opciones.formato == 'png' else opciones.formato
+    ruta_salida = None
+    with contextlib.ExitStack() as recursos:
+        exportador = None
+        if formato != 'ninguno':
+            ruta_salida = opciones.salida + FORMATOS[formato][1]
+            salida = recursos.enter_context(open(ruta_salida, 'w', encoding='utf-8'))
+            exportador = crear_exportador(formato, salida, opciones.profundidad_max, opciones.subarbol)
+
+        if opciones.retroceso:
+            gramatica = cargar_gramatica(nombre_archivo_gramatica)
+            no_terminales = cargar_no_terminales(nombre_archivo_no_terminales)
+            estadisticas = {}
+            raiz = generar_arbol_sintactico(gramatica, tokens, no_terminales, not opciones.sin_memo,
+                                            estadisticas=estadisticas, exportador=exportador)
+            print(f"Memo: {estadisticas['memo_aciertos']} aciertos, {estadisticas['memo_fallos']} fallos, "
+                  f"{estadisticas['desalojos']} desalojos; retrocesos: {estadisticas['retrocesos']}")
+        else:
+            raiz = construir_arbol(nombre_archivo_gramatica, tokens, exportador)
+
+    if not raiz:
+        print("No se pudo generar el árbol sintáctico")
+        return
+    if opciones.formato == 'png':
+        renderizar_dot(ruta_salida, opciones.salida)
+        ruta_salida = f'{opciones.salida}.png'
+    if ruta_salida:
+        print(f"Árbol sintáctico generado con éxito ({exportador.nodos_escritos} nodos) y guardado en {ruta_salida}")
+    else:
+        print("Árbol sintáctico generado con éxito")
+
 if __name__ == "__main__":
     main()
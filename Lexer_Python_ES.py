@@ -1,5 +1,17 @@
 import ply.lex as lex
 import json  # Importar json para serializar las cadenas
+import os
+import re
+import sys
+import time
+import glob
+import hashlib
+import argparse
+import linecache
+import tempfile
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor
+from Flujo_Tokens import ConstructorTokens
 
 # Lista de tokens
 tokens = (
@@ -106,42 +118,310 @@ def t_newline(t):
 t_ignore = ' \t'
 
 def t_error(t):
-    print(f"Carácter ilegal: {t.value[0]}")
+    # Si el lexer tiene una lista de errores (modo por lotes) se registra ahí
+    errores = getattr(t.lexer, 'errores', None)
+    if errores is not None:
+        errores.append((t.lexer.lineno, t.value[0]))
+    else:
+        print(f"Carácter ilegal: {t.value[0]}")
     t.lexer.skip(1)
 
+# Directorio donde se guardan las tablas compiladas del lexer
+DIR_CACHE_LEXER = os.path.join(os.path.dirname(os.path.abspath(__file__)), '__lexcache__')
+
+def huella_especificacion():
+    """Calcula un hash de la especificación de tokens.
+
+    Incluye la lista de tokens, las palabras reservadas, las expresiones de
+    las reglas `t_*` (y el orden de las reglas definidas como función, que
+    PLY respeta al construir la expresión maestra) y la versión de PLY.
+    """
+    modulo = sys.modules[__name__]
+    h = hashlib.sha256()
+    h.update(repr((lex.__version__, lex.__tabversion__, tokens, sorted(reserved.items()))).encode())
+    reglas = []
+    for nombre, valor in vars(modulo).items():
+        if not nombre.startswith('t_'):
+            continue
+        if callable(valor):
+            reglas.append((0, valor.__code__.co_firstlineno, nombre, valor.__doc__))
+        else:
+            reglas.append((1, 0, nombre, valor))
+    for regla in sorted(reglas):
+        h.update(repr(regla[2:]).encode())
+    return h.hexdigest()
+
+def _cargar_tabla(ruta, nombre):
+    spec = importlib.util.spec_from_file_location(nombre, ruta)
+    tabla = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(tabla)
+    if getattr(tabla, '_tabversion', None) != lex.__tabversion__:
+        raise ImportError('Versión de PLY inconsistente')
+    return tabla
+
+def construir_lexer(dir_cache=DIR_CACHE_LEXER):
+    """Construye el lexer reutilizando la tabla compilada si existe.
+
+    La tabla se guarda en `dir_cache` con el nombre `lextab_<hash>.py`, donde
+    el hash es el de `huella_especificacion()`. Si alguna regla cambia, el
+    nombre ya no coincide y la tabla se reconstruye y valida automáticamente.
+    """
+    nombre = f"lextab_{huella_especificacion()[:16]}"
+    ruta = os.path.join(dir_cache, nombre + '.py')
+
+    if os.path.exists(ruta):
+        try:
+            return lex.lex(optimize=1, lextab=_cargar_tabla(ruta, nombre))
+        except (ImportError, SyntaxError, AttributeError, KeyError):
+            pass  # Tabla dañada o de otra versión: reconstruir
+
+    nuevo_lexer = lex.lex()
+    try:
+        os.makedirs(dir_cache, exist_ok=True)
+        # Escribir con un nombre temporal y renombrar para que otros procesos
+        # nunca lean una tabla a medio escribir
+        temporal = f"{nombre}_{os.getpid()}"
+        nuevo_lexer.writetab(temporal, dir_cache)
+        os.replace(os.path.join(dir_cache, temporal + '.py'), ruta)
+        for anterior in glob.glob(os.path.join(dir_cache, 'lextab_*.py')):
+            if anterior != ruta and not os.path.basename(anterior).startswith(nombre):
+                os.remove(anterior)
+    except OSError:
+        pass  # Sin cache en disco; el lexer sigue siendo válido
+    return nuevo_lexer
+
+def medir_arranque(repeticiones=20):
+    """Mide el tiempo de construcción del lexer sin cache (frío) y con cache (tibio).
+
+    Antes de cada medición se vacían las caches de `re` y `linecache` para
+    reproducir lo que paga un proceso nuevo.
+    """
+    with tempfile.TemporaryDirectory() as dir_cache:
+        frio = []
+        for _ in range(repeticiones):
+            for anterior in glob.glob(os.path.join(dir_cache, '*.py')):
+                os.remove(anterior)
+            re.purge()
+            linecache.clearcache()
+            inicio = time.perf_counter()
+            construir_lexer(dir_cache)
+            frio.append(time.perf_counter() - inicio)
+        tibio = []
+        for _ in range(repeticiones):
+            re.purge()
+            linecache.clearcache()
+            inicio = time.perf_counter()
+            construir_lexer(dir_cache)
+            tibio.append(time.perf_counter() - inicio)
+    return min(frio), min(tibio)
+
 # Construir el lexer
-lexer = lex.lex()
+lexer = construir_lexer()
+
+# Tamaño de bloque (en caracteres) con el que se lee la entrada
+TAM_BLOQUE = 1 << 16
 
 # Leer el archivo de entrada
 def leer_archivo_entrada(nombre_archivo):
     with open(nombre_archivo, "r") as file:
         return file.read()
 
-# Prueba del lexer con data desde un archivo de texto
-nombre_archivo = "codigo.txt"
-data = leer_archivo_entrada(nombre_archivo)
+# Caracteres que interesan al buscar dónde cortar un bloque
+_DELIMITADORES = re.compile(r'[\n\'"#]')
+_CADENA = re.compile(t_CADENA.__doc__, re.VERBOSE)
+
+def _ultimo_corte(texto, pos=0):
+    """Busca el último salto de línea de `texto` donde se puede cortar un bloque.
+
+    t_CADENA acepta saltos de línea entre comillas, así que el corte no puede
+    caer dentro de una cadena. El recorrido empieza en `pos` (fuera de
+    cadenas y comentarios) y salta las cadenas completas y los comentarios;
+    se detiene en una comilla cuya cadena todavía no se cierra, porque puede
+    cerrarse en el siguiente bloque. Devuelve (corte, pos): el índice que
+    sigue al salto de línea (0 si no hay ninguno) y la posición donde seguir
+    el recorrido cuando llegue más texto.
+    """
+    corte = 0
+    while True:
+        delimitador = _DELIMITADORES.search(texto, pos)
+        if delimitador is None:
+            return corte, len(texto)
+        pos = delimitador.start()
+        caracter = texto[pos]
+        if caracter == '\n':
+            pos += 1
+            corte = pos
+        elif caracter == '#':
+            fin = texto.find('\n', pos)
+            if fin < 0:
+                return corte, pos
+            pos = fin
+        else:
+            cadena = _CADENA.match(texto, pos)
+            if cadena is None:
+                return corte, pos
+            pos = cadena.end()
+
+def tokenize(fuente, tam_bloque=TAM_BLOQUE, errores=None):
+    """Genera los tokens de `fuente` de forma perezosa.
+
+    `fuente` puede ser la ruta de un archivo o un objeto de archivo de texto.
+    La entrada se lee por bloques que se cortan en el último salto de línea
+    fuera de una cadena, de modo que la memoria usada no depende del tamaño
+    del programa y los tokens no dependen de `tam_bloque`. Cada
+    token conserva su número de línea, su posición absoluta (`lexpos`) y la
+    longitud del lexema en la fuente (`longitud`).
 
-lexer.input(data)
+    Si se pasa la lista `errores`, los caracteres ilegales se agregan a ella
+    como tuplas (línea, carácter) en lugar de imprimirse.
+    """
+    if isinstance(fuente, (str, os.PathLike)):
+        with open(fuente, "r") as archivo:
+            yield from tokenize(archivo, tam_bloque, errores)
+        return
 
-# Tokenizar e imprimir los tipos de tokens junto con sus valores
-tokens_list = []
-tokens_only_list = []
+    # Cada generador usa su propia copia del lexer para no compartir estado
+    lexer_local = lexer.clone()
+    lexer_local.lineno = 1
+    lexer_local.errores = errores
+    base = 0
+    pendiente = ''
+    revisado = 0  # Hasta dónde se recorrió `pendiente` buscando el corte
+    while True:
+        bloque = fuente.read(tam_bloque)
+        if bloque:
+            pendiente += bloque
+            corte, revisado = _ultimo_corte(pendiente, revisado)
+            if corte == 0:
+                # La línea (o una cadena abierta) es más larga que el bloque; seguir leyendo
+                continue
+            pieza, pendiente = pendiente[:corte], pendiente[corte:]
+            revisado -= corte
+        else:
+            pieza, pendiente = pendiente, ''
 
-while True:
-    tok = lexer.token()
-    if not tok:
-        break
+        if pieza:
+            lexer_local.input(pieza)
+            for tok in iter(lexer_local.token, None):
+                tok.longitud = lexer_local.lexpos - tok.lexpos
+                tok.lexpos += base
+                yield tok
+            base += len(pieza)
+
+        if not bloque:
+            break
+
+def valor_texto(tok):
+    """Devuelve el valor del token tal como se guarda en los archivos de tokens."""
     if tok.type == 'CADENA':
         # Utiliza json.dumps para serializar la cadena con dobles comillas
-        tokens_list.append(f"{tok.type}:{json.dumps(tok.value)}")
-    else:
-        tokens_list.append(f"{tok.type}:{tok.value}")
-    tokens_only_list.append(f"{tok.type}")
+        return json.dumps(tok.value)
+    return str(tok.value)
+
+def construir_flujo(fuente, errores=None):
+    """Tokeniza `fuente` y devuelve un ConstructorTokens listo para escribirse."""
+    constructor = ConstructorTokens()
+    for tok in tokenize(fuente, errores=errores):
+        constructor.agregar(tok.type, valor_texto(tok), tok.lexpos, tok.longitud, tok.lineno)
+    return constructor
+
+def escribir_tokens_texto(fuente, archivo_tokens="tokens.txt", archivo_tipos="tokens_only.txt"):
+    """Escribe los tokens en el formato de texto anterior ("TIPO:valor")."""
+    with open(archivo_tokens, "w") as salida_tokens, open(archivo_tipos, "w") as salida_tipos:
+        separador = ""
+        for tok in tokenize(fuente):
+            salida_tokens.write(f"{separador}{tok.type}:{valor_texto(tok)}")
+            salida_tipos.write(f"{separador}{tok.type}")
+            separador = " "
+
+def _lexear_archivo(ruta, ruta_salida):
+    """Tarea de un trabajador del lote: tokeniza un archivo y escribe su flujo binario."""
+    errores = []
+    inicio = time.perf_counter()
+    try:
+        constructor = construir_flujo(ruta, errores)
+        os.makedirs(os.path.dirname(ruta_salida) or '.', exist_ok=True)
+        constructor.escribir(ruta_salida)
+    except (OSError, UnicodeDecodeError) as error:
+        return ruta, 0, [(0, str(error))], time.perf_counter() - inicio
+    return ruta, len(constructor), errores, time.perf_counter() - inicio
+
+def expandir_entradas(entradas, patron="*.txt"):
+    """Convierte una lista de archivos y directorios en la lista de archivos a tokenizar."""
+    rutas = []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            rutas.extend(sorted(glob.glob(os.path.join(entrada, '**', patron), recursive=True)))
+        else:
+            rutas.append(entrada)
+    return rutas
+
+def lexear_lote(rutas, dir_salida, procesos=None):
+    """Tokeniza muchos archivos en paralelo con un ProcessPoolExecutor.
+
+    Cada proceso importa este módulo una sola vez, así que construye (o carga
+    de la cache) el lexer una vez y lo reutiliza para todos sus archivos. Por
+    cada entrada se escribe `<dir_salida>/<ruta relativa>.tokens.bin`.
+    Devuelve la lista de (ruta, tokens, errores, segundos) y el tiempo total.
+    """
+    if not rutas:
+        return [], 0.0
+    base = os.path.commonpath([os.path.dirname(os.path.abspath(ruta)) for ruta in rutas])
+    salidas = [os.path.join(dir_salida, os.path.relpath(os.path.abspath(ruta), base) + '.tokens.bin')
+               for ruta in rutas]
+
+    procesos = procesos or os.cpu_count() or 1
+    tam_lote = max(1, len(rutas) // (4 * procesos))
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+        resultados = list(ejecutor.map(_lexear_archivo, rutas, salidas, chunksize=tam_lote))
+    return resultados, time.perf_counter() - inicio
+
+def reportar_lote(resultados, segundos):
+    total_tokens = sum(tokens for _, tokens, _, _ in resultados)
+    con_errores = [(ruta, errores) for ruta, _, errores, _ in resultados if errores]
+    for ruta, errores in con_errores:
+        for linea, caracter in errores:
+            print(f"{ruta}:{linea}: Carácter ilegal: {caracter}")
+    print(f"Archivos: {len(resultados)} ({len(con_errores)} con errores)")
+    print(f"Tokens: {total_tokens} en {segundos:.2f} s "
+          f"({total_tokens / segundos if segundos else 0:.0f} tokens/s)")
+
+def main():
+    argumentos = argparse.ArgumentParser(description="Analizador léxico")
+    argumentos.add_argument("--medir-arranque", action="store_true",
+                            help="mide la construcción del lexer con y sin cache")
+    argumentos.add_argument("--texto", action="store_true",
+                            help="escribe también tokens.txt y tokens_only.txt en formato de texto")
+    argumentos.add_argument("--lote", nargs="+", metavar="ENTRADA",
+                            help="archivos o directorios a tokenizar en paralelo")
+    argumentos.add_argument("--patron", default="*.txt",
+                            help="patrón de archivos a buscar en los directorios del lote")
+    argumentos.add_argument("--salida", default="tokens_lote",
+                            help="directorio donde se escriben los flujos del lote")
+    argumentos.add_argument("--procesos", type=int, default=None,
+                            help="número de procesos del lote (por defecto, uno por CPU)")
+    opciones = argumentos.parse_args()
+
+    if opciones.lote:
+        rutas = expandir_entradas(opciones.lote, opciones.patron)
+        resultados, segundos = lexear_lote(rutas, opciones.salida, opciones.procesos)
+        reportar_lote(resultados, segundos)
+        return
+
+    if opciones.medir_arranque:
+        frio, tibio = medir_arranque()
+        print(f"Arranque en frío: {frio * 1000:.2f} ms")
+        print(f"Arranque con cache: {tibio * 1000:.2f} ms ({frio / tibio:.1f}x)")
+        return
+
+    # Prueba del lexer con data desde un archivo de texto
+    nombre_archivo = "codigo.txt"
 
-# Guardar los tokens en un archivo tokens.txt
-with open("tokens.txt", "w") as file:
-    file.write(" ".join(tokens_list))
+    # Guardar los tokens en el flujo binario tokens.bin
+    construir_flujo(nombre_archivo).escribir("tokens.bin")
+    if opciones.texto:
+        escribir_tokens_texto(nombre_archivo)
 
-# Guardar solo los tipos de tokens en un archivo tokens_only.txt
-with open("tokens_only.txt", "w") as file:
-    file.write(" ".join(tokens_only_list))
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,580 @@
+import argparse
+import io
+import os
+import random
+import re
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import Proyecto_Simbolos
+import Compilador
+import Tabla_Simbolos
+import Tabla_Sintactica
+from AnalizadorSintactico import LLParser, TRACE_OFF
+from Arbol_Abstracto import construir_ast
+from Asignacion_Registros import ESCRIBEN_PRIMERO, GUARDADOS, SALTOS
+from Flujo_Tokens import ConstructorTokens, FlujoTokens
+from Generar_Arbol import cargar_tokens, construir_arbol
+from Lexer_Python_ES import construir_flujo, escribir_tokens_texto
+from pruebaSPIM import ASTSPIMGenerator
+from Sesion_Incremental import SesionIncremental
+
+# Mediciones de rendimiento de las etapas del compilador.
+# Uso: python Medir_Rendimiento.py <medicion> [opciones]
+
+REGISTRO_FISICO = re.compile(r'\$[ts]\d')
+
+
+def cronometrar(funcion, *args, **kwargs):
+    """Ejecuta `funcion` y devuelve (resultado, segundos)."""
+    inicio = time.perf_counter()
+    resultado = funcion(*args, **kwargs)
+    return resultado, time.perf_counter() - inicio
+
+
+def gramatica_sintetica(n_producciones, n_terminales=300, semilla=0):
+    """Genera una gramática aleatoria con `n_producciones` reglas.
+
+    Cada no terminal tiene unas tres producciones; los cuerpos mezclan
+    terminales y no terminales (incluyendo recursión) y una de cada diez
+    producciones es EPSILON.
+    """
+    rnd = random.Random(semilla)
+    n_nonterminales = max(1, n_producciones // 3)
+    reglas = []
+    for i in range(n_producciones):
+        cabeza = f"N{i % n_nonterminales}"
+        if rnd.random() < 0.1:
+            cuerpo = [Tabla_Sintactica.epsilon]
+        else:
+            cuerpo = [f"N{rnd.randrange(n_nonterminales)}" if rnd.random() < 0.5
+                      else f"t{rnd.randrange(n_terminales)}"
+                      for _ in range(rnd.randint(1, 4))]
+        reglas.append(f"{cabeza} -> {' '.join(cuerpo)}")
+    return reglas
+
+
+def medir_firsts_follows(tamanos):
+    """FIRST/FOLLOW con el motor de bitsets sobre gramáticas sintéticas."""
+    print(f"{'Producciones':>12} {'FIRST (s)':>10} {'FOLLOW (s)':>11} {'us/prod':>8}")
+    for tamano in tamanos:
+        reglas = gramatica_sintetica(tamano)
+        gramatica = Tabla_Sintactica.GramaticaInternada(reglas)
+        anulables = Tabla_Sintactica.collect_nullables(gramatica)
+        firsts, t_first = cronometrar(Tabla_Sintactica.collect_first_bits, gramatica, anulables)
+        _, t_follow = cronometrar(Tabla_Sintactica.collect_follow_bits, gramatica, anulables, firsts)
+        print(f"{tamano:>12} {t_first:>10.4f} {t_follow:>11.4f} {(t_first + t_follow) / tamano * 1e6:>8.2f}")
+
+
+# Tokens de "a = a + 2 @" y "print(a, 3) @"
+_PATRON_INSTRUCCIONES = [
+    ('IDENTIFICADOR', 'a'), ('IGUAL', '='), ('IDENTIFICADOR', 'a'), ('MAS', '+'), ('ENTERO', '2'), ('AT', '@'),
+    ('IMPRIMIR', 'print'), ('PARENTESIS_ABRIR', '('), ('IDENTIFICADOR', 'a'), ('COMA', ','), ('ENTERO', '3'),
+    ('PARENTESIS_CERRAR', ')'), ('AT', '@'),
+]
+
+
+def flujo_sintetico(n_tokens):
+    """Construye en memoria un flujo de unos `n_tokens` tokens de instrucciones válidas."""
+    constructor = ConstructorTokens()
+    for _ in range(max(1, n_tokens // len(_PATRON_INSTRUCCIONES))):
+        for tipo, valor in _PATRON_INSTRUCCIONES:
+            constructor.agregar(tipo, valor)
+    return FlujoTokens(constructor.a_bytes())
+
+
+def medir_analizador(tamanos):
+    """Análisis LL(1) sin rastreo sobre flujos sintéticos."""
+    print(f"{'Tokens':>10} {'Tiempo (s)':>11} {'Tokens/s':>11}")
+    for tamano in tamanos:
+        analizador = LLParser("Gramatica.txt", flujo_sintetico(tamano))
+        aceptado, segundos = cronometrar(analizador.parse_input, TRACE_OFF)
+        assert aceptado
+        n_tokens = len(analizador.tokens)
+        print(f"{n_tokens:>10} {segundos:>11.3f} {n_tokens / segundos:>11.0f}")
+
+
+def programa_sintetico(n_instrucciones, prefijo=""):
+    """Código fuente con `n_instrucciones` instrucciones de primer nivel.
+
+    Mezcla asignaciones, impresiones, ciclos y funciones con nombres
+    distintos para que la tabla de símbolos también crezca. `prefijo` se
+    antepone a los nombres de variables y funciones.
+    """
+    v, f, r = f"{prefijo}v", f"{prefijo}f", f"{prefijo}r"
+    lineas = [f"{v}0 = 1@"]
+    for i in range(1, n_instrucciones):
+        if i % 4 == 1:
+            lineas.append(f"{v}{i} = {v}{i - 1} + {i} * 2@")
+        elif i % 4 == 2:
+            lineas.append(f"print({v}{i - 1}, 3)@")
+        elif i % 4 == 3:
+            lineas.append(f"while ({v}{i - 2} > 1) {{ {v}{i - 2} = {v}{i - 2} - 1@ }}")
+        else:
+            lineas.append(f"def {f}{i}(a, b) {{ {r}{i} = a + b@ return {r}{i}@ }}")
+    return "\n".join(lineas) + "\n"
+
+
+def programa_anidado(profundidad):
+    """Una función con `profundidad` funciones anidadas, cada una con una asignación y un return."""
+    aperturas = [f"def f{i}(a{i}) {{ x{i} = a{i} + {i}@" for i in range(profundidad)]
+    cierres = [f"return x{i}@ }}" for i in reversed(range(profundidad))]
+    return "\n".join(aperturas + cierres) + "\n"
+
+
+def programa_funciones(n_funciones):
+    """Globales a, b, x, y y `n_funciones` funciones cuyos parámetros y locales los ocultan."""
+    lineas = ["a = 1@ b = 2@ x = 3@ y = 4@"]
+    for i in range(n_funciones):
+        lineas.append(f"def f{i}(a, b) {{ x = a + b@ y = x * {i}@ t{i} = y@ return t{i}@ }}")
+    return "\n".join(lineas) + "\n"
+
+
+def medir_simbolos(tamanos, profundidades, funciones):
+    """agregarSimbolos en un solo recorrido: el tiempo por nodo no crece con el tamaño ni con el anidamiento.
+
+    Los programas con muchas funciones ejercitan la cadena de ámbitos (cada
+    función abre y cierra el suyo y sus locales ocultan a los globales); al
+    final se mide la consulta de los símbolos de una función.
+    """
+    print(f"{'Programa':>20} {'Nodos':>9} {'Tiempo (s)':>11} {'us/nodo':>8} {'Simbolos':>9} {'Ambitos':>8}")
+    programas = [(f"{tamano} instrucciones", programa_sintetico(tamano)) for tamano in tamanos]
+    programas += [(f"{profundidad} anidadas", programa_anidado(profundidad)) for profundidad in profundidades]
+    programas += [(f"{n_funciones} funciones", programa_funciones(n_funciones)) for n_funciones in funciones]
+    for nombre, fuente in programas:
+        analizador = LLParser("Gramatica.txt", FlujoTokens(construir_flujo(io.StringIO(fuente)).a_bytes()))
+        analizador.parse_input(TRACE_OFF, build_tree=True)
+        raiz = analizador.tree
+        contexto = Tabla_Simbolos.ContextoCompilacion(nombre)
+        _, segundos = cronometrar(Tabla_Simbolos.agregarSimbolos, raiz, contexto)
+        tabla = contexto.tabla_simbolos
+        n_nodos = len(raiz.arena)
+        print(f"{nombre:>20} {n_nodos:>9} {segundos:>11.3f} {segundos / n_nodos * 1e6:>8.2f} "
+              f"{len(tabla):>9} {len(tabla.por_ambito):>8}")
+    # Consultas: el global visible y los locales de la última función
+    n_consultas = 100000
+    _, t_busqueda = cronometrar(lambda: [tabla.buscar_simbolo("x") for _ in range(n_consultas)])
+    _, t_ambito = cronometrar(lambda: [tabla.simbolos_de(f"f{funciones[-1] - 1}") for _ in range(n_consultas)])
+    print(f"buscar_simbolo: {t_busqueda / n_consultas * 1e9:.0f} ns; "
+          f"simbolos_de: {t_ambito / n_consultas * 1e9:.0f} ns")
+
+
+def medir_programas_grandes(tamanos):
+    """Lexer, árbol LL(1), tabla de símbolos y recorridos sobre programas largos.
+
+    La recursión por la derecha de INSTRUCCIONES hace que la profundidad del
+    árbol crezca con el número de instrucciones; todas las etapas usan pilas
+    explícitas, así que no hay límite de recursión que alcanzar.
+    """
+    print(f"{'Instrucciones':>13} {'Lexer (s)':>10} {'Arbol (s)':>10} {'Simbolos (s)':>13} "
+          f"{'Recorrido (s)':>14} {'Simbolos':>9}")
+    for tamano in tamanos:
+        fuente = io.StringIO(programa_sintetico(tamano))
+        constructor, t_lexer = cronometrar(construir_flujo, fuente)
+        flujo = FlujoTokens(constructor.a_bytes())
+        raiz, t_arbol = cronometrar(construir_arbol, "Gramatica.txt", flujo)
+        assert raiz is not None
+        contexto = Tabla_Simbolos.ContextoCompilacion()
+        _, t_simbolos = cronometrar(Tabla_Simbolos.agregarSimbolos, raiz, contexto)
+        tabla = contexto.tabla_simbolos
+        # Recorrido completo: juntar los valores de todo el árbol
+        _, t_recorrido = cronometrar(Tabla_Simbolos.obtener_descendientes, raiz)
+        print(f"{tamano:>13} {t_lexer:>10.3f} {t_arbol:>10.3f} {t_simbolos:>13.3f} "
+              f"{t_recorrido:>14.3f} {len(tabla):>9}")
+
+
+def medir_memoria_arbol(tamanos):
+    """Memoria retenida por el árbol en arena frente al mismo árbol con objetos Nodo."""
+    print(f"{'Instrucciones':>13} {'Nodos':>9} {'Arena (MB)':>11} {'Nodo (MB)':>10} "
+          f"{'B/nodo arena':>13} {'B/nodo Nodo':>12} {'Reduccion':>10}")
+    for tamano in tamanos:
+        flujo = FlujoTokens(construir_flujo(io.StringIO(programa_sintetico(tamano))).a_bytes())
+        tracemalloc.start()
+        inicio = tracemalloc.get_traced_memory()[0]
+        analizador = LLParser("Gramatica.txt", flujo)
+        analizador.parse_input(TRACE_OFF, build_tree=True)
+        arena = analizador.tree.arena
+        del analizador
+        bytes_arena = tracemalloc.get_traced_memory()[0] - inicio
+        inicio = tracemalloc.get_traced_memory()[0]
+        nodos = arena.a_nodos()
+        bytes_nodo = tracemalloc.get_traced_memory()[0] - inicio
+        tracemalloc.stop()
+        del nodos
+        n_nodos = len(arena)
+        print(f"{tamano:>13} {n_nodos:>9} {bytes_arena / 2**20:>11.1f} {bytes_nodo / 2**20:>10.1f} "
+              f"{bytes_arena / n_nodos:>13.1f} {bytes_nodo / n_nodos:>12.1f} {bytes_nodo / bytes_arena:>9.1f}x")
+
+
+def analizar_programa(nombre, fuente):
+    """Lexer, árbol y tabla de símbolos de un programa, con su propio contexto."""
+    flujo = FlujoTokens(construir_flujo(io.StringIO(fuente)).a_bytes())
+    raiz = construir_arbol("Gramatica.txt", flujo)
+    contexto = Tabla_Simbolos.ContextoCompilacion(nombre)
+    Tabla_Simbolos.agregarSimbolos(raiz, contexto)
+    return contexto
+
+
+def _volcar_tabla(tabla):
+    return [(simbolo.nombre, simbolo.tipo, simbolo.parametros, simbolo.valor, simbolo.ambito)
+            for simbolo in tabla]
+
+
+def medir_concurrencia(n_programas, hilos):
+    """Analiza muchos programas distintos a la vez en un pool de hilos.
+
+    Cada programa usa nombres propios; las tablas obtenidas en paralelo deben
+    ser idénticas a las de analizarlos uno por uno, sin símbolos de otros.
+    """
+    programas = [(f"programa_{i}", programa_sintetico(50 + i * 37 % 300, prefijo=f"p{i}_"))
+                 for i in range(n_programas)]
+    inicio = time.perf_counter()
+    esperadas = [_volcar_tabla(analizar_programa(nombre, fuente).tabla_simbolos)
+                 for nombre, fuente in programas]
+    t_secuencial = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        contextos = list(pool.map(lambda programa: analizar_programa(*programa), programas))
+    t_paralelo = time.perf_counter() - inicio
+
+    diferencias = sum(_volcar_tabla(contexto.tabla_simbolos) != esperada or contexto.nombre != nombre
+                      for contexto, esperada, (nombre, _) in zip(contextos, esperadas, programas))
+    print(f"{n_programas} programas, {hilos} hilos: secuencial {t_secuencial:.2f} s, "
+          f"en paralelo {t_paralelo:.2f} s, tablas distintas: {diferencias}")
+    assert diferencias == 0
+
+
+def medir_proyecto(n_archivos, instrucciones):
+    """Proyecto de muchos archivos: compilación en frío, con cache y tras editar un archivo.
+
+    Los dos primeros archivos definen la misma función para que el enlace
+    reporte un duplicado. Después de editar un archivo solo ese se vuelve a
+    analizar, y la tabla enlazada debe ser la misma que sin cache.
+    """
+    def volcar(contexto):
+        return [(simbolo.nombre, simbolo.parametros, simbolo.valor, simbolo.ambito)
+                for simbolo in contexto.tabla_simbolos]
+
+    with tempfile.TemporaryDirectory() as directorio:
+        dir_cache = os.path.join(directorio, "cache")
+        rutas = []
+        for i in range(n_archivos):
+            ruta = os.path.join(directorio, f"modulo_{i:04}.txt")
+            with open(ruta, "w") as archivo:
+                archivo.write(programa_sintetico(instrucciones, prefijo=f"m{i}_"))
+                if i < 2:
+                    archivo.write("def comun(x) { return x@ }\n")
+            rutas.append(ruta)
+
+        print(f"{'Compilacion':>12} {'Analizados':>11} {'De cache':>9} {'Tiempo (s)':>11} {'Duplicados':>11}")
+        for nombre in ("en frio", "con cache", "tras editar"):
+            if nombre == "tras editar":
+                with open(rutas[n_archivos // 2], "a") as archivo:
+                    archivo.write("nueva = 1@\n")
+            (resultados, contexto, duplicados), segundos = cronometrar(
+                Proyecto_Simbolos.construir_proyecto, rutas, dir_cache=dir_cache)
+            desde_cache = sum(resultado.desde_cache for resultado in resultados)
+            print(f"{nombre:>12} {len(resultados) - desde_cache:>11} {desde_cache:>9} {segundos:>11.2f} "
+                  f"{len(duplicados):>11}")
+        assert len(resultados) - desde_cache == 1
+
+        _, sin_cache, _ = Proyecto_Simbolos.construir_proyecto(rutas, dir_cache=os.path.join(directorio, "vacia"))
+        assert volcar(contexto) == volcar(sin_cache)
+
+
+def medir_incremental(tamanos, repeticiones=5):
+    """Edición de una línea en medio del programa: análisis completo frente a incremental.
+
+    Se cambia una asignación por otra y se vuelve a la original, así que en
+    cada actualización solo una instrucción cambia.
+    """
+    print(f"{'Instrucciones':>13} {'Completo (s)':>13} {'Sesion (s)':>11} {'Edicion (ms)':>13} "
+          f"{'Analizadas':>11} {'Reutilizadas':>13}")
+    for tamano in tamanos:
+        fuente = programa_sintetico(tamano)
+        # Lo mismo que mantiene la sesión: árbol, AST y tabla de símbolos
+        inicio = time.perf_counter()
+        raiz = construir_arbol("Gramatica.txt", FlujoTokens(construir_flujo(io.StringIO(fuente)).a_bytes()))
+        construir_ast(raiz)
+        Tabla_Simbolos.agregarSimbolos(raiz, Tabla_Simbolos.ContextoCompilacion())
+        t_completo = time.perf_counter() - inicio
+        sesion = SesionIncremental()
+        _, t_sesion = cronometrar(sesion.actualizar, fuente)
+        # Línea 4k + 1 en medio del programa: "vN = vN-1 + N * 2@"
+        linea = tamano // 2 // 4 * 4 + 1
+        original = f"v{linea} = v{linea - 1} + {linea} * 2@"
+        editada = f"v{linea} = v{linea - 1} - {linea}@"
+        posicion = fuente.index("\n" + original) + 1
+        version = fuente[:posicion] + editada + fuente[posicion + len(original):]
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            cambios = sesion.actualizar(version)
+            sesion.actualizar(fuente)
+        t_edicion = (time.perf_counter() - inicio) / (2 * repeticiones)
+        print(f"{tamano:>13} {t_completo:>13.3f} {t_sesion:>11.3f} {t_edicion * 1000:>13.2f} "
+              f"{cambios['analizadas']:>11} {cambios['reutilizadas']:>13}")
+
+
+def _compilar_por_archivos(ruta, directorio, compilada):
+    # La cadena anterior: cada etapa escribe su archivo y la siguiente lo vuelve
+    # a leer, y la tabla de símbolos analiza el programa por segunda vez
+    ruta_tokens = os.path.join(directorio, 'tokens.bin')
+    construir_flujo(ruta).escribir(ruta_tokens)
+    escribir_tokens_texto(ruta, os.path.join(directorio, 'tokens.txt'), os.path.join(directorio, 'tokens_only.txt'))
+    Tabla_Sintactica.write_csv(Compilador.tabla_reglas(compilada), os.path.join(directorio, 'll1_table.csv'))
+    Tabla_Sintactica.write_nonterminals(compilada.nonterminals, os.path.join(directorio, 'no_terminales.txt'))
+    raiz = construir_arbol("Gramatica.txt", cargar_tokens(ruta_tokens))
+    contexto = Tabla_Simbolos.ContextoCompilacion(ruta)
+    Tabla_Simbolos.agregarSimbolos(construir_arbol("Gramatica.txt", cargar_tokens(ruta_tokens)), contexto)
+    codigo = ASTSPIMGenerator().generate_ast(construir_ast(raiz))
+    with open(os.path.join(directorio, 'output.asm'), 'w') as salida:
+        salida.write(codigo)
+    return codigo
+
+
+def medir_compilacion(n_programas, instrucciones):
+    """Muchos programas compilados con la cadena de archivos y con Compilador en memoria."""
+    fuentes = [programa_sintetico(instrucciones, prefijo=f"p{i}_") for i in range(n_programas)]
+    compilador = Compilador.Compilador()
+    with tempfile.TemporaryDirectory() as directorio:
+        rutas = []
+        for i, fuente in enumerate(fuentes):
+            rutas.append(os.path.join(directorio, f"programa{i}.txt"))
+            with open(rutas[-1], 'w') as archivo:
+                archivo.write(fuente)
+        compilada = Tabla_Sintactica.load_compiled_table("Gramatica.txt", "ll1_table.bin")
+
+        inicio = time.perf_counter()
+        codigos_archivos = [_compilar_por_archivos(ruta, directorio, compilada) for ruta in rutas]
+        t_archivos = time.perf_counter() - inicio
+
+        tiempos = dict.fromkeys(Compilador.ETAPAS, 0.0)
+        inicio = time.perf_counter()
+        for ruta, fuente, codigo in zip(rutas, fuentes, codigos_archivos):
+            resultado = compilador.compilar(fuente, ruta)
+            assert resultado.codigo == codigo and not resultado.errores
+            for etapa, segundos in resultado.tiempos.items():
+                tiempos[etapa] += segundos
+        t_memoria = time.perf_counter() - inicio
+
+    print(f"Programas: {n_programas} de {instrucciones} instrucciones")
+    print(f"{'Por archivos (s)':>16} {'En memoria (s)':>15} {'Aceleración':>12}")
+    print(f"{t_archivos:>16.3f} {t_memoria:>15.3f} {t_archivos / t_memoria:>11.1f}x")
+    print(f"{'Etapa':<12} {'En memoria (s)':>15}")
+    for etapa, segundos in tiempos.items():
+        if segundos:
+            print(f"{etapa:<12} {segundos:>15.3f}")
+
+
+def programa_llamadas_anidadas(profundidad, en_funcion=False):
+    """Una expresión con `profundidad` llamadas anidadas; cada nivel deja dos valores vivos durante la llamada.
+
+    Con `en_funcion`, la expresión es el return de una función, así que sus
+    valores cruzan las llamadas dentro de un marco que guarda los $s que usa.
+    """
+    expresion = "x"
+    for i in range(profundidad):
+        expresion = f"h(x + {i}, y * 2 - x, {expresion}, y)"
+    funcion_h = "def h(a, b, c, d) { return a + b - c + d@ }\n"
+    if en_funcion:
+        return funcion_h + f"def g(x, y) {{ return {expresion}@ }}\nprint(g(3, 4))@\n"
+    return funcion_h + f"x = 3@ y = 4@\nz = {expresion}@\nprint(z)@\n"
+
+
+def programa_recursivo():
+    """Funciones recursivas cuyo parámetro sigue vivo después de la llamada a sí mismas."""
+    return ("def fact(n) { if (n <= 1) { return 1@ } return n * fact(n - 1)@ }\n"
+            "def fib(n) { if (n < 2) { return n@ } return fib(n - 1) + fib(n - 2)@ }\n"
+            "def suma(n, k) { if (n < 1) { return k@ } return n + suma(n - 1, k + n) * 2 - k@ }\n"
+            "print(fact(10), fib(15), suma(6, 1))@\n")
+
+
+def verificar_convenciones(codigo):
+    """Errores de convención de llamadas en `codigo` SPIM ya con registros físicos.
+
+    Revisa que ningún $t se lea después de un jal sin haberse escrito antes
+    (la función llamada puede pisarlo) y que cada función guarde en su
+    prólogo y restaure en su epílogo los $s que escribe.
+    """
+    errores = []
+    funcion = None
+    escritos_s = guardados = restaurados = None
+    validos_t = None  # $t escritos desde el último jal del bloque, o None si no hubo jal
+    for numero, linea in enumerate(codigo.split("\n"), 1):
+        texto = linea.strip()
+        if texto.endswith(":"):
+            validos_t = None
+            if texto.startswith("func_") and not texto.endswith("_end:"):
+                funcion, escritos_s, guardados, restaurados = texto[:-1], set(), set(), set()
+                prologo, epilogo = True, False
+            elif funcion is not None and texto == f"{funcion}_end:":
+                epilogo = True
+            continue
+        if not texto:
+            continue
+        operacion, _, resto = texto.partition(" ")
+        operandos = [operando.strip() for operando in resto.split(",")] if resto else []
+        escritos = operandos[:1] if operacion in ESCRIBEN_PRIMERO else []
+        leidos = operandos[1:] if escritos else operandos
+        if validos_t is not None:
+            for registro in REGISTRO_FISICO.findall(" ".join(leidos)):
+                if registro.startswith("$t") and registro not in validos_t:
+                    errores.append(f"línea {numero}: {registro} se lee después de un jal: {texto}")
+            validos_t.update(escritos)
+        if operacion == "jal":
+            validos_t = set()
+        elif operacion in SALTOS:
+            validos_t = None
+
+        if funcion is None:
+            continue
+        if prologo and operacion in ("addi", "sw"):
+            if operacion == "sw" and operandos[0] in GUARDADOS:
+                guardados.add(operandos[0])
+            continue
+        prologo = False
+        if epilogo and operacion == "lw" and operandos[0] in GUARDADOS:
+            restaurados.add(operandos[0])
+        elif escritos and escritos[0] in GUARDADOS:
+            escritos_s.add(escritos[0])
+        if operacion == "jr":
+            for registro in sorted(escritos_s - guardados):
+                errores.append(f"{funcion}: escribe {registro} sin guardarlo")
+            for registro in sorted(escritos_s - restaurados):
+                errores.append(f"{funcion}: escribe {registro} sin restaurarlo")
+            funcion = None
+    return errores
+
+
+def medir_registros(profundidades):
+    """Asignación de registros: tamaño del código, derrames, $s guardados, convenciones y tiempo.
+
+    Los casos son expresiones con llamadas anidadas en el programa principal
+    y dentro de una función (valores que cruzan cada jal y, con
+    profundidad, más valores vivos que registros) y funciones recursivas.
+    """
+    compilador = Compilador.Compilador(plegar=False)
+    casos = []
+    for profundidad in profundidades:
+        casos.append((f"anidadas {profundidad}", programa_llamadas_anidadas(profundidad)))
+        casos.append((f"en funcion {profundidad}", programa_llamadas_anidadas(profundidad, en_funcion=True)))
+    casos.append(("recursivas", programa_recursivo()))
+    print(f"{'Programa':<16} {'Instrucciones':>14} {'lw/sw pila':>11} {'$s guardados':>13} {'Codigo (ms)':>12}")
+    for nombre, fuente in casos:
+        resultado = compilador.compilar(fuente)
+        assert resultado.codigo is not None, resultado.errores
+        errores = verificar_convenciones(resultado.codigo)
+        assert not errores, "\n".join(errores)
+        instrucciones = [linea.split() for linea in resultado.codigo.split("\n") if linea.startswith("    ")]
+        pila = sum(partes[0] in ("lw", "sw") and partes[-1].endswith("($sp)") for partes in instrucciones)
+        guardados = sum(partes[0] == "sw" and partes[1].rstrip(",") in GUARDADOS and partes[-1].endswith("($sp)")
+                        for partes in instrucciones)
+        print(f"{nombre:<16} {len(instrucciones):>14} {pila:>11} {guardados:>13} "
+              f"{resultado.tiempos['codigo'] * 1000:>12.2f}")
+
+
+def programa_bloques(n_bloques):
+    """`n_bloques` ciclos cuyo cuerpo lee y escribe las mismas variables varias veces."""
+    lineas = ["s = 0@ t = 1@"]
+    for i in range(n_bloques):
+        lineas.append(f"i = 0@ while (i < {i % 7 + 2}) {{ s = s + i * t@ t = t + 1@ u = s - t * {i % 5}@ "
+                      f"s = u / 2 + i@ i = i + 1@ }}")
+    lineas.append("print(s, t)@")
+    return "\n".join(lineas) + "\n"
+
+
+def medir_variables(tamanos):
+    """Variables en registros dentro de cada bloque frente a lw/sw en cada acceso: código generado."""
+    compilador = Compilador.Compilador()
+    print(f"{'Programa':<22} {'Instr. antes':>12} {'Instr. ahora':>12} {'lw/sw antes':>12} {'lw/sw ahora':>12}")
+    for tamano in tamanos:
+        for nombre, fuente in ((f"sintetico {tamano}", programa_sintetico(tamano)),
+                               (f"bloques {tamano // 10}", programa_bloques(tamano // 10))):
+            resultado = compilador.compilar(fuente)
+            assert resultado.codigo is not None, resultado.errores
+            conteos = []
+            for cache_variables in (False, True):
+                # El generador pliega el AST sin plegar, así los ámbitos salen del programa original
+                codigo = ASTSPIMGenerator(cache_variables=cache_variables).generate_ast(
+                    construir_ast(resultado.arbol))
+                instrucciones = [linea.split() for linea in codigo.split("\n") if linea.startswith("    ")]
+                conteos.append((len(instrucciones),
+                                sum(partes[0] in ("lw", "sw") and partes[-1].startswith("var_")
+                                    for partes in instrucciones)))
+            (instrucciones_antes, memoria_antes), (instrucciones_ahora, memoria_ahora) = conteos
+            print(f"{nombre:<22} {instrucciones_antes:>12} {instrucciones_ahora:>12} {memoria_antes:>12} "
+                  f"{memoria_ahora:>12}")
+
+
+def main():
+    argumentos = argparse.ArgumentParser(description="Mediciones de rendimiento del compilador")
+    mediciones = argumentos.add_subparsers(dest="medicion", required=True)
+
+    firsts = mediciones.add_parser("firsts", help="FIRST/FOLLOW en gramáticas grandes")
+    firsts.add_argument("--tamanos", type=int, nargs="+", default=[1000, 2500, 5000, 10000, 20000])
+
+    analizador = mediciones.add_parser("analizador", help="análisis LL(1) de flujos grandes")
+    analizador.add_argument("--tamanos", type=int, nargs="+", default=[10000, 100000, 1000000, 3000000])
+
+    programas = mediciones.add_parser("programas", help="programas con muchas instrucciones de principio a fin")
+    programas.add_argument("--tamanos", type=int, nargs="+", default=[1000, 10000, 100000])
+
+    memoria = mediciones.add_parser("memoria", help="memoria del árbol en arena frente a objetos Nodo")
+    memoria.add_argument("--tamanos", type=int, nargs="+", default=[1000, 10000, 100000])
+
+    simbolos = mediciones.add_parser("simbolos", help="tabla de símbolos en programas largos y anidados")
+    simbolos.add_argument("--tamanos", type=int, nargs="+", default=[1000, 10000, 100000])
+    simbolos.add_argument("--profundidades", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    simbolos.add_argument("--funciones", type=int, nargs="+", default=[1000, 10000, 50000])
+
+    proyecto = mediciones.add_parser("proyecto", help="proyecto de muchos archivos con la cache de tablas")
+    proyecto.add_argument("--archivos", type=int, default=500)
+    proyecto.add_argument("--instrucciones", type=int, default=100)
+
+    incremental = mediciones.add_parser("incremental", help="reanálisis incremental tras editar una línea")
+    incremental.add_argument("--tamanos", type=int, nargs="+", default=[1000, 10000, 100000])
+
+    concurrencia = mediciones.add_parser("concurrencia", help="muchos programas analizados a la vez en hilos")
+    concurrencia.add_argument("--programas", type=int, default=500)
+    concurrencia.add_argument("--hilos", type=int, default=16)
+
+    compilacion = mediciones.add_parser("compilacion", help="compilación completa por archivos frente a en memoria")
+    compilacion.add_argument("--programas", type=int, default=200)
+    compilacion.add_argument("--instrucciones", type=int, default=100)
+
+    registros = mediciones.add_parser("registros", help="asignación de registros con llamadas, recursión y derrames")
+    registros.add_argument("--profundidades", type=int, nargs="+", default=[5, 20, 50, 200])
+
+    variables = mediciones.add_parser("variables", help="variables en registros dentro de cada bloque básico")
+    variables.add_argument("--tamanos", type=int, nargs="+", default=[100, 1000, 10000])
+
+    opciones = argumentos.parse_args()
+    if opciones.medicion == "firsts":
+        medir_firsts_follows(opciones.tamanos)
+    elif opciones.medicion == "analizador":
+        medir_analizador(opciones.tamanos)
+    elif opciones.medicion == "programas":
+        medir_programas_grandes(opciones.tamanos)
+    elif opciones.medicion == "memoria":
+        medir_memoria_arbol(opciones.tamanos)
+    elif opciones.medicion == "simbolos":
+        medir_simbolos(opciones.tamanos, opciones.profundidades, opciones.funciones)
+    elif opciones.medicion == "concurrencia":
+        medir_concurrencia(opciones.programas, opciones.hilos)
+    elif opciones.medicion == "proyecto":
+        medir_proyecto(opciones.archivos, opciones.instrucciones)
+    elif opciones.medicion == "incremental":
+        medir_incremental(opciones.tamanos)
+    elif opciones.medicion == "compilacion":
+        medir_compilacion(opciones.programas, opciones.instrucciones)
+    elif opciones.medicion == "registros":
+        medir_registros(opciones.profundidades)
+    elif opciones.medicion == "variables":
+        medir_variables(opciones.tamanos)
+
+
+if __name__ == "__main__":
+    main()
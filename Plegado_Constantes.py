@@ -0,0 +1,333 @@
+from Arbol_Abstracto import (Assign, BinOp, BoolOp, Call, Compare, FunctionDef, If, Literal,
+                             Name, Program, Return, While)
+
+# Plegado y propagación de constantes sobre el AST.
+# Las expresiones cuyos operandos se conocen al compilar se reemplazan por su
+# valor, y las variables cuyo valor se conoce en un punto del programa se
+# reemplazan por ese valor ahí, así que el código generado no carga ni opera
+# lo que ya se sabe. Los valores siguen la semántica del código SPIM: enteros
+# de 32 bits, división entera truncada hacia cero y comparaciones y
+# operadores lógicos que dan 0 o 1 (aquí, False o True).
+#
+# Los nombres no se separan por ámbito: se supone que una llamada a una
+# función puede cambiar cualquier nombre que alguna función asigne o reciba
+# como parámetro. Con los locales en el marco de cada llamada esto es más de
+# lo necesario, pero nunca deja un valor viejo.
+
+MIN_ENTERO = -2 ** 31
+MAX_ENTERO = 2 ** 31 - 1
+
+NO_CONSTANTE = object()  # Resultado de lo que no se puede evaluar al compilar
+
+
+def _entero_valido(valor):
+    return MIN_ENTERO <= valor <= MAX_ENTERO
+
+
+def evaluar_binario(izquierdo, operador, derecho):
+    """Valor de `izquierdo operador derecho` entre literales, o NO_CONSTANTE.
+
+    No se pliegan las cadenas (en SPIM son direcciones), la división entre
+    cero ni los enteros que no caben en 32 bits; esos quedan para la
+    ejecución.
+    """
+    if isinstance(izquierdo, str) or isinstance(derecho, str):
+        return NO_CONSTANTE
+    if operador in ('and', 'or', 'not'):
+        if operador == 'and':
+            return bool(izquierdo) and bool(derecho)
+        if operador == 'or':
+            return bool(izquierdo) or bool(derecho)
+        return bool(izquierdo) and not derecho  # 'not' une las condiciones como "y no"
+    if operador == '==':
+        return izquierdo == derecho
+    if operador == '!=':
+        return izquierdo != derecho
+    if operador == '<':
+        return izquierdo < derecho
+    if operador == '<=':
+        return izquierdo <= derecho
+    if operador == '>':
+        return izquierdo > derecho
+    if operador == '>=':
+        return izquierdo >= derecho
+
+    enteros = not isinstance(izquierdo, float) and not isinstance(derecho, float)
+    if operador == '+':
+        resultado = izquierdo + derecho
+    elif operador == '-':
+        resultado = izquierdo - derecho
+    elif operador == '*':
+        resultado = izquierdo * derecho
+    elif operador == '/':
+        if derecho == 0:
+            return NO_CONSTANTE
+        if enteros:
+            # div de SPIM: cociente truncado hacia cero
+            resultado = abs(izquierdo) // abs(derecho)
+            if (izquierdo < 0) != (derecho < 0):
+                resultado = -resultado
+        else:
+            resultado = izquierdo / derecho
+    else:
+        return NO_CONSTANTE
+    if enteros:
+        resultado = int(resultado)
+        if not _entero_valido(resultado):
+            return NO_CONSTANTE
+    return resultado
+
+
+def plegar_expresion(expresion, constantes):
+    """Expresión con los nombres de `constantes` sustituidos y las operaciones constantes evaluadas.
+
+    `constantes` es un diccionario nombre -> valor; las llamadas no se
+    evalúan, pero sí se pliegan sus argumentos. Las variables de cadena no se
+    sustituyen: su valor en SPIM es una dirección.
+    """
+    tipo = type(expresion)
+    if tipo is Literal:
+        return expresion
+    if tipo is Name:
+        valor = constantes.get(expresion.id, NO_CONSTANTE)
+        if valor is NO_CONSTANTE or isinstance(valor, str):
+            return expresion  # Una cadena se sigue leyendo de la variable, como su dirección
+        return Literal(valor)
+    if tipo is Call:
+        return Call(expresion.func, [plegar_expresion(argumento, constantes) for argumento in expresion.args])
+    izquierdo = plegar_expresion(expresion.left, constantes)
+    derecho = plegar_expresion(expresion.right, constantes)
+    if type(izquierdo) is Literal and type(derecho) is Literal:
+        valor = evaluar_binario(izquierdo.value, expresion.op, derecho.value)
+        if valor is not NO_CONSTANTE:
+            return Literal(valor)
+    return tipo(izquierdo, expresion.op, derecho)
+
+
+def _llama_funciones(expresion):
+    # True si evaluar la expresión llama a alguna función del programa
+    pendientes = [expresion]
+    while pendientes:
+        expresion = pendientes.pop()
+        tipo = type(expresion)
+        if tipo is Call:
+            if expresion.func != 'print':
+                return True
+            pendientes.extend(expresion.args)
+        elif tipo in (BinOp, Compare, BoolOp):
+            pendientes.append(expresion.left)
+            pendientes.append(expresion.right)
+    return False
+
+
+def _asignados(cuerpo, nombres):
+    # Agrega a `nombres` los nombres asignados (o parámetros) en `cuerpo` y sus bloques
+    pendientes = list(cuerpo)
+    while pendientes:
+        instruccion = pendientes.pop()
+        tipo = type(instruccion)
+        if tipo is Assign:
+            nombres.add(instruccion.name)
+        elif tipo is If:
+            pendientes.extend(instruccion.body)
+            pendientes.extend(instruccion.orelse)
+        elif tipo is While:
+            pendientes.extend(instruccion.body)
+        elif tipo is FunctionDef:
+            nombres.update(instruccion.params)
+            pendientes.extend(instruccion.body)
+    return nombres
+
+
+def _leidos(cuerpo):
+    # Nombres que el programa lee en alguna expresión
+    nombres = set()
+    pendientes = list(cuerpo)
+    while pendientes:
+        nodo = pendientes.pop()
+        tipo = type(nodo)
+        if tipo is Name:
+            nombres.add(nodo.id)
+        elif tipo is Assign:
+            pendientes.append(nodo.value)
+        elif tipo is Call:
+            pendientes.extend(nodo.args)
+        elif tipo in (BinOp, Compare, BoolOp):
+            pendientes.append(nodo.left)
+            pendientes.append(nodo.right)
+        elif tipo is If:
+            pendientes.append(nodo.test)
+            pendientes.extend(nodo.body)
+            pendientes.extend(nodo.orelse)
+        elif tipo is While:
+            pendientes.append(nodo.test)
+            pendientes.extend(nodo.body)
+        elif tipo is FunctionDef:
+            pendientes.extend(nodo.body)
+        elif tipo is Return:
+            pendientes.append(nodo.value)
+    return nombres
+
+
+class _Propagacion:
+    """Estado del recorrido: qué cambia una llamada y qué valores tuvo cada asignación."""
+
+    def __init__(self, programa):
+        # Nombres que alguna función puede cambiar al ser llamada; los
+        # parámetros reciben valores que no se conocen al compilar
+        self.parametros = set()
+        self.cambiados_por_llamadas = set()
+        for instruccion in _todas(programa.body):
+            if type(instruccion) is FunctionDef:
+                self.parametros.update(instruccion.params)
+                _asignados(instruccion.body, self.cambiados_por_llamadas)
+        self.cambiados_por_llamadas |= self.parametros
+        self.asignaciones = {}  # Nombre -> valores asignados (NO_CONSTANTE si no se conocía)
+
+    def expresion(self, expresion, constantes):
+        if _llama_funciones(expresion):
+            # Los operandos pueden leerse después de la llamada
+            self._olvidar(constantes, self.cambiados_por_llamadas)
+        return plegar_expresion(expresion, constantes)
+
+    @staticmethod
+    def _olvidar(constantes, nombres):
+        for nombre in nombres:
+            constantes.pop(nombre, None)
+
+    def bloque(self, cuerpo, constantes):
+        """Pliega las instrucciones de `cuerpo`; `constantes` queda con los valores conocidos al final."""
+        plegado = []
+        for instruccion in cuerpo:
+            tipo = type(instruccion)
+            if tipo is Assign:
+                valor = self.expresion(instruccion.value, constantes)
+                if type(valor) is Literal:
+                    constantes[instruccion.name] = valor.value
+                    self.asignaciones.setdefault(instruccion.name, []).append(valor.value)
+                else:
+                    constantes.pop(instruccion.name, None)
+                    self.asignaciones.setdefault(instruccion.name, []).append(NO_CONSTANTE)
+                plegado.append(Assign(instruccion.name, valor))
+            elif tipo is Call:
+                plegado.append(self.expresion(instruccion, constantes))
+            elif tipo is If:
+                prueba = self.expresion(instruccion.test, constantes)
+                if type(prueba) is Literal:
+                    # Solo una rama puede ejecutarse; sus instrucciones quedan en este bloque
+                    rama = instruccion.body if prueba.value else instruccion.orelse
+                    plegado.extend(self.bloque(rama, constantes))
+                    continue
+                constantes_sino = dict(constantes)
+                cuerpo_si = self.bloque(instruccion.body, constantes)
+                cuerpo_sino = self.bloque(instruccion.orelse, constantes_sino)
+                # Después del if solo se conoce lo que vale lo mismo en las dos ramas
+                for nombre, valor in list(constantes.items()):
+                    otro = constantes_sino.get(nombre, NO_CONSTANTE)
+                    if otro is NO_CONSTANTE or type(otro) is not type(valor) or otro != valor:
+                        del constantes[nombre]
+                plegado.append(If(prueba, cuerpo_si, cuerpo_sino))
+            elif tipo is While:
+                # Lo que el ciclo asigna (o cambia con llamadas) no se conoce en ninguna vuelta
+                cambiados = _asignados(instruccion.body, set())
+                if any(_llama_funciones(nodo) for nodo in _expresiones(instruccion)):
+                    cambiados |= self.cambiados_por_llamadas
+                self._olvidar(constantes, cambiados)
+                prueba = self.expresion(instruccion.test, constantes)
+                if type(prueba) is Literal and not prueba.value:
+                    continue  # El ciclo nunca entra
+                cuerpo = self.bloque(instruccion.body, dict(constantes))
+                plegado.append(While(prueba, cuerpo))
+            elif tipo is FunctionDef:
+                # Al llamarse, los nombres pueden valer cualquier cosa
+                plegado.append(FunctionDef(instruccion.name, instruccion.params,
+                                           self.bloque(instruccion.body, {})))
+            elif tipo is Return:
+                plegado.append(Return(self.expresion(instruccion.value, constantes)))
+            else:
+                plegado.append(instruccion)
+        return plegado
+
+
+def _todas(cuerpo):
+    # Todas las instrucciones de `cuerpo` y de sus bloques anidados
+    pendientes = list(cuerpo)
+    while pendientes:
+        instruccion = pendientes.pop()
+        yield instruccion
+        tipo = type(instruccion)
+        if tipo is If:
+            pendientes.extend(instruccion.body)
+            pendientes.extend(instruccion.orelse)
+        elif tipo in (While, FunctionDef):
+            pendientes.extend(instruccion.body)
+
+
+def _expresiones(ciclo):
+    # Expresiones que evalúa un ciclo: su condición y las de su cuerpo
+    yield ciclo.test
+    for instruccion in _todas(ciclo.body):
+        tipo = type(instruccion)
+        if tipo in (Assign, Return):
+            yield instruccion.value
+        elif tipo is Call:
+            yield instruccion
+        elif tipo in (If, While):
+            yield instruccion.test
+
+
+def _sin_asignaciones_muertas(cuerpo, leidos):
+    # Quita las asignaciones de valores constantes a variables que nunca se leen
+    resultado = []
+    for instruccion in cuerpo:
+        tipo = type(instruccion)
+        if tipo is Assign:
+            if type(instruccion.value) is Literal and instruccion.name not in leidos:
+                continue
+        elif tipo is If:
+            instruccion.body = _sin_asignaciones_muertas(instruccion.body, leidos)
+            instruccion.orelse = _sin_asignaciones_muertas(instruccion.orelse, leidos)
+        elif tipo in (While, FunctionDef):
+            instruccion.body = _sin_asignaciones_muertas(instruccion.body, leidos)
+        resultado.append(instruccion)
+    return resultado
+
+
+def propagar_constantes(programa):
+    """Pliega y propaga constantes en `programa` y devuelve (programa plegado, constantes).
+
+    El programa plegado es un AST nuevo: los nombres con valor conocido en
+    cada punto se sustituyen por él, las operaciones entre constantes se
+    evalúan, de los if con condición constante queda solo la rama que se
+    ejecuta, los ciclos que nunca entran desaparecen y las asignaciones de
+    constantes a variables que ya nadie lee se quitan.
+
+    `constantes` es un diccionario nombre -> valor con las variables cuyas
+    asignaciones dan todas el mismo valor conocido al compilar.
+    """
+    propagacion = _Propagacion(programa)
+    cuerpo = propagacion.bloque(programa.body, {})
+    cuerpo = _sin_asignaciones_muertas(cuerpo, _leidos(cuerpo))
+
+    constantes = {}
+    for nombre, valores in propagacion.asignaciones.items():
+        primero = valores[0]
+        if (primero is not NO_CONSTANTE and nombre not in propagacion.parametros
+                and all(valor is not NO_CONSTANTE and type(valor) is type(primero) and valor == primero
+                        for valor in valores)):
+            constantes[nombre] = primero
+    return Program(cuerpo), constantes
+
+
+def anotar_tabla(tabla, constantes):
+    """Guarda en las variables de `tabla` su valor constante y las marca con `es_constante`.
+
+    Las demás conservan el texto de su última asignación como valor.
+    """
+    for simbolo in tabla.simbolos:
+        if simbolo.es_funcion:
+            continue
+        valor = constantes.get(simbolo.nombre, NO_CONSTANTE)
+        if valor is not NO_CONSTANTE:
+            simbolo.valor = valor
+            simbolo.es_constante = True
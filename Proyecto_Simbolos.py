@@ -0,0 +1,206 @@
+import argparse
+import hashlib
+import io
+import marshal
+import os
+import tempfile
+import time
+
+import Tabla_Simbolos
+from Arbol_Abstracto import construir_ast
+from Flujo_Tokens import FlujoTokens
+from Generar_Arbol import construir_arbol
+from Lexer_Python_ES import construir_flujo, expandir_entradas, huella_especificacion
+from Plegado_Constantes import anotar_tabla, propagar_constantes
+from Tabla_Sintactica import grammar_hash
+
+# Tablas de símbolos de proyectos con varios archivos.
+# La tabla de cada archivo se guarda en una cache en disco cuya clave es el
+# hash del contenido, de la gramática y de la especificación de tokens; un
+# archivo sin cambios se carga de ahí sin volver a analizarse. El enlace
+# junta las tablas de todos los archivos y reporta los nombres globales
+# definidos en más de uno.
+
+DIR_CACHE_SIMBOLOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '__simcache__')
+CACHE_MAGIC = b'SIMB'
+CACHE_VERSION = 2  # Cambiarla cuando cambie lo que se guarda en los símbolos
+
+
+def huella_entorno(archivo_gramatica="Gramatica.txt"):
+    """Hash de todo lo que, además del código, determina la tabla de un archivo."""
+    return hashlib.sha256(repr((CACHE_VERSION, grammar_hash(archivo_gramatica),
+                                huella_especificacion())).encode()).hexdigest()
+
+
+def clave_cache(fuente, entorno):
+    return hashlib.sha256(entorno.encode() + fuente.encode()).hexdigest()
+
+
+def serializar_tabla(tabla):
+    """Tabla de símbolos -> bytes: una tupla por símbolo, en orden de declaración."""
+    registros = tuple((simbolo.nombre, simbolo.tipo, simbolo.es_funcion,
+                       tuple(simbolo.parametros) if simbolo.parametros is not None else None,
+                       simbolo.valor, simbolo.ambito, tabla.es_global(simbolo), simbolo.es_constante)
+                      for simbolo in tabla.simbolos)
+    return CACHE_MAGIC + marshal.dumps((CACHE_VERSION, registros))
+
+
+def deserializar_tabla(datos):
+    """bytes -> TablaDeSimbolos, o None si los datos no son una tabla válida de esta versión."""
+    if not datos.startswith(CACHE_MAGIC):
+        return None
+    try:
+        version, registros = marshal.loads(datos[len(CACHE_MAGIC):])
+    except (EOFError, ValueError, TypeError):
+        return None
+    if version != CACHE_VERSION:
+        return None
+    tabla = Tabla_Simbolos.TablaDeSimbolos()
+    for nombre, tipo, es_funcion, parametros, valor, ambito, es_global, es_constante in registros:
+        parametros = list(parametros) if parametros is not None else None
+        tabla.restaurar(Tabla_Simbolos.Simbolo(nombre, tipo, es_funcion, parametros, valor, ambito, es_constante),
+                        es_global)
+    return tabla
+
+
+def _leer_cache(ruta):
+    try:
+        with open(ruta, 'rb') as archivo:
+            return deserializar_tabla(archivo.read())
+    except OSError:
+        return None
+
+
+def _escribir_cache(ruta, tabla):
+    # Temporal y reemplazo, como la tabla LL(1): nadie lee una entrada a medias
+    try:
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        with tempfile.NamedTemporaryFile('wb', dir=os.path.dirname(ruta), delete=False) as archivo:
+            archivo.write(serializar_tabla(tabla))
+        os.replace(archivo.name, ruta)
+    except OSError:
+        pass  # Sin cache en disco; la tabla sigue siendo válida
+
+
+class ResultadoArchivo:
+    """Tabla de símbolos de un archivo (None si no se pudo analizar) y de dónde salió."""
+    __slots__ = ('ruta', 'tabla', 'desde_cache', 'error')
+
+    def __init__(self, ruta, tabla, desde_cache, error=None):
+        self.ruta = ruta
+        self.tabla = tabla
+        self.desde_cache = desde_cache
+        self.error = error
+
+
+def analizar_archivo(ruta, entorno, archivo_gramatica="Gramatica.txt", dir_cache=DIR_CACHE_SIMBOLOS):
+    """Tabla de símbolos de `ruta`, de la cache si el contenido no cambió."""
+    try:
+        with open(ruta, 'r') as archivo:
+            fuente = archivo.read()
+    except (OSError, UnicodeDecodeError) as error:
+        return ResultadoArchivo(ruta, None, False, str(error))
+
+    ruta_cache = os.path.join(dir_cache, clave_cache(fuente, entorno) + '.bin')
+    tabla = _leer_cache(ruta_cache)
+    if tabla is not None:
+        return ResultadoArchivo(ruta, tabla, True)
+
+    raiz = construir_arbol(archivo_gramatica, FlujoTokens(construir_flujo(io.StringIO(fuente)).a_bytes()))
+    if raiz is None:
+        return ResultadoArchivo(ruta, None, False, "errores de sintaxis")
+    contexto = Tabla_Simbolos.ContextoCompilacion(ruta)
+    Tabla_Simbolos.agregarSimbolos(raiz, contexto)
+    try:
+        _, constantes = propagar_constantes(construir_ast(raiz))
+    except ValueError:
+        constantes = {}  # Sin AST no se conocen constantes; la tabla sigue siendo válida
+    anotar_tabla(contexto.tabla_simbolos, constantes)
+    _escribir_cache(ruta_cache, contexto.tabla_simbolos)
+    return ResultadoArchivo(ruta, contexto.tabla_simbolos, False)
+
+
+class Duplicado:
+    """Nombre global definido en dos archivos."""
+    __slots__ = ('nombre', 'primera_ruta', 'ruta', 'es_funcion')
+
+    def __init__(self, nombre, primera_ruta, ruta, es_funcion):
+        self.nombre = nombre
+        self.primera_ruta = primera_ruta
+        self.ruta = ruta
+        self.es_funcion = es_funcion
+
+    def __repr__(self):
+        tipo = "función" if self.es_funcion else "variable"
+        return f"{self.ruta}: {tipo} '{self.nombre}' ya definida en {self.primera_ruta}"
+
+
+def enlazar(resultados):
+    """Junta las tablas de los archivos en un contexto y devuelve (contexto, duplicados).
+
+    Los archivos se enlazan en el orden dado y gana la primera definición de
+    cada nombre global; las demás se reportan como duplicadas y se omiten
+    junto con los símbolos locales de las funciones omitidas.
+    """
+    contexto = Tabla_Simbolos.ContextoCompilacion("<enlace>")
+    tabla = contexto.tabla_simbolos
+    definido_en = {}  # Nombre global -> archivo que lo definió primero
+    duplicados = []
+    for resultado in resultados:
+        if resultado.tabla is None:
+            continue
+        omitidas = set()
+        for simbolo in resultado.tabla.simbolos:
+            if resultado.tabla.es_global(simbolo):
+                primera_ruta = definido_en.get(simbolo.nombre)
+                if primera_ruta is not None:
+                    duplicados.append(Duplicado(simbolo.nombre, primera_ruta, resultado.ruta,
+                                                simbolo.es_funcion))
+                    if simbolo.es_funcion:
+                        omitidas.add(simbolo.nombre)
+                    continue
+                definido_en[simbolo.nombre] = resultado.ruta
+                tabla.restaurar(simbolo, True)
+            elif simbolo.ambito not in omitidas:
+                tabla.restaurar(simbolo, False)
+    return contexto, duplicados
+
+
+def construir_proyecto(rutas, archivo_gramatica="Gramatica.txt", dir_cache=DIR_CACHE_SIMBOLOS):
+    """Analiza (o carga de la cache) cada archivo y enlaza el proyecto.
+
+    Devuelve (resultados por archivo, contexto enlazado, duplicados).
+    """
+    entorno = huella_entorno(archivo_gramatica)
+    resultados = [analizar_archivo(ruta, entorno, archivo_gramatica, dir_cache) for ruta in rutas]
+    contexto, duplicados = enlazar(resultados)
+    return resultados, contexto, duplicados
+
+
+def main():
+    argumentos = argparse.ArgumentParser(description="Tablas de símbolos de un proyecto con varios archivos")
+    argumentos.add_argument("entradas", nargs="+", help="archivos o directorios del proyecto")
+    argumentos.add_argument("--patron", default="*.txt", help="patrón de archivos en los directorios")
+    argumentos.add_argument("--cache", default=DIR_CACHE_SIMBOLOS, help="directorio de la cache de tablas")
+    argumentos.add_argument("--tabla", action="store_true", help="imprime la tabla enlazada")
+    opciones = argumentos.parse_args()
+
+    rutas = expandir_entradas(opciones.entradas, opciones.patron)
+    inicio = time.perf_counter()
+    resultados, contexto, duplicados = construir_proyecto(rutas, dir_cache=opciones.cache)
+    segundos = time.perf_counter() - inicio
+
+    for resultado in resultados:
+        if resultado.error:
+            print(f"{resultado.ruta}: {resultado.error}")
+    for duplicado in duplicados:
+        print(duplicado)
+    desde_cache = sum(resultado.desde_cache for resultado in resultados)
+    print(f"Archivos: {len(resultados)} ({len(resultados) - desde_cache} analizados, {desde_cache} de la cache)")
+    print(f"Símbolos enlazados: {len(contexto.tabla_simbolos)}; duplicados: {len(duplicados)}; {segundos:.2f} s")
+    if opciones.tabla:
+        contexto.tabla_simbolos.imprimir_tabla()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+import argparse
+import bisect
+import io
+import os
+import time
+
+import Tabla_Simbolos
+from AnalizadorSintactico import LLParser, TRACE_OFF
+from Arbol_Abstracto import Program, construir_ast
+from Flujo_Tokens import ConstructorTokens, FlujoTokens
+from Lexer_Python_ES import tokenize, valor_texto
+from Plegado_Constantes import anotar_tabla, propagar_constantes
+
+# Reanálisis incremental por instrucciones de primer nivel.
+# Entre dos versiones del programa solo se vuelven a tokenizar y analizar las
+# instrucciones que tocan la zona editada; las demás conservan su subárbol
+# INSTRUCCION, su AST y sus símbolos.
+
+CONTINUACIONES = ('SINO', 'SINOSI')  # Tokens que continúan un condicional después de '}'
+TAM_COMPARACION = 1 << 16            # Caracteres comparados por paso al buscar el prefijo y el sufijo comunes
+
+
+class Instruccion:
+    """Instrucción de primer nivel analizada por separado.
+
+    `tokens` son los pares (tipo, valor) y sirven de clave para reutilizarla;
+    `arbol` es el subárbol INSTRUCCION, `ast` su nodo del AST y `simbolos` la
+    tabla que produce analizada desde una tabla vacía. `nombres` son los
+    nombres que asigna o declara como función: los únicos cuyo resultado
+    puede cambiar si ya hay un global con ese nombre.
+    Si la instrucción tiene errores, `errores` los guarda y lo demás es None.
+    """
+    __slots__ = ('tokens', 'arbol', 'ast', 'simbolos', 'nombres', 'errores')
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.arbol = None
+        self.ast = None
+        self.simbolos = None
+        self.nombres = None
+        self.errores = []
+
+
+def dividir_instrucciones(tipos, siguiente=None):
+    """Índices donde termina cada instrucción de primer nivel en `tipos`.
+
+    Una instrucción termina en '@' fuera de llaves o en la '}' que cierra su
+    bloque, salvo que la siga un elif/else (`siguiente` es el tipo del token
+    que viene después de la lista). Devuelve (cortes, completa); completa es
+    False si sobran tokens al final que no cierran una instrucción.
+    """
+    cortes = []
+    profundidad = 0
+    n = len(tipos)
+    for i, tipo in enumerate(tipos):
+        if tipo == 'LLAVE_ABRIR':
+            profundidad += 1
+        elif tipo == 'LLAVE_CERRAR':
+            profundidad = max(profundidad - 1, 0)
+            if profundidad == 0 and (tipos[i + 1] if i + 1 < n else siguiente) not in CONTINUACIONES:
+                cortes.append(i + 1)
+        elif tipo == 'AT' and profundidad == 0:
+            cortes.append(i + 1)
+    return cortes, (cortes[-1] if cortes else 0) == n
+
+
+def _prefijo_comun(a, b):
+    # Longitud del prefijo común: primero por bloques, luego por bisección dentro del bloque
+    limite = min(len(a), len(b))
+    inicio = 0
+    while inicio < limite and a[inicio:inicio + TAM_COMPARACION] == b[inicio:inicio + TAM_COMPARACION]:
+        inicio += TAM_COMPARACION
+    bajo, alto = inicio, min(inicio + TAM_COMPARACION, limite)
+    while bajo < alto:
+        medio = (bajo + alto + 1) // 2
+        if a[inicio:medio] == b[inicio:medio]:
+            bajo = medio
+        else:
+            alto = medio - 1
+    return min(bajo, limite)
+
+
+def _sufijo_comun(a, b, limite):
+    # Longitud del sufijo común, sin pasar de `limite` caracteres
+    na, nb = len(a), len(b)
+    fin = 0
+    while fin < limite and a[na - min(fin + TAM_COMPARACION, limite):na - fin] == \
+            b[nb - min(fin + TAM_COMPARACION, limite):nb - fin]:
+        fin = min(fin + TAM_COMPARACION, limite)
+    bajo, alto = fin, min(fin + TAM_COMPARACION, limite)
+    while bajo < alto:
+        medio = (bajo + alto + 1) // 2
+        if a[na - medio:na - fin] == b[nb - medio:nb - fin]:
+            bajo = medio
+        else:
+            alto = medio - 1
+    return bajo
+
+
+def _nombres_declarados(tokens):
+    # Identificadores seguidos de '=' o precedidos de 'def'
+    nombres = set()
+    for i in range(len(tokens) - 1):
+        tipo, valor = tokens[i]
+        siguiente, valor_siguiente = tokens[i + 1]
+        if tipo == 'IDENTIFICADOR' and siguiente == 'IGUAL':
+            nombres.add(valor)
+        elif tipo == 'DEF' and siguiente == 'IDENTIFICADOR':
+            nombres.add(valor_siguiente)
+    return frozenset(nombres)
+
+
+class SesionIncremental:
+    """Mantiene un programa analizado y lo actualiza con cada nueva versión.
+
+    Las posiciones de las instrucciones se guardan con un pivote: las que
+    están antes de él son absolutas y las demás son relativas al final del
+    texto (negativas), así que una edición no obliga a desplazar las
+    posiciones de todo lo que viene después; solo se convierten las que hay
+    entre el pivote y la zona editada.
+    """
+
+    def __init__(self, archivo_gramatica="Gramatica.txt"):
+        self.fuente = ""
+        self.instrucciones = []
+        self._inicios = []   # Posición del primer token de cada instrucción
+        self._fines = []     # Posición después de su último token
+        self._pivote = 0
+        self._parser = LLParser(archivo_gramatica, FlujoTokens(ConstructorTokens().a_bytes()))
+
+    def _posicion(self, posiciones, i):
+        valor = posiciones[i]
+        return valor if i < self._pivote else valor + len(self.fuente)
+
+    def _buscar(self, posiciones, posicion, busqueda):
+        corte = busqueda(posiciones, posicion, 0, self._pivote)
+        if corte < self._pivote:
+            return corte
+        return busqueda(posiciones, posicion - len(self.fuente), self._pivote, len(posiciones))
+
+    def _mover_pivote(self, indice):
+        n_texto = len(self.fuente)
+        if indice > self._pivote:
+            for i in range(self._pivote, indice):
+                self._inicios[i] += n_texto
+                self._fines[i] += n_texto
+        else:
+            for i in range(indice, self._pivote):
+                self._inicios[i] -= n_texto
+                self._fines[i] -= n_texto
+        self._pivote = indice
+
+    def actualizar(self, nuevo):
+        """Pasa a la versión `nuevo` del código fuente y devuelve estadísticas del cambio."""
+        viejo = self.fuente
+        n_instrucciones = len(self.instrucciones)
+        prefijo = _prefijo_comun(viejo, nuevo)
+        sufijo = _sufijo_comun(viejo, nuevo, min(len(viejo), len(nuevo)) - prefijo)
+        delta = len(nuevo) - len(viejo)
+
+        # Instrucciones [a, b) que tocan la zona editada de la versión anterior
+        a = self._buscar(self._fines, prefijo, bisect.bisect_left)
+        b = self._buscar(self._inicios, len(viejo) - sufijo, bisect.bisect_right)
+        while True:
+            inicio = self._posicion(self._fines, a - 1) if a > 0 else 0
+            fin = (self._posicion(self._inicios, b) if b < n_instrucciones else len(viejo)) + delta
+            errores_lexicos = []
+            tokens = [(tok.type, valor_texto(tok), inicio + tok.lexpos, tok.longitud)
+                      for tok in tokenize(io.StringIO(nuevo[inicio:fin]), errores=errores_lexicos)]
+            # Una cadena sin cerrar o un comentario que llega al final del tramo
+            # podrían seguir en el texto de después: agrandar el tramo
+            resto = nuevo[tokens[-1][2] + tokens[-1][3] if tokens else inicio:fin]
+            if b < n_instrucciones and (errores_lexicos or '#' in resto.rsplit('\n', 1)[-1]):
+                b += 1
+                continue
+            for linea, caracter in errores_lexicos:
+                print(f"Carácter ilegal: {caracter}")
+            siguiente = self.instrucciones[b].tokens[0][0] if b < n_instrucciones else None
+            # Un elif/else al principio pertenece a la instrucción anterior
+            if a > 0 and (tokens[0][0] if tokens else siguiente) in CONTINUACIONES:
+                a -= 1
+                continue
+            cortes, completa = dividir_instrucciones([token[0] for token in tokens], siguiente)
+            # Una instrucción sin cerrar al final absorbe a la siguiente
+            if not completa and b < n_instrucciones:
+                b += 1
+                continue
+            break
+        if not completa:
+            cortes.append(len(tokens))
+
+        # Analizar las instrucciones nuevas, reutilizando las que no cambiaron
+        reutilizables = {instruccion.tokens: instruccion for instruccion in self.instrucciones[a:b]}
+        nuevas, inicios, fines = [], [], []
+        reutilizadas = 0
+        desde = 0
+        for corte in cortes:
+            grupo = tokens[desde:corte]
+            clave = tuple((tipo, valor) for tipo, valor, _, _ in grupo)
+            instruccion = reutilizables.get(clave)
+            if instruccion is None:
+                instruccion = self._analizar(clave)
+            else:
+                reutilizadas += 1
+            nuevas.append(instruccion)
+            inicios.append(grupo[0][2] - len(nuevo))
+            fines.append(grupo[-1][2] + grupo[-1][3] - len(nuevo))
+            desde = corte
+
+        self._mover_pivote(a)
+        self.instrucciones[a:b] = nuevas
+        self._inicios[a:b] = inicios
+        self._fines[a:b] = fines
+        self.fuente = nuevo
+        return {
+            'instrucciones': len(self.instrucciones),
+            'analizadas': len(nuevas) - reutilizadas,
+            'reutilizadas': len(self.instrucciones) - len(nuevas) + reutilizadas,
+            'tokens_relexeados': len(tokens),
+        }
+
+    def _analizar(self, tokens):
+        constructor = ConstructorTokens()
+        for tipo, valor in tokens:
+            constructor.agregar(tipo, valor)
+        self._parser.set_tokens(FlujoTokens(constructor.a_bytes()))
+        self._parser.parse_input(TRACE_OFF, build_tree=True)
+        instruccion = Instruccion(tokens)
+        instruccion.errores = [mensaje for _, _, mensaje in self._parser.errors]
+        raiz = self._parser.tree
+        if raiz is not None:
+            # PROGRAMA -> INSTRUCCIONES -> INSTRUCCION INSTRUCCIONES
+            try:
+                instruccion.ast = construir_ast(raiz).body[0]
+            except ValueError as error:
+                instruccion.errores.append(str(error))
+                return instruccion
+            instruccion.arbol = raiz.hijos[0].hijos[0]
+            contexto = Tabla_Simbolos.ContextoCompilacion()
+            Tabla_Simbolos.agregarSimbolos(raiz, contexto)
+            instruccion.simbolos = contexto.tabla_simbolos
+            instruccion.nombres = _nombres_declarados(tokens)
+        return instruccion
+
+    def errores(self):
+        """Lista de (línea, mensaje) de las instrucciones con errores."""
+        errores = []
+        for i, instruccion in enumerate(self.instrucciones):
+            if instruccion.errores:
+                linea = self.fuente.count('\n', 0, self._posicion(self._inicios, i)) + 1
+                errores.extend((linea, mensaje) for mensaje in instruccion.errores)
+        return errores
+
+    def ast(self):
+        """AST del programa completo, armado con los nodos de cada instrucción (None si hay errores)."""
+        if any(instruccion.ast is None for instruccion in self.instrucciones):
+            return None
+        return Program([instruccion.ast for instruccion in self.instrucciones])
+
+    def tabla_simbolos(self):
+        """Tabla de símbolos del programa, combinando las tablas de cada instrucción.
+
+        Igual que agregarSimbolos sobre el árbol completo: si la instrucción
+        no asigna ni declara ningún global que ya exista, su tabla analizada
+        por separado es exacta y se copia; si no, se vuelve a analizar su
+        subárbol sobre la tabla combinada. Las constantes dependen de todo el
+        programa, así que se propagan sobre el AST completo al final.
+        """
+        contexto = Tabla_Simbolos.ContextoCompilacion()
+        tabla = contexto.tabla_simbolos
+        globales = tabla.cadena[0][1]
+        for instruccion in self.instrucciones:
+            if instruccion.simbolos is None:
+                continue
+            if instruccion.nombres.isdisjoint(globales):
+                tabla.incorporar(instruccion.simbolos)
+            else:
+                Tabla_Simbolos.agregarSimbolos(instruccion.arbol, contexto)
+        programa = self.ast()
+        if programa is not None:
+            anotar_tabla(tabla, propagar_constantes(programa)[1])
+        return tabla
+
+
+def vigilar(nombre_archivo, intervalo):
+    """Reanaliza `nombre_archivo` cada vez que cambia, hasta que se interrumpe."""
+    sesion = SesionIncremental()
+    modificado = None
+    try:
+        while True:
+            actual = os.stat(nombre_archivo).st_mtime_ns
+            if actual != modificado:
+                modificado = actual
+                with open(nombre_archivo, 'r') as archivo:
+                    fuente = archivo.read()
+                inicio = time.perf_counter()
+                cambios = sesion.actualizar(fuente)
+                segundos = time.perf_counter() - inicio
+                print(f"{cambios['instrucciones']} instrucciones: {cambios['analizadas']} analizadas, "
+                      f"{cambios['reutilizadas']} reutilizadas en {segundos * 1000:.1f} ms")
+                for linea, mensaje in sesion.errores():
+                    print(f"  Error sintáctico en la línea {linea}: {mensaje}")
+            time.sleep(intervalo)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    argumentos = argparse.ArgumentParser(description="Reanálisis incremental al editar el programa")
+    argumentos.add_argument("archivo", nargs="?", default="codigo.txt", help="programa a vigilar")
+    argumentos.add_argument("--intervalo", type=float, default=0.5,
+                            help="segundos entre revisiones del archivo")
+    opciones = argumentos.parse_args()
+    vigilar(opciones.archivo, opciones.intervalo)
@@ -1,132 +1,137 @@
-import re
-from Generar_Arbol import Nodo, cargar_gramatica, cargar_tokens, cargar_no_terminales
-
-def obtener_raiz(gramatica, tokens, no_terminales):
-    contador_nodos = 0
-    dot = None  # No necesitamos el objeto Digraph aquí
-
-    def agregar_nodo(etiqueta, valor=None):
-        nonlocal contador_nodos
-        nodo = Nodo(etiqueta, f'N{contador_nodos}', valor)
-        contador_nodos += 1
-        return nodo
-
-    def parser(no_terminal, tokens, index):
-        if no_terminal not in gramatica:
-            print(f"No se encuentra el no terminal: {no_terminal}")
-            return None, index
-
-        producciones = sorted(gramatica[no_terminal], key=lambda p: evaluar_prioridad(p, tokens, index), reverse=True)
-        for produccion in producciones:
-            hijos = []
-            nuevo_index = index
-            exito = True
-            for simbolo in produccion:
-                if simbolo in gramatica:
-                    nodo_hijo, nuevo_index = parser(simbolo, tokens, nuevo_index)
-                    if nodo_hijo is None:
-                        exito = False
-                        break
-                    hijos.append(nodo_hijo)
-                else:
-                    if simbolo == "''":
-                        continue
-                    if nuevo_index < len(tokens) and re.match(f'{simbolo}:.*', tokens[nuevo_index]):
-                        token_tipo, token_valor = tokens[nuevo_index].split(':')
-                        nodo_hijo = agregar_nodo(token_tipo, token_valor)
-                        hijos.append(nodo_hijo)
-                        nuevo_index += 1
-                    else:
-                        exito = False
-                        break
-
-            if exito:
-                nodo_actual = agregar_nodo(no_terminal)
-                for hijo in hijos:
-                    nodo_actual.agregar_hijo(hijo)
-                return nodo_actual, nuevo_index
-
-        if "''" in [simbolo for produccion in gramatica[no_terminal] for simbolo in produccion]:
-            return agregar_nodo(no_terminal), index
-
-        return None, index
-
-    def evaluar_prioridad(produccion, tokens, index):
-        coincidencias = 0
-        for simbolo in produccion:
-            if index + coincidencias < len(tokens):
-                token = tokens[index + coincidencias]
-                if simbolo in gramatica or re.match(f'{simbolo}:.*', token):
-                    coincidencias += 1
-                else:
-                    break
-            else:
-                break
-        return coincidencias
+import copy
+
+from Arbol_Abstracto import construir_ast
+from Generar_Arbol import cargar_tokens, construir_arbol
+from Plegado_Constantes import anotar_tabla, propagar_constantes
 
-    raiz, _ = parser('PROGRAMA', tokens, 0)
-    return raiz
+def obtener_raiz(nombre_archivo_gramatica, tokens):
+    # El árbol se construye en una sola pasada con la tabla LL(1)
+    return construir_arbol(nombre_archivo_gramatica, tokens)
 
 
 class Simbolo:
-    def __init__(self, nombre, tipo, es_funcion=False, parametros=None, valor=None, ambito="Global"):
+    def __init__(self, nombre, tipo, es_funcion=False, parametros=None, valor=None, ambito="Global",
+                 es_constante=False):
         self.nombre = nombre
         self.tipo = tipo               # Tipo de la variable o función (int, float, etc.)
         self.es_funcion = es_funcion   # Si es una función o no
         self.parametros = parametros   # Lista de parámetros de la función, si es una función
         self.valor = valor             # Valor de la variable (si es una variable)
         self.ambito = ambito
+        self.es_constante = es_constante  # Si su valor se conoce al compilar (valor tiene su tipo real)
     
     def __repr__(self):
         if self.es_funcion:
             return f"Función(nombre={self.nombre}, tipo={self.tipo}, parámetros={self.parametros}, valor={self.valor})"
         else:
-            return f"Variable(nombre={self.nombre}, tipo={self.tipo}, valor={self.valor})"
+            return f"Variable(nombre={self.nombre}, tipo={self.tipo}, valor={self.valor!r}, constante={self.es_constante})"
+
+
+AMBITO_GLOBAL = "Global"
 
 
 class TablaDeSimbolos:
+    """Tabla de símbolos con una cadena de ámbitos.
+
+    Cada nombre tiene una pila con sus declaraciones visibles, la más interna
+    al final, así que buscar un nombre es O(1) y un local oculta a un global
+    sin borrarlo. Cada ámbito abierto recuerda los nombres que declaró para
+    quitarlos de sus pilas al cerrarse. Además, `por_ambito` guarda todos los
+    símbolos declarados en cada ámbito (aunque ya esté cerrado) y `simbolos`
+    todos en orden de declaración.
+    """
+
     def __init__(self):
-        self.tabla = {}  # Usamos un diccionario para almacenar los símbolos con su nombre como clave
-        self.ambitos = []  # Lista de ámbitos para manejo de variables locales
+        self.simbolos = []    # Todos los símbolos en orden de declaración
+        self.por_ambito = {}  # Ámbito -> {nombre: símbolo} declarados en él
+        self.cadena = []      # Ámbitos abiertos, el más interno al final: (ámbito, {nombre: símbolo})
+        self._visibles = {}   # Nombre -> pila de declaraciones visibles, la más interna al final
+        self.declarar_ambito(AMBITO_GLOBAL)
 
-    def agregar_simbolo(self, nombre, tipo, es_funcion=False, parametros=None, valor=None, ambito="Global"):
-        """Agrega un símbolo (variable o función) a la tabla de símbolos, si no está ya presente."""
+    def __len__(self):
+        return len(self.simbolos)
+
+    def __iter__(self):
+        return iter(self.simbolos)
+
+    @property
+    def ambito_actual(self):
+        return self.cadena[-1][0]
+
+    def agregar_simbolo(self, nombre, tipo, es_funcion=False, parametros=None, valor=None):
+        """Declara un símbolo (variable o función) en el ámbito actual y lo devuelve."""
+        ambito, declarados = self.cadena[-1]
         # Verificar si ya existe un símbolo con el mismo nombre en el mismo ámbito
-        if nombre in self.tabla:
-            simbolo_existente = self.tabla[nombre]
-            if simbolo_existente.ambito == ambito:
-                raise ValueError(f"El símbolo '{nombre}' ya está declarado en el ámbito '{ambito}'.")
-        
+        if nombre in declarados:
+            raise ValueError(f"El símbolo '{nombre}' ya está declarado en el ámbito '{ambito}'.")
+
         simbolo = Simbolo(nombre, tipo, es_funcion, parametros, valor, ambito)
-        self.tabla[nombre] = simbolo
+        declarados[nombre] = simbolo
+        self._visibles.setdefault(nombre, []).append(simbolo)
+        self.por_ambito[ambito][nombre] = simbolo
+        self.simbolos.append(simbolo)
+        return simbolo
 
     def buscar_simbolo(self, nombre):
-        """Busca un símbolo por su nombre."""
-        return self.tabla.get(nombre, None)
+        """Busca la declaración visible más interna de un nombre."""
+        visibles = self._visibles.get(nombre)
+        return visibles[-1] if visibles else None
 
-    def declarar_ambito(self):
+    def buscar_en_ambito_actual(self, nombre):
+        """Busca un nombre solo entre los declarados en el ámbito actual."""
+        return self.cadena[-1][1].get(nombre)
+
+    def simbolos_de(self, ambito):
+        """Todos los símbolos declarados en `ambito` (por ejemplo, los locales de una función)."""
+        return list(self.por_ambito.get(ambito, {}).values())
+
+    def declarar_ambito(self, ambito):
         """Comienza un nuevo ámbito (por ejemplo, al entrar en una función o bloque)."""
-        self.ambitos.append(set())  # Un nuevo conjunto de símbolos locales
+        self.cadena.append((ambito, {}))
+        self.por_ambito.setdefault(ambito, {})
 
     def finalizar_ambito(self):
-        """Finaliza el ámbito actual y elimina las variables locales de la tabla."""
-        if self.ambitos:
-            for simbolo in self.ambitos.pop():
-                del self.tabla[simbolo]
-        else:
+        """Finaliza el ámbito actual; sus nombres dejan de ocultar a los de afuera."""
+        if len(self.cadena) == 1:
             raise ValueError("No hay ámbitos abiertos para finalizar.")
+        _, declarados = self.cadena.pop()
+        for nombre in declarados:
+            visibles = self._visibles[nombre]
+            visibles.pop()
+            if not visibles:
+                del self._visibles[nombre]
 
     def agregar_variable_local(self, nombre, tipo, valor=None):
-        """Agrega una variable en el ámbito local actual.""" 
-        if not self.ambitos:
+        """Agrega una variable en el ámbito local actual."""
+        if len(self.cadena) == 1:
             raise ValueError("No hay un ámbito activo para declarar la variable.")
-        
-        if nombre in self.tabla:
-            raise ValueError(f"El símbolo '{nombre}' ya está declarado.")
-        
-        simbolo = Simbolo(nombre, tipo, es_funcion=False, valor=valor)
-        self.tabla[nombre] = simbolo
-        self.ambitos[-1].add(nombre)  # Se agrega el nombre al ámbito actual
+        return self.agregar_simbolo(nombre, tipo, valor=valor)
+
+    def incorporar(self, otra):
+        """Agrega copias de los símbolos de `otra`, analizada por separado desde una tabla vacía.
+
+        Ninguno de sus nombres globales puede estar ya declarado aquí; los
+        locales se agregan al índice por ámbito sin abrir sus ámbitos.
+        """
+        globales = otra.cadena[0][1]
+        for simbolo in otra.simbolos:
+            self.restaurar(copy.copy(simbolo), globales.get(simbolo.nombre) is simbolo)
+
+    def es_global(self, simbolo):
+        """True si `simbolo` es la declaración del ámbito global de su nombre."""
+        return self.cadena[0][1].get(simbolo.nombre) is simbolo
+
+    def restaurar(self, simbolo, es_global):
+        """Agrega un símbolo ya analizado (por ejemplo, leído de la cache) sin volver a declararlo.
+
+        Si `es_global`, queda visible en el ámbito global; si no, solo entra
+        en el índice de su ámbito.
+        """
+        self.simbolos.append(simbolo)
+        self.por_ambito.setdefault(simbolo.ambito, {})[simbolo.nombre] = simbolo
+        if es_global:
+            self.cadena[0][1][simbolo.nombre] = simbolo
+            self._visibles.setdefault(simbolo.nombre, []).insert(0, simbolo)
 
     def verificar_tipo(self, nombre, tipo_esperado):
         """Verifica que el tipo de un símbolo coincida con el tipo esperado."""
@@ -144,204 +149,182 @@ class TablaDeSimbolos:
         print("="*50)
         
         # Recorremos la tabla y mostramos toda la información de cada símbolo
-        for simbolo in self.tabla.values():
+        for simbolo in self.simbolos:
             # Imprimimos los atributos de cada símbolo
             print(f"\n{'Nombre:':<15} {simbolo.nombre}")
             print(f"{'Tipo:':<15} {simbolo.tipo}")
             print(f"{'Es función:':<15} {simbolo.es_funcion}")
             print(f"{'Parámetros:':<15} {simbolo.parametros if simbolo.parametros else 'N/A'}")
             print(f"{'Valor:':<15} {simbolo.valor if simbolo.valor is not None else 'N/A'}")
+            print(f"{'Constante:':<15} {simbolo.es_constante}")
             print(f"{'Ámbito:':<15} {simbolo.ambito}")
             print("-"*50)
 
         print("="*50)
 
-TablaSimbolos = TablaDeSimbolos()
+class ContextoCompilacion:
+    """Estado de la compilación de un programa.
 
-def buscarNodo(nodo, nombre):
-    if nodo is None:
-        return None
-    if nodo.etiqueta == nombre:
-        return nodo
-    for hijo in nodo.hijos:
-        encontrado = buscarNodo(hijo, nombre)
-        if encontrado:
-            return encontrado
-    return None  # Si no se encuentra el valor, retornamos None
-
-def buscarValor(nodo):
-    # Imprimimos la etiqueta del nodo para depuración
-    #print(f"Revisando nodo: {nodo.etiqueta}")
-
-    # Si encontramos un nodo RETORNAR, regresamos el valor
-    if nodo.etiqueta == "RETORNAR":
-        #print(f"Encontrado RETORNAR en el nodo: {nodo.etiqueta}")
-        return obtener_hermanos(nodo)  # Obtener los valores de los hermanos siguientes
-
-    # Si el nodo tiene hijos, buscamos recursivamente en cada uno de ellos
-    for hijo in nodo.hijos:
-        resultado = buscarValor(hijo)
-        if resultado:  # Si encontramos algo, lo regresamos inmediatamente
-            return resultado
-
-    return None  # Si no se encuentra el nodo RETORNAR en este camino, regresamos None
-
-def obtener_hermanos(nodo):
-    hermanos = []
-    
-    if nodo.padre:
-        # Obtener la posición del nodo en los hijos del padre
-        index = nodo.padre.hijos.index(nodo)
-        # Obtener los nodos que siguen al nodo actual (hermanos)
-        hermanos = nodo.padre.hijos[index + 1:]  # Los nodos después del nodo actual
-    
-    # Ahora recorremos todos los descendientes de cada hermano
-    valores_hijos = []
-    for hermano in hermanos:
-        # Obtenemos los valores de los hijos (y sus descendientes)
-        valores_hijos.extend(obtener_descendientes(hermano))
-    
-    # Concatenar los valores de los descendientes de los hermanos, excluyendo "@"
-    hermanos_con_valor = ''.join([str(valor) for valor in valores_hijos if valor is not None and valor != '@'])
-    
-    #print(f"Hermanos y sus descendientes encontrados (sin '@'): {hermanos_con_valor}")  # Para depurar
-    return hermanos_con_valor  # Devolvemos la cadena concatenada de valores
+    Las funciones de análisis reciben el contexto en lugar de compartir una
+    tabla global, así que cada programa tiene sus propios símbolos y varios
+    pueden analizarse a la vez en hilos distintos, uno por contexto.
+    """
 
+    def __init__(self, nombre="<programa>"):
+        self.nombre = nombre
+        self.tabla_simbolos = TablaDeSimbolos()
 
 def obtener_descendientes(nodo):
     """Recorre todos los descendientes de un nodo, es decir, hijos, nietos, etc."""
     valores = []
 
-    if nodo.valor is not None and nodo.valor != '@':  # Excluimos "@" aquí
-        valores.append(nodo.valor)  # Agregar el valor del nodo actual
-    
-    # Recursión para buscar los valores de los hijos del nodo
-    for hijo in nodo.hijos:
-        valores.extend(obtener_descendientes(hijo))  # Recorremos todos los hijos
-    
-    return valores
+    pendientes = [nodo]
+    while pendientes:
+        nodo = pendientes.pop()
+        if nodo.valor is not None and nodo.valor != '@':  # Excluimos "@" aquí
+            valores.append(nodo.valor)  # Agregar el valor del nodo actual
 
+        # Los hijos se apilan invertidos para visitarlos en orden
+        pendientes.extend(reversed(nodo.hijos))
 
-def recorrer_nodos(nodo, parametros, valor, nombre=None, ambito="Global", simbolos_agregados=None):
-    if simbolos_agregados is None:
-        simbolos_agregados = set()  # Conjunto para rastrear símbolos ya agregados
+    return valores
 
-    if nodo.etiqueta != nombre:
-        for hijo in nodo.hijos:
-            recorrer_nodos(hijo, parametros, valor, nombre, ambito, simbolos_agregados)
-    else:
-        if nodo.valor not in simbolos_agregados:
-            TablaSimbolos.agregar_simbolo(nodo.valor, "Function", True, parametros, valor, ambito)
-            simbolos_agregados.add(nodo.valor)  # Marca el parámetro como agregado
 
 def BuscarParametros(nodo):
     parametros = []  # Lista que almacenará los identificadores encontrados
 
     if nodo is None:
         return parametros
-    
-    if nodo.etiqueta == "IDENTIFICADOR":
-        parametros.append(nodo.valor)  # Agregamos el valor del identificador a la lista
-    
-    for hijo in nodo.hijos:
-        parametros.extend(BuscarParametros(hijo))  # Extendemos la lista con los identificadores encontrados en los hijos
 
-    return parametros  # Devolvemos la lista de identificadores encontrados
+    pendientes = [nodo]
+    while pendientes:
+        nodo = pendientes.pop()
+        if nodo.etiqueta == "IDENTIFICADOR":
+            parametros.append(nodo.valor)  # Agregamos el valor del identificador a la lista
 
-def buscar_valores_asignacion(nodo):
-    # Esta función devolverá la concatenación de los valores de los nodos después de un nodo IGUAL.
-    valores = []
-
-    # Verificar si el nodo actual es una asignación
-    if nodo.etiqueta == "ASIGNACION":
-        igual = buscarNodo(nodo, "IGUAL")  # Buscar el nodo IGUAL en la asignación
-        if igual and igual.padre:
-            # Encontramos el padre del nodo IGUAL (que es el nodo ASIGNACION)
-            padre = igual.padre
-            
-            # Encontrar los hermanos del nodo IGUAL, que son los nodos después de IGUAL
-            index_igual = padre.hijos.index(igual)
-            hermanos_despues_igual = padre.hijos[index_igual + 1:]  # Tomamos los nodos después del IGUAL
-
-            # Ahora, buscamos los valores de estos hermanos
-            for hermano in hermanos_despues_igual:
-                # Obtener los descendientes de cada hermano (es decir, valores dentro de cada nodo hermano)
-                valores.extend(obtener_descendientes(hermano))
-    
-    # Concatenamos los valores encontrados en una sola cadena (sin "@")
-    return ''.join([str(valor) for valor in valores if valor is not None and valor != '@'])
+        pendientes.extend(reversed(nodo.hijos))  # Los identificadores de los hijos, en orden
 
+    return parametros  # Devolvemos la lista de identificadores encontrados
 
-def agregarSimbolos(nodo, ambito="Global"):
-    if nodo.etiqueta == "FUNCION":
-        # Procesamos la función
-        valor = buscarValor(nodo)
-        parametros = BuscarParametros(buscarNodo(nodo, "PARAMETROS"))
-        nombre = buscarNodo(nodo, "IDENTIFICADOR")
-        
-        # Agregar la función a la tabla de símbolos
-        if TablaSimbolos.buscar_simbolo(nombre.valor) is None:
-            TablaSimbolos.agregar_simbolo(nombre.valor, "Function", True, parametros, valor, ambito)
-        
-        # Agregar los parámetros solo en el ámbito de la función
-        ambito_funcion = nombre.valor  # Usamos el nombre de la función como ámbito local
-        for parametro in parametros:
-            if TablaSimbolos.buscar_simbolo(parametro) is None:
-                TablaSimbolos.agregar_simbolo(parametro, "Variable", False, None, None, ambito_funcion)
-        
-        # Procesar las instrucciones dentro de la función
-        instrucciones = buscarNodo(nodo, "INSTRUCCIONES")
-        if instrucciones:
-            for hijo in instrucciones.hijos:
-                agregarSimbolos(hijo, ambito_funcion)  # Llamada recursiva dentro del ámbito local
-
-    elif nodo.etiqueta == "ASIGNACION":
-        # Si encontramos una asignación, la agregamos como variable global
-        identificador = buscarNodo(nodo, "IDENTIFICADOR")
-        if identificador:
-            # Usamos la función buscar_valores_asignacion para obtener los valores de la asignación
-            valor = buscar_valores_asignacion(nodo)
-            
-            # Si el identificador no está en la tabla de símbolos, lo agregamos
-            if TablaSimbolos.buscar_simbolo(identificador.valor) is None:
-                TablaSimbolos.agregar_simbolo(identificador.valor, "Variable", False, None, valor, ambito)
+def concatenar_valores(nodos):
+    # Valores de todos los descendientes de `nodos` en orden, sin "@", en una sola cadena
+    valores = []
+    for nodo in nodos:
+        valores.extend(obtener_descendientes(nodo))
+    return ''.join([str(valor) for valor in valores])
+
+
+def agregarSimbolos(nodo, contexto):
+    # Un solo recorrido en preorden con pila explícita. Cada nodo se visita una
+    # vez: el nombre, los parámetros, el valor asignado y el valor de retorno se
+    # leen de los hijos directos, sin volver a buscarlos en todo el subárbol.
+    # Las expresiones no contienen instrucciones, así que no se recorren más
+    # que para sacar su valor.
+    #
+    # Cada función abre su ámbito en la tabla de `contexto` y lo cierra al
+    # terminar su subárbol: sus parámetros y las variables que asigna
+    # sin que haya una visible son locales y ocultan a las de afuera; asignar
+    # una variable visible de un ámbito exterior actualiza esa.
+    #
+    # El valor de una función es el del primer return de su cuerpo (en
+    # preorden, aunque esté en una función anidada); `sin_retorno` guarda las
+    # funciones abiertas que todavía lo esperan. Una asignación a la misma
+    # variable antes de ese return deja el valor asignado.
+    tabla = contexto.tabla_simbolos
+    sin_retorno = set()
+    pendientes = [nodo]
+    while pendientes:
+        nodo = pendientes.pop()
+        if nodo is None:
+            # Fin del cuerpo de una función: la función que se cierra va debajo
+            funcion = pendientes.pop()
+            tabla.finalizar_ambito()
+            sin_retorno.discard(funcion)
+            continue
+
+        etiqueta = nodo.etiqueta
+        hijos = nodo.hijos
+        if etiqueta == "FUNCION":
+            # DEF IDENTIFICADOR ( PARAMETROS ) { INSTRUCCIONES }
+            nombre = hijos[1].valor
+            parametros = BuscarParametros(hijos[3])
+
+            # Agregar la función al ámbito actual; su valor llega con el primer return
+            funcion = None
+            if tabla.buscar_en_ambito_actual(nombre) is None:
+                funcion = tabla.agregar_simbolo(nombre, "Function", True, parametros, None)
+                sin_retorno.add(funcion)
+
+            # Los parámetros y el cuerpo van en el ámbito de la función
+            tabla.declarar_ambito(nombre)
+            for parametro in parametros:
+                if tabla.buscar_en_ambito_actual(parametro) is None:
+                    tabla.agregar_simbolo(parametro, "Variable", False, None, None)
+            pendientes.append(funcion)
+            pendientes.append(None)
+            pendientes.extend(reversed(hijos))
+
+        elif etiqueta == "ASIGNACION":
+            # IDENTIFICADOR IGUAL EXPRESION
+            nombre = hijos[0].valor
+            valor = concatenar_valores(hijos[2:])
+            simbolo = tabla.buscar_simbolo(nombre)
+            if simbolo is None:
+                tabla.agregar_simbolo(nombre, "Variable", False, None, valor)
             else:
-                # Si el identificador ya existe, actualizamos su valor
-                simbolo = TablaSimbolos.buscar_simbolo(identificador.valor)
+                # Si el identificador ya es visible, actualizamos su valor
                 simbolo.valor = valor
+                sin_retorno.discard(simbolo)
 
-    # Recursión sobre los hijos
-    for hijo in nodo.hijos:
-        agregarSimbolos(hijo, ambito)  # Llamada recursiva para cada hijo
+        elif etiqueta == "INSTRUCCION" and hijos[0].etiqueta == "RETORNAR":
+            # RETORNAR EXPRESION AT
+            valor = concatenar_valores(hijos[1:])
+            if valor:
+                for funcion in sin_retorno:
+                    funcion.valor = valor
+                sin_retorno.clear()
+
+        else:
+            pendientes.extend(reversed(hijos))
 
 def imprimirNodos(nodo):
-    for hijo in nodo.hijos:
+    pendientes = list(reversed(nodo.hijos))
+    while pendientes:
+        hijo = pendientes.pop()
         print(hijo.etiqueta, f" valor: {hijo.valor}")
-        imprimirNodos(hijo)
+        pendientes.extend(reversed(hijo.hijos))
 
 def main():
     nombre_archivo_gramatica = 'Gramatica.txt'
-    nombre_archivo_tokens = 'tokens.txt'
-    nombre_archivo_no_terminales = 'no_terminales.txt'
+    nombre_archivo_tokens = 'tokens.bin'
 
-    # Cargar gramática, tokens y no terminales desde los archivos
-    gramatica = cargar_gramatica(nombre_archivo_gramatica)
+    # Cargar los tokens desde el archivo
     tokens = cargar_tokens(nombre_archivo_tokens)
-    no_terminales = cargar_no_terminales(nombre_archivo_no_terminales)
-    
+
     # Obtener el nodo raíz
-    raiz = obtener_raiz(gramatica, tokens, no_terminales)
+    raiz = obtener_raiz(nombre_archivo_gramatica, tokens)
 
     if raiz:
         print("Raíz del árbol sintáctico:", raiz.etiqueta)
     else:
         print("No se pudo generar el árbol sintáctico")
+        return
+
+    # Agregar los símbolos a la tabla de este programa
+    contexto = ContextoCompilacion(nombre_archivo_tokens)
+    agregarSimbolos(raiz, contexto)
 
-    # Agregar los símbolos a la tabla
-    agregarSimbolos(raiz)
+    # Las variables con valor conocido al compilar guardan ese valor, con su tipo;
+    # si el programa no tiene AST la tabla se imprime sin constantes
+    try:
+        _, constantes = propagar_constantes(construir_ast(raiz))
+    except (ValueError, NotImplementedError, RuntimeError) as error:
+        print(f"{nombre_archivo_tokens}: {error}")
+        constantes = {}
+    anotar_tabla(contexto.tabla_simbolos, constantes)
 
     # Imprimir la tabla de símbolos después de agregar todos los símbolos
-    TablaSimbolos.imprimir_tabla()  # Este método ya imprime la tabla de símbolos
+    contexto.tabla_simbolos.imprimir_tabla()  # Este método ya imprime la tabla de símbolos
     imprimirNodos(raiz)
 
 
@@ -1,5 +1,9 @@
+import array
 import csv
+import hashlib
+import marshal
 import os
+import tempfile
 
 # Definir el simbolo EPSILON, que representa una produccion vacia
 epsilon = "''"
@@ -14,95 +18,207 @@ def read_grammar(file_path):
                 rules.append(line)
     return rules
 
-# Recopilar el alfabeto, los no terminales y los terminales de la gramatica
-def collect_alphabet_and_nonterminals(rules):
-    alphabet = set()
-    nonterminals = set()
-    for rule in rules:
-        left, right = rule.split('->')
-        nonterminal = left.strip()
-        nonterminals.add(nonterminal)
-        symbols = right.strip().split()
-        alphabet.update(symbols)
-    terminals = alphabet - nonterminals
-    return list(alphabet), list(nonterminals), list(terminals)
-
-# Calcular los conjuntos FIRST para cada no terminal
-def collect_firsts(rules, nonterminals, terminals):
-    firsts = {nt: set() for nt in nonterminals}
-    not_done = True
-    while not_done:
-        not_done = False
+# Gramatica con los simbolos internados como enteros: los no terminales
+# ocupan los ids 0..n_nonterminals-1 y los terminales los siguientes, en
+# orden de primera aparicion. EPSILON no es un simbolo: su produccion tiene
+# el cuerpo vacio.
+class GramaticaInternada:
+    def __init__(self, rules):
+        self.rules = rules
+        partes = []
+        self.nonterminals = []
+        self.ids = {}
         for rule in rules:
             left, right = rule.split('->')
             nonterminal = left.strip()
             symbols = right.strip().split()
-            if symbols[0] == epsilon:
-                not_done |= epsilon not in firsts[nonterminal]
-                firsts[nonterminal].add(epsilon)
+            partes.append((nonterminal, symbols))
+            if nonterminal not in self.ids:
+                self.ids[nonterminal] = len(self.nonterminals)
+                self.nonterminals.append(nonterminal)
+        self.n_nonterminals = len(self.nonterminals)
+
+        self.terminals = []
+        self.productions = []  # (id del no terminal, tupla de ids del cuerpo)
+        for nonterminal, symbols in partes:
+            body = []
+            for symbol in symbols:
+                if symbol == epsilon:
+                    continue
+                if symbol not in self.ids:
+                    self.ids[symbol] = self.n_nonterminals + len(self.terminals)
+                    self.terminals.append(symbol)
+                body.append(self.ids[symbol])
+            self.productions.append((self.ids[nonterminal], tuple(body)))
+        self.symbols = self.nonterminals + self.terminals
+
+    def bits_to_names(self, bits):
+        names = []
+        while bits:
+            low = bits & -bits
+            names.append(self.symbols[low.bit_length() - 1])
+            bits ^= low
+        return names
+
+# Calcular los no terminales anulables con una lista de trabajo: cada produccion
+# cuenta los simbolos de su cuerpo que aun no se sabe que son anulables
+def collect_nullables(grammar):
+    n = grammar.n_nonterminals
+    nullable = [False] * n
+    pending = []
+    occurrences = [[] for _ in range(n)]
+    worklist = []
+    for p, (head, body) in enumerate(grammar.productions):
+        if any(symbol >= n for symbol in body):
+            pending.append(-1)  # Contiene un terminal: nunca es anulable
+            continue
+        pending.append(len(body))
+        for symbol in body:
+            occurrences[symbol].append(p)
+        if not body and not nullable[head]:
+            nullable[head] = True
+            worklist.append(head)
+    while worklist:
+        symbol = worklist.pop()
+        for p in occurrences[symbol]:
+            pending[p] -= 1
+            head = grammar.productions[p][0]
+            if pending[p] == 0 and not nullable[head]:
+                nullable[head] = True
+                worklist.append(head)
+    return nullable
+
+# Propagar conjuntos (bitsets) por un grafo de dependencias: cuando el conjunto
+# de un no terminal cambia, solo se revisan los que dependen de el
+def _propagate(sets, dependents):
+    worklist = [nt for nt in range(len(sets)) if sets[nt]]
+    while worklist:
+        source = worklist.pop()
+        bits = sets[source]
+        for target in dependents[source]:
+            merged = sets[target] | bits
+            if merged != sets[target]:
+                sets[target] = merged
+                worklist.append(target)
+    return sets
+
+# Calcular los conjuntos FIRST (sin EPSILON) de cada no terminal como bitsets
+def collect_first_bits(grammar, nullable):
+    n = grammar.n_nonterminals
+    firsts = [0] * n
+    dependents = [set() for _ in range(n)]
+    for head, body in grammar.productions:
+        for symbol in body:
+            if symbol >= n:
+                firsts[head] |= 1 << symbol
+                break
+            if symbol != head:
+                dependents[symbol].add(head)
+            if not nullable[symbol]:
+                break
+    return _propagate(firsts, dependents)
+
+# Calcular los conjuntos FOLLOW de cada no terminal como bitsets; el bit de
+# '$' es el siguiente al ultimo terminal
+def collect_follow_bits(grammar, nullable, firsts):
+    n = grammar.n_nonterminals
+    end_bit = 1 << len(grammar.symbols)
+    follows = [0] * n
+    dependents = [set() for _ in range(n)]
+    if grammar.productions:
+        follows[grammar.productions[0][0]] |= end_bit
+    for head, body in grammar.productions:
+        # Recorrer el cuerpo de derecha a izquierda acumulando FIRST del sufijo
+        suffix_first = 0
+        suffix_nullable = True
+        for symbol in reversed(body):
+            if symbol >= n:
+                suffix_first = 1 << symbol
+                suffix_nullable = False
+                continue
+            follows[symbol] |= suffix_first
+            if suffix_nullable and symbol != head:
+                dependents[head].add(symbol)
+            if nullable[symbol]:
+                suffix_first |= firsts[symbol]
             else:
-                for symbol in symbols:
-                    if symbol in terminals or symbol == epsilon:
-                        not_done |= symbol not in firsts[nonterminal]
-                        firsts[nonterminal].add(symbol)
-                        break
-                    else:
-                        old_size = len(firsts[nonterminal])
-                        firsts[nonterminal].update(firsts[symbol] - {epsilon})
-                        not_done |= len(firsts[nonterminal]) > old_size
-                        if epsilon not in firsts[symbol]:
-                            break
+                suffix_first = firsts[symbol]
+                suffix_nullable = False
+    return _propagate(follows, dependents)
+
+# Las funciones que reciben `rules` aceptan tambien la GramaticaInternada de
+# esas reglas, para internarlas una sola vez al calcular toda la tabla
+
+# Recopilar el alfabeto, los no terminales y los terminales de la gramatica
+# (en orden de primera aparicion)
+def collect_alphabet_and_nonterminals(rules, grammar=None):
+    grammar = grammar or GramaticaInternada(rules)
+    alphabet = grammar.symbols + ([epsilon] if any(not body for _, body in grammar.productions) else [])
+    return alphabet, list(grammar.nonterminals), list(grammar.terminals)
+
+# Calcular los conjuntos FIRST para cada no terminal
+def collect_firsts(rules, nonterminals, terminals, grammar=None):
+    grammar = grammar or GramaticaInternada(rules)
+    nullable = collect_nullables(grammar)
+    first_bits = collect_first_bits(grammar, nullable)
+    firsts = {nt: set() for nt in nonterminals}
+    for nt, name in enumerate(grammar.nonterminals):
+        firsts[name].update(grammar.bits_to_names(first_bits[nt]))
+        if nullable[nt]:
+            firsts[name].add(epsilon)
     return firsts
 
 # Calcular los conjuntos FOLLOW para cada no terminal
-def collect_follows(rules, nonterminals, firsts):
+def collect_follows(rules, nonterminals, firsts, grammar=None):
+    grammar = grammar or GramaticaInternada(rules)
+    nullable = [epsilon in firsts[name] for name in grammar.nonterminals]
+    first_bits = [0] * grammar.n_nonterminals
+    for nt, name in enumerate(grammar.nonterminals):
+        for symbol in firsts[name]:
+            if symbol != epsilon:
+                first_bits[nt] |= 1 << grammar.ids[symbol]
+    follow_bits = collect_follow_bits(grammar, nullable, first_bits)
+    end_bit = 1 << len(grammar.symbols)
     follows = {nt: set() for nt in nonterminals}
-    # Agregar el simbolo de fin de cadena ('$') al conjunto FOLLOW del simbolo inicial
-    follows[rules[0].split('->')[0].strip()].add('$')
-    not_done = True
-    while not_done:
-        not_done = False
-        for rule in rules:
-            left, right = rule.split('->')
-            nonterminal = left.strip()
-            symbols = right.strip().split()
-            for i, symbol in enumerate(symbols):
-                if symbol in nonterminals:
-                    follows_set = follows[symbol]
-                    if i + 1 < len(symbols):
-                        next_symbol = symbols[i + 1]
-                        if next_symbol in nonterminals:
-                            follows_set.update(firsts[next_symbol] - {epsilon})
-                        else:
-                            follows_set.add(next_symbol)
-                    # Si es el ultimo simbolo o tiene epsilon en su FIRST, agregar FOLLOW del no terminal
-                    if i + 1 == len(symbols) or epsilon in firsts.get(next_symbol, []):
-                        old_size = len(follows_set)
-                        follows_set.update(follows[nonterminal])
-                        not_done |= len(follows_set) > old_size
+    for nt, name in enumerate(grammar.nonterminals):
+        bits = follow_bits[nt]
+        if bits & end_bit:
+            follows[name].add('$')
+        follows[name].update(grammar.bits_to_names(bits & ~end_bit))
     return follows
 
 # Generar la tabla de analisis sintactico LL(1)
+# Los conflictos se resuelven de forma determinista: una entrada que viene de
+# FIRST del desarrollo tiene prioridad sobre una que viene de FOLLOW (el
+# desarrollo anulable), de modo que el analizador consume tanto como puede,
+# igual que el analizador con retroceso. Entre entradas del mismo tipo gana
+# la ultima regla de la gramatica.
 def make_rule_table(rules, nonterminals, terminals, firsts, follows):
+    terminal_set = set(terminals)
     rule_table = {nt: {t: '' for t in terminals + ['$']} for nt in nonterminals}
+    from_first = set()
     for rule in rules:
         left, right = rule.split('->')
         nonterminal = left.strip()
         symbols = right.strip().split()
-        development_firsts = collect_firsts_for_development(symbols, firsts, terminals)
+        development_firsts = collect_firsts_for_development(symbols, firsts, terminal_set)
         for symbol in development_firsts:
             if symbol != epsilon:
                 rule_table[nonterminal][symbol] = f"{nonterminal} -> {right.strip()}"
+                from_first.add((nonterminal, symbol))
         # Agregar la produccion a los FOLLOW si epsilon esta en FIRST
         if epsilon in development_firsts:
             for follow_symbol in follows[nonterminal]:
-                rule_table[nonterminal][follow_symbol] = f"{nonterminal} -> {right.strip()}"
+                if (nonterminal, follow_symbol) not in from_first:
+                    rule_table[nonterminal][follow_symbol] = f"{nonterminal} -> {right.strip()}"
     return rule_table
 
 # Calcular el conjunto FIRST para una secuencia de simbolos (produccion)
 def collect_firsts_for_development(development, firsts, terminals):
     result = set()
     for symbol in development:
+        if symbol == epsilon:
+            continue
         if symbol in terminals:
             result.add(symbol)
             break
@@ -129,11 +245,134 @@ def write_nonterminals(nonterminals, output_file):
         for nonterminal in nonterminals:
             file.write(nonterminal + '\n')
 
+# Tabla LL(1) compilada: simbolos internados (no terminales, terminales y '$'
+# al final), producciones ya separadas como tuplas de ids y una tabla densa
+# de indices de produccion (-1 = sin regla) indexada por
+# nonterminal * n_columns + columna, donde columna = id del terminal - n_nonterminals.
+# Tambien guarda el FOLLOW de cada no terminal como bitset de columnas, que el
+# analizador usa para recuperarse de errores.
+COMPILED_MAGIC = b'LL1B'
+COMPILED_VERSION = 2
+
+class CompiledLL1Table:
+    def __init__(self, grammar_hash, symbols, n_nonterminals, productions, table, follows):
+        self.grammar_hash = grammar_hash
+        self.symbols = symbols
+        self.n_nonterminals = n_nonterminals
+        self.productions = productions
+        self.table = table
+        self.follows = follows
+        self.n_columns = len(symbols) - n_nonterminals
+
+    @property
+    def nonterminals(self):
+        return self.symbols[:self.n_nonterminals]
+
+    @property
+    def terminals(self):
+        return self.symbols[self.n_nonterminals:-1]
+
+    def production_text(self, index):
+        head, body = self.productions[index]
+        development = " ".join(self.symbols[symbol] for symbol in body) if body else epsilon
+        return f"{self.symbols[head]} -> {development}"
+
+# Calcular el hash del archivo de gramatica
+def grammar_hash(grammar_file):
+    with open(grammar_file, 'rb') as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+# Compilar la tabla LL(1) (ya resuelta) a su forma densa
+def compile_rule_table(rules, rule_table, follows, hash_value, grammar=None):
+    grammar = grammar or GramaticaInternada(rules)
+    symbols = grammar.symbols + ['$']
+    n_nonterminals = grammar.n_nonterminals
+    n_columns = len(symbols) - n_nonterminals
+    production_index = {}
+    for index, rule in enumerate(rules):
+        left, right = rule.split('->')
+        production_index[f"{left.strip()} -> {right.strip()}"] = index
+
+    table = array.array('i', [-1]) * (n_nonterminals * n_columns)
+    ids = dict(grammar.ids, **{'$': len(symbols) - 1})
+    for nonterminal, row in rule_table.items():
+        base = ids[nonterminal] * n_columns
+        for terminal, rule in row.items():
+            if rule:
+                table[base + ids[terminal] - n_nonterminals] = production_index[rule]
+    follow_columns = [0] * n_nonterminals
+    for nonterminal, follow_set in follows.items():
+        for terminal in follow_set:
+            follow_columns[ids[nonterminal]] |= 1 << (ids[terminal] - n_nonterminals)
+    return CompiledLL1Table(hash_value, symbols, n_nonterminals, grammar.productions, table, follow_columns)
+
+# Escribir la tabla compilada en un archivo binario
+def write_compiled_table(compiled, output_file):
+    data = marshal.dumps((
+        COMPILED_VERSION,
+        compiled.grammar_hash,
+        tuple(compiled.symbols),
+        compiled.n_nonterminals,
+        tuple(compiled.productions),
+        compiled.table.tobytes(),
+        tuple(compiled.follows),
+    ))
+    # Se escribe en un temporal y se reemplaza de una vez: otro hilo o proceso
+    # que lea la tabla mientras tanto ve la version anterior completa o la nueva
+    directory = os.path.dirname(os.path.abspath(output_file))
+    with tempfile.NamedTemporaryFile('wb', dir=directory, delete=False) as file:
+        file.write(COMPILED_MAGIC + data)
+    try:
+        os.replace(file.name, output_file)
+    except OSError:
+        os.remove(file.name)
+        raise
+
+# Leer la tabla compilada de un archivo binario (None si no es valida)
+def read_compiled_table(input_file):
+    try:
+        with open(input_file, 'rb') as file:
+            data = file.read()
+        if not data.startswith(COMPILED_MAGIC):
+            return None
+        payload = marshal.loads(data[len(COMPILED_MAGIC):])
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(payload, tuple) or not payload or payload[0] != COMPILED_VERSION:
+        return None
+    _, hash_value, symbols, n_nonterminals, productions, table_bytes, follows = payload
+    table = array.array('i')
+    table.frombytes(table_bytes)
+    return CompiledLL1Table(hash_value, list(symbols), n_nonterminals, list(productions), table, list(follows))
+
+# Calcular la tabla LL(1) completa de una gramatica y compilarla
+def build_compiled_table(grammar_file):
+    rules = read_grammar(grammar_file)
+    grammar = GramaticaInternada(rules)
+    alphabet, nonterminals, terminals = collect_alphabet_and_nonterminals(rules, grammar)
+    firsts = collect_firsts(rules, nonterminals, terminals, grammar)
+    follows = collect_follows(rules, nonterminals, firsts, grammar)
+    rule_table = make_rule_table(rules, nonterminals, terminals, firsts, follows)
+    return compile_rule_table(rules, rule_table, follows, grammar_hash(grammar_file), grammar)
+
+# Cargar la tabla compilada, reconstruyendola si falta o si la gramatica cambio
+def load_compiled_table(grammar_file, compiled_file):
+    compiled = read_compiled_table(compiled_file)
+    if compiled is not None and compiled.grammar_hash == grammar_hash(grammar_file):
+        return compiled
+    compiled = build_compiled_table(grammar_file)
+    try:
+        write_compiled_table(compiled, compiled_file)
+    except OSError:
+        pass  # Sin permiso de escritura: se usa la tabla recien calculada
+    return compiled
+
 # Funcion principal para ejecutar el programa
 def main():
     grammar_file = 'Gramatica.txt'  # Nombre del archivo con la gramática
     output_file = 'll1_table.csv'  # Nombre del archivo de salida CSV
     nonterminals_file = 'no_terminales.txt'  # Nombre del archivo de salida para no terminales
+    compiled_file = 'll1_table.bin'  # Nombre del archivo de salida de la tabla compilada
 
     # Verificar si el archivo de gramatica existe
     if not os.path.exists(grammar_file):
@@ -142,15 +381,20 @@ def main():
 
     # Leer la gramatica y calcular los conjuntos FIRST y FOLLOW
     rules = read_grammar(grammar_file)
-    alphabet, nonterminals, terminals = collect_alphabet_and_nonterminals(rules)
-    firsts = collect_firsts(rules, nonterminals, terminals)
-    follows = collect_follows(rules, nonterminals, firsts)
+    grammar = GramaticaInternada(rules)
+    alphabet, nonterminals, terminals = collect_alphabet_and_nonterminals(rules, grammar)
+    firsts = collect_firsts(rules, nonterminals, terminals, grammar)
+    follows = collect_follows(rules, nonterminals, firsts, grammar)
     # Generar la tabla LL(1) y escribirla en un archivo CSV
     rule_table = make_rule_table(rules, nonterminals, terminals, firsts, follows)
     write_csv(rule_table, output_file)
+    # Escribir la tabla compilada, marcada con el hash de la gramatica
+    write_compiled_table(compile_rule_table(rules, rule_table, follows, grammar_hash(grammar_file), grammar),
+                         compiled_file)
     # Escribir los no terminales en un archivo de texto
     write_nonterminals(nonterminals, nonterminals_file)
     print(f"Tabla LL(1) generada y guardada en {output_file}")
+    print(f"Tabla LL(1) compilada guardada en {compiled_file}")
     print(f"No terminales guardados en {nonterminals_file}")
 
 if __name__ == '__main__':
@@ -1,15 +1,26 @@
+import argparse
 import ast
 
+import Arbol_Abstracto
+from Asignacion_Registros import asignar_registros
+from Flujo_Tokens import FlujoTokens
+from Generar_Arbol import construir_arbol
+from Lexer_Python_ES import construir_flujo
+from Plegado_Constantes import propagar_constantes
+
 class SPIMGenerator(ast.NodeVisitor):
-    def __init__(self):
+    def __init__(self, cache_variables=True):
         self.variables = {}
         self.label_count = 0
         self.data_section = []
         self.text_section = []
         self.string_count = 0  # Contador para cadenas
         self.strings = {}  # Mapa de cadenas a etiquetas
-        self.registers = [f"$t{i}" for i in range(10)]  # $t0 a $t9
-        self.register_pool = self.registers.copy()
+        self.string_data = []  # Líneas .asciiz de las cadenas, en orden de aparición
+        self.register_count = 0  # Registros virtuales %0, %1, ...; los físicos se asignan al final
+        self.cache_variables = cache_variables
+        self.cached = {}    # Variable -> registro virtual con su valor en el bloque básico actual
+        self.dirty = set()  # Variables cuyo valor en registro aún no se escribe en memoria
     
     def new_label(self, base):
         label = f"{base}_{self.label_count}"
@@ -22,20 +33,82 @@ class SPIMGenerator(ast.NodeVisitor):
         return label
 
     def allocate_register(self):
-        if not self.register_pool:
-            raise RuntimeError("No hay registros disponibles.")
-        return self.register_pool.pop(0)
+        # Registro virtual: Asignacion_Registros le da uno físico (o una ranura de pila)
+        reg = f"%{self.register_count}"
+        self.register_count += 1
+        return reg
 
     def free_register(self, reg):
-        if reg in self.registers and reg not in self.register_pool:
-            self.register_pool.insert(0, reg)
+        # La vida de cada registro virtual se calcula sobre el código generado
+        pass
+
+    def variable_label(self, name):
+        var_label = f"var_{name}"  # Prefijo para evitar colisiones
+        if name not in self.variables:
+            self.variables[name] = var_label
+            self.data_section.append(f"{var_label}: .word 0")
+        return var_label
+
+    def variable_location(self, name):
+        # Operando de memoria de la variable: aquí, siempre su palabra global
+        return self.variable_label(name)
+
+    def load_variable(self, name):
+        # Dentro de un bloque básico cada variable se lee de memoria una sola vez
+        reg = self.cached.get(name)
+        if reg is None:
+            reg = self.allocate_register()
+            self.text_section.append(f"    lw {reg}, {self.variable_location(name)}")
+            if self.cache_variables:
+                self.cached[name] = reg
+        return reg
+
+    def store_variable(self, name, reg):
+        location = self.variable_location(name)
+        if self.cache_variables:
+            # El valor queda en el registro y se escribe al terminar el bloque
+            self.cached[name] = reg
+            self.dirty.add(name)
+        else:
+            self.text_section.append(f"    sw {reg}, {location}")
+
+    def write_back(self):
+        for name, reg in self.cached.items():
+            if name in self.dirty:
+                self.text_section.append(f"    sw {reg}, {self.variable_location(name)}")
+        self.dirty.clear()
+
+    def end_block(self):
+        # Los registros virtuales no cruzan etiquetas ni saltos: las variables
+        # modificadas vuelven a memoria y el bloque siguiente las carga de nuevo
+        self.write_back()
+        self.cached.clear()
+
+    def emit_label(self, label):
+        self.end_block()
+        self.text_section.append(f"{label}:")
+
+    def emit_jump(self, instruction):
+        self.end_block()
+        self.text_section.append(f"    {instruction}")
+
+    def emit_syscall(self):
+        # Las variables están al día en memoria en cada syscall
+        self.write_back()
+        self.text_section.append("    syscall")
+
+    def assign_main_registers(self, lines):
+        # El programa principal no vuelve a nadie: solo reserva las ranuras de los derramados
+        allocation = asignar_registros(lines)
+        frame = [f"    addi $sp, $sp, -{4 * allocation.ranuras}"] if allocation.ranuras else []
+        return frame + allocation.lineas
 
     def generate(self, code):
         tree = ast.parse(code)
         self.visit(tree)
         # Combine data and text sections
-        data = "\n".join(self.data_section + list(self.strings.values()))
-        text = "\n".join(self.text_section)
+        data = "\n".join(self.data_section + self.string_data)
+        text = "\n".join(self.assign_main_registers(self.text_section))
         full_code = f".data\n{data}\n\n.text\n.globl main\nmain:\n{text}\n    li $v0, 10\n    syscall"
         return full_code
 
@@ -46,14 +119,10 @@ class SPIMGenerator(ast.NodeVisitor):
     def visit_Assign(self, node):
         # Asumimos una sola variable por asignación
         var_name = node.targets[0].id
-        var_label = f"var_{var_name}"  # Prefijo para evitar colisiones
-        if var_name not in self.variables:
-            self.variables[var_name] = var_label
-            self.data_section.append(f"{var_label}: .word 0")
         # Evaluar la expresión y obtener el registro que contiene el resultado
         result_reg = self.visit(node.value)
         # Almacenar el resultado en la variable
-        self.text_section.append(f"    sw {result_reg}, {var_label}")
+        self.store_variable(var_name, result_reg)
         # Liberar el registro temporal
         self.free_register(result_reg)
 
@@ -90,13 +159,7 @@ class SPIMGenerator(ast.NodeVisitor):
         return reg
 
     def visit_Name(self, node):
-        var_label = f"var_{node.id}"  # Prefijo para evitar colisiones
-        if node.id not in self.variables:
-            self.variables[node.id] = var_label
-            self.data_section.append(f"{var_label}: .word 0")
-        reg = self.allocate_register()
-        self.text_section.append(f"    lw {reg}, {var_label}")
-        return reg
+        return self.load_variable(node.id)
 
     def visit_If(self, node):
         # Generar etiquetas únicas para este bloque if-else
@@ -109,6 +172,7 @@ class SPIMGenerator(ast.NodeVisitor):
             left_reg = self.visit(node.test.left)
             right_reg = self.visit(node.test.comparators[0])
             op = node.test.ops[0]
+            self.end_block()
             # Generar la comparación y salto condicional
             if isinstance(op, ast.Eq):
                 self.text_section.append(f"    beq {left_reg}, {right_reg}, {label_if_true}")
@@ -126,16 +190,16 @@ class SPIMGenerator(ast.NodeVisitor):
                 raise NotImplementedError(f"Operador de comparación {type(op)} no soportado")
             self.text_section.append(f"    j {label_if_false}")
             # Bloque if
-            self.text_section.append(f"{label_if_true}:")
+            self.emit_label(label_if_true)
             for stmt in node.body:
                 self.visit(stmt)
-            self.text_section.append(f"    j {label_if_end}")
+            self.emit_jump(f"j {label_if_end}")
             # Bloque else
-            self.text_section.append(f"{label_if_false}:")
+            self.emit_label(label_if_false)
             for stmt in node.orelse:
                 self.visit(stmt)
             # Fin del if
-            self.text_section.append(f"{label_if_end}:")
+            self.emit_label(label_if_end)
             # Liberar los registros de la condición
             self.free_register(left_reg)
             self.free_register(right_reg)
@@ -152,32 +216,32 @@ class SPIMGenerator(ast.NodeVisitor):
                 label = self.get_string_label(arg.s)
                 self.text_section.append(f"    la $a0, {label}")
                 self.text_section.append("    li $v0, 4")
-                self.text_section.append("    syscall")
+                self.emit_syscall()
                 # Imprimir nueva línea
                 self.text_section.append("    li $a0, 10")
                 self.text_section.append("    li $v0, 11")
-                self.text_section.append("    syscall")
+                self.emit_syscall()
             elif isinstance(arg, ast.Num):
                 # Imprimir entero
                 reg = self.visit(arg)
                 self.text_section.append(f"    move $a0, {reg}")
                 self.text_section.append("    li $v0, 1")
-                self.text_section.append("    syscall")
+                self.emit_syscall()
                 # Imprimir nueva línea
                 self.text_section.append("    li $a0, 10")
                 self.text_section.append("    li $v0, 11")
-                self.text_section.append("    syscall")
+                self.emit_syscall()
                 self.free_register(reg)
             elif isinstance(arg, ast.Name):
                 # Imprimir variable
                 reg = self.visit(arg)
                 self.text_section.append(f"    move $a0, {reg}")
                 self.text_section.append("    li $v0, 1")
-                self.text_section.append("    syscall")
+                self.emit_syscall()
                 # Imprimir nueva línea
                 self.text_section.append("    li $a0, 10")
                 self.text_section.append("    li $v0, 11")
-                self.text_section.append("    syscall")
+                self.emit_syscall()
                 self.free_register(reg)
             else:
                 raise NotImplementedError("Tipo de argumento en print no soportado")
@@ -188,11 +252,394 @@ class SPIMGenerator(ast.NodeVisitor):
         if s in self.strings:
             return self.strings[s]
         label = self.new_string_label()
-        self.strings[s] = f"{label}: .asciiz \"{s}\""
+        self.strings[s] = label
+        # Escapes que entiende SPIM dentro de .asciiz
+        escaped = s.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        self.string_data.append(f"{label}: .asciiz \"{escaped}\"")
         return label
 
+def _assigned_names(body):
+    # Nombres asignados en `body` y sus bloques, sin entrar en funciones anidadas
+    names = []
+    pending = list(reversed(body))
+    while pending:
+        stmt = pending.pop()
+        if isinstance(stmt, Arbol_Abstracto.Assign):
+            if stmt.name not in names:
+                names.append(stmt.name)
+        elif isinstance(stmt, Arbol_Abstracto.If):
+            pending.extend(reversed(stmt.body + stmt.orelse))
+        elif isinstance(stmt, Arbol_Abstracto.While):
+            pending.extend(reversed(stmt.body))
+    return names
+
+
+def function_locals(program):
+    """Función -> sus locales (parámetros primero), con la regla de Tabla_Simbolos.
+
+    Son locales los parámetros y los nombres que la función asigna sin que
+    haya uno visible (asignado antes en el texto fuera de ella) al definirla.
+    Se calcula sobre el programa sin plegar: quitar una rama muerta no debe
+    cambiar a qué variable se refiere un nombre.
+    """
+    result = {}
+    declared = set()  # Globales asignados hasta este punto del texto
+    pending = [(stmt, ()) for stmt in reversed(program.body)]
+    while pending:
+        stmt, chain = pending.pop()
+        if isinstance(stmt, Arbol_Abstracto.Assign):
+            if not chain:
+                declared.add(stmt.name)
+        elif isinstance(stmt, Arbol_Abstracto.If):
+            pending.extend((inner, chain) for inner in reversed(stmt.body + stmt.orelse))
+        elif isinstance(stmt, Arbol_Abstracto.While):
+            pending.extend((inner, chain) for inner in reversed(stmt.body))
+        elif isinstance(stmt, Arbol_Abstracto.FunctionDef):
+            visible = declared.union(*chain)
+            names = result.setdefault(stmt.name, [])
+            for name in list(stmt.params) + _assigned_names(stmt.body):
+                if name not in names and (name in stmt.params or name not in visible):
+                    names.append(name)
+            inner_chain = chain + (set(names),)
+            pending.extend((inner, inner_chain) for inner in reversed(stmt.body))
+    return result
+
+
+def _free_names(function):
+    # Nombres que `function` (o una función anidada en ella) usa y no son sus parámetros
+    names = set()
+    pending = list(function.body)
+    while pending:
+        node = pending.pop()
+        if isinstance(node, Arbol_Abstracto.FunctionDef):
+            names |= _free_names(node)
+        elif isinstance(node, Arbol_Abstracto.Name):
+            names.add(node.id)
+        elif isinstance(node, Arbol_Abstracto.Assign):
+            names.add(node.name)
+            pending.append(node.value)
+        elif isinstance(node, Arbol_Abstracto.Call):
+            pending.extend(node.args)
+        elif isinstance(node, (Arbol_Abstracto.BinOp, Arbol_Abstracto.Compare, Arbol_Abstracto.BoolOp)):
+            pending.extend((node.left, node.right))
+        elif isinstance(node, Arbol_Abstracto.If):
+            pending.append(node.test)
+            pending.extend(node.body + node.orelse)
+        elif isinstance(node, Arbol_Abstracto.While):
+            pending.append(node.test)
+            pending.extend(node.body)
+        elif isinstance(node, Arbol_Abstracto.Return):
+            pending.append(node.value)
+    return names - set(function.params)
+
+
+def _nested_functions(body):
+    # Funciones definidas directamente en `body` o en sus bloques
+    pending = list(body)
+    while pending:
+        stmt = pending.pop()
+        if isinstance(stmt, Arbol_Abstracto.FunctionDef):
+            yield stmt
+        elif isinstance(stmt, Arbol_Abstracto.If):
+            pending.extend(stmt.body + stmt.orelse)
+        elif isinstance(stmt, Arbol_Abstracto.While):
+            pending.extend(stmt.body)
+
+
+class ASTSPIMGenerator(SPIMGenerator):
+    """Genera SPIM a partir del AST de Arbol_Abstracto (el lenguaje del compilador).
+
+    Los nombres siguen los ámbitos de Tabla_Simbolos: los parámetros y las
+    variables que una función asigna sin que haya una visible afuera son
+    locales y viven en su marco, así que cada llamada (también las
+    recursivas) tiene las suyas, que empiezan en 0; las demás son palabras
+    globales `var_<nombre>`. Los locales que usa una función anidada no
+    pueden estar en el marco y quedan en `loc_<función>_<nombre>`.
+
+    Con `cache_variables`, dentro de cada bloque básico las variables se leen
+    una vez y se quedan en registros; las modificadas se escriben al final
+    del bloque, antes de cada syscall y, las globales, antes de cada llamada.
+    Las funciones reciben hasta cuatro argumentos en $a0-$a3 y devuelven en
+    $v0. Los valores que siguen vivos después de una llamada quedan en
+    registros $s, que cada función guarda en su marco si los usa, junto con
+    sus locales, $ra y las ranuras de los registros derramados. Con
+    `fold_constants`, el programa pasa antes por Plegado_Constantes: los
+    valores conocidos al compilar se emiten como inmediatos en lugar de
+    cargarse y operarse.
+    """
+    ARITHMETIC = {'+': 'add', '-': 'sub', '*': 'mul'}
+    COMPARISONS = {'==': 'seq', '!=': 'sne', '<': 'slt', '<=': 'sle', '>': 'sgt', '>=': 'sge'}
+    # Salto cuando la comparación es falsa
+    INVERSE_BRANCHES = {'==': 'bne', '!=': 'beq', '<': 'bge', '<=': 'bgt', '>': 'ble', '>=': 'blt'}
+
+    def __init__(self, fold_constants=True, cache_variables=True):
+        super().__init__(cache_variables)
+        self.fold_constants = fold_constants
+        self.function_section = []
+        self.loop_ends = []      # Etiqueta de salida de cada ciclo abierto (para break)
+        self.function_ends = []  # Etiqueta del epílogo de cada función abierta (para return)
+        self.scopes = []         # Locales de cada función abierta: nombre -> ubicación
+        self.locals_by_function = {}
+
+    def generate_ast(self, program, locals_by_function=None):
+        # Los ámbitos salen del programa sin plegar; quien lo plegó antes los pasa aparte
+        if locals_by_function is None:
+            locals_by_function = function_locals(program)
+        self.locals_by_function = locals_by_function
+        if self.fold_constants:
+            program, _ = propagar_constantes(program)
+        self.visit(program)
+        data = "\n".join(self.data_section + self.string_data)
+        text = "\n".join(self.assign_main_registers(self.text_section))
+        functions = "\n".join(self.function_section)
+        return f".data\n{data}\n\n.text\n.globl main\nmain:\n{text}\n    li $v0, 10\n    syscall\n{functions}"
+
+    def visit_Program(self, node):
+        for stmt in node.body:
+            self.visit(stmt)
+
+    def variable_location(self, name):
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        return self.variable_label(name)
+
+    def static_label(self, function, name):
+        # Local que usa una función anidada: una palabra propia de la función
+        label = f"loc_{function}_{name}"
+        if (function, name) not in self.variables:
+            self.variables[(function, name)] = label
+            self.data_section.append(f"{label}: .word 0")
+        return label
+
+    @staticmethod
+    def in_frame(location):
+        return location.endswith("($sp)")
+
+    def visit_Assign(self, node):
+        result_reg = self.visit(node.value)
+        self.store_variable(node.name, result_reg)
+        self.free_register(result_reg)
+
+    def visit_Literal(self, node):
+        reg = self.allocate_register()
+        if isinstance(node.value, str):
+            self.text_section.append(f"    la {reg}, {self.get_string_label(node.value)}")
+        elif isinstance(node.value, float):
+            raise NotImplementedError("Solo se soportan valores enteros, booleanos y cadenas")
+        else:
+            self.text_section.append(f"    li {reg}, {int(node.value)}")
+        return reg
+
+    def visit_BinOp(self, node):
+        left_reg = self.visit(node.left)
+        right_reg = self.visit(node.right)
+        result_reg = self.allocate_register()
+        if node.op == '/':
+            self.text_section.append(f"    div {left_reg}, {right_reg}")
+            self.text_section.append(f"    mflo {result_reg}")
+        else:
+            self.text_section.append(f"    {self.ARITHMETIC[node.op]} {result_reg}, {left_reg}, {right_reg}")
+        self.free_register(left_reg)
+        self.free_register(right_reg)
+        return result_reg
+
+    def visit_Compare(self, node):
+        # Comparación como valor: 1 si se cumple, 0 si no
+        left_reg = self.visit(node.left)
+        right_reg = self.visit(node.right)
+        result_reg = self.allocate_register()
+        self.text_section.append(f"    {self.COMPARISONS[node.op]} {result_reg}, {left_reg}, {right_reg}")
+        self.free_register(left_reg)
+        self.free_register(right_reg)
+        return result_reg
+
+    def visit_BoolOp(self, node):
+        # Los operandos se normalizan a 0/1; 'not' une las condiciones como "y no".
+        # Se escribe en registros nuevos: los operandos pueden ser variables en registro
+        left_reg = self.visit(node.left)
+        right_reg = self.visit(node.right)
+        left_bool = self.allocate_register()
+        right_bool = self.allocate_register()
+        result_reg = self.allocate_register()
+        self.text_section.append(f"    sne {left_bool}, {left_reg}, $zero")
+        self.text_section.append(f"    {'seq' if node.op == 'not' else 'sne'} {right_bool}, {right_reg}, $zero")
+        self.text_section.append(f"    {'or' if node.op == 'or' else 'and'} {result_reg}, {left_bool}, {right_bool}")
+        self.free_register(left_reg)
+        self.free_register(right_reg)
+        return result_reg
+
+    def branch_if_false(self, test, label):
+        if isinstance(test, Arbol_Abstracto.Compare):
+            left_reg = self.visit(test.left)
+            right_reg = self.visit(test.right)
+            self.emit_jump(f"{self.INVERSE_BRANCHES[test.op]} {left_reg}, {right_reg}, {label}")
+            self.free_register(left_reg)
+            self.free_register(right_reg)
+        else:
+            reg = self.visit(test)
+            self.emit_jump(f"beqz {reg}, {label}")
+            self.free_register(reg)
+
+    def visit_If(self, node):
+        label_if_false = self.new_label("if_false")
+        label_if_end = self.new_label("if_end")
+        self.branch_if_false(node.test, label_if_false)
+        for stmt in node.body:
+            self.visit(stmt)
+        self.emit_jump(f"j {label_if_end}")
+        self.emit_label(label_if_false)
+        for stmt in node.orelse:
+            self.visit(stmt)
+        self.emit_label(label_if_end)
+
+    def visit_While(self, node):
+        label_start = self.new_label("while_start")
+        label_end = self.new_label("while_end")
+        self.emit_label(label_start)
+        self.branch_if_false(node.test, label_end)
+        self.loop_ends.append(label_end)
+        for stmt in node.body:
+            self.visit(stmt)
+        self.loop_ends.pop()
+        self.emit_jump(f"j {label_start}")
+        self.emit_label(label_end)
+
+    def visit_Break(self, node):
+        if not self.loop_ends:
+            raise ValueError("break fuera de un ciclo")
+        self.emit_jump(f"j {self.loop_ends[-1]}")
+
+    def visit_FunctionDef(self, node):
+        if len(node.params) > 4:
+            raise NotImplementedError("Solo se soportan funciones de hasta cuatro parámetros")
+        local_names = list(node.params) + [name for name in self.locals_by_function.get(node.name, ())
+                                           if name not in node.params]
+        # Los locales van desde 0($sp); los que usa una función anidada, en su propia palabra
+        escaping = set()
+        for nested in _nested_functions(node.body):
+            escaping |= _free_names(nested)
+        scope = {}
+        local_words = 0
+        for name in local_names:
+            if name in escaping:
+                scope[name] = self.static_label(node.name, name)
+            else:
+                scope[name] = f"{4 * local_words}($sp)"
+                local_words += 1
+
+        # El cuerpo se genera aparte y se coloca después del programa principal
+        main_state = self.text_section, self.loop_ends, self.cached, self.dirty
+        self.text_section, self.loop_ends, self.cached, self.dirty = [], [], {}, set()
+        self.scopes.append(scope)
+        label_end = f"func_{node.name}_end"
+        self.function_ends.append(label_end)
+        for i, param in enumerate(node.params):
+            reg = self.allocate_register()
+            self.text_section.append(f"    move {reg}, $a{i}")
+            self.store_variable(param, reg)
+        for name in local_names[len(node.params):]:
+            self.text_section.append(f"    sw $zero, {scope[name]}")
+        for stmt in node.body:
+            self.visit(stmt)
+        self.end_block()
+        self.function_ends.pop()
+        self.scopes.pop()
+        # Marco: locales, ranuras de los derramados, los $s que usa el cuerpo y $ra arriba
+        allocation = asignar_registros(self.text_section, base=4 * local_words)
+        saved = [(reg, 4 * (local_words + allocation.ranuras + i)) for i, reg in enumerate(allocation.guardados)]
+        frame = 4 * (local_words + allocation.ranuras + len(saved) + 1)
+        self.function_section.append(f"func_{node.name}:")
+        self.function_section.append(f"    addi $sp, $sp, -{frame}")
+        self.function_section.append(f"    sw $ra, {frame - 4}($sp)")
+        self.function_section.extend(f"    sw {reg}, {offset}($sp)" for reg, offset in saved)
+        self.function_section.extend(allocation.lineas)
+        self.function_section.append(f"{label_end}:")
+        self.function_section.extend(f"    lw {reg}, {offset}($sp)" for reg, offset in saved)
+        self.function_section.append(f"    lw $ra, {frame - 4}($sp)")
+        self.function_section.append(f"    addi $sp, $sp, {frame}")
+        self.function_section.append("    jr $ra")
+        self.text_section, self.loop_ends, self.cached, self.dirty = main_state
+
+    def visit_Return(self, node):
+        if not self.function_ends:
+            raise ValueError("return fuera de una función")
+        reg = self.visit(node.value)
+        self.text_section.append(f"    move $v0, {reg}")
+        self.free_register(reg)
+        self.emit_jump(f"j {self.function_ends[-1]}")
+
+    def visit_Call(self, node):
+        if node.func == 'print':
+            self.print_arguments(node.args)
+            return None
+        if len(node.args) > 4:
+            raise NotImplementedError("Solo se soportan llamadas de hasta cuatro argumentos")
+        arg_regs = [self.visit(arg) for arg in node.args]
+        for i, reg in enumerate(arg_regs):
+            self.text_section.append(f"    move $a{i}, {reg}")
+            self.free_register(reg)
+        # La función llamada lee y escribe las variables globales en memoria:
+        # antes se escriben las modificadas y después se vuelven a cargar. Los
+        # locales del marco no los ve nadie más y siguen en sus registros; lo
+        # que sigue vivo después de la llamada lo pone el asignador en $s
+        for name, reg in self.cached.items():
+            location = self.variable_location(name)
+            if name in self.dirty and not self.in_frame(location):
+                self.text_section.append(f"    sw {reg}, {location}")
+                self.dirty.discard(name)
+        self.text_section.append(f"    jal func_{node.func}")
+        self.cached = {name: reg for name, reg in self.cached.items()
+                       if self.in_frame(self.variable_location(name))}
+        result_reg = self.allocate_register()
+        self.text_section.append(f"    move {result_reg}, $v0")
+        return result_reg
+
+    def print_arguments(self, args):
+        # Argumentos separados por espacios y un salto de línea al final, como print
+        for i, arg in enumerate(args):
+            if i:
+                self.text_section.append("    li $a0, 32")
+                self.text_section.append("    li $v0, 11")
+                self.emit_syscall()
+            if isinstance(arg, Arbol_Abstracto.Literal) and isinstance(arg.value, str):
+                self.text_section.append(f"    la $a0, {self.get_string_label(arg.value)}")
+                self.text_section.append("    li $v0, 4")
+            else:
+                reg = self.visit(arg)
+                self.text_section.append(f"    move $a0, {reg}")
+                self.text_section.append("    li $v0, 1")
+                self.free_register(reg)
+            self.emit_syscall()
+        self.text_section.append("    li $a0, 10")
+        self.text_section.append("    li $v0, 11")
+        self.emit_syscall()
+
 # Ejemplo de uso con if-else anidados
 if __name__ == "__main__":
+    arguments = argparse.ArgumentParser(description="Generador de código SPIM")
+    arguments.add_argument("fuente", nargs="?",
+                           help="programa del compilador a traducir (por defecto, un ejemplo en Python)")
+    arguments.add_argument("--sin-plegado", action="store_true",
+                           help="no pliega ni propaga constantes antes de generar")
+    arguments.add_argument("--sin-variables-en-registros", action="store_true",
+                           help="lee y escribe cada variable en memoria en cada acceso")
+    options = arguments.parse_args()
+    if options.fuente:
+        tokens = FlujoTokens(construir_flujo(options.fuente).a_bytes())
+        raiz = construir_arbol("Gramatica.txt", tokens)
+        if raiz is None:
+            raise SystemExit("No se pudo generar el árbol sintáctico")
+        try:
+            program = Arbol_Abstracto.construir_ast(raiz)
+        except Arbol_Abstracto.ErrorSemantico as error:
+            raise SystemExit(f"{options.fuente}: {error}")
+        generator = ASTSPIMGenerator(not options.sin_plegado, not options.sin_variables_en_registros)
+        spim_code = generator.generate_ast(program)
+        with open("output.asm", "w") as f:
+            f.write(spim_code)
+        print("Código SPIM generado en 'output.asm'")
+        raise SystemExit
     python_code = """
 a = 20 + 2
 b = 30
@@ -0,0 +1,32 @@
+import io
+
+import pytest
+
+from Lexer_Python_ES import tokenize
+
+PROGRAMA = (
+    'x = "aa\nbbbbbbbbbbbb"\n'
+    'y = 1\n'
+    "# no es 'una cadena\n"
+    "z = 'c\\'d\n' + \"e\\\"f\"\n"
+    'imprimir(x, y, z)@\n'
+)
+
+
+def tokens(texto, **opciones):
+    errores = []
+    lista = [(tok.type, tok.value, tok.lineno, tok.lexpos, tok.longitud)
+             for tok in tokenize(io.StringIO(texto), errores=errores, **opciones)]
+    return lista, errores
+
+
+@pytest.mark.parametrize("tam_bloque", [1, 2, 3, 7, 10, 64])
+def test_tokens_no_dependen_del_tamano_de_bloque(tam_bloque):
+    assert tokens(PROGRAMA, tam_bloque=tam_bloque) == tokens(PROGRAMA)
+
+
+def test_cadena_con_salto_de_linea_entre_bloques():
+    lista, errores = tokens('x = "aa\nbbbbbbbbbbbb"\ny = 1\n', tam_bloque=10)
+    assert errores == []
+    assert [(tipo, valor) for tipo, valor, *_ in lista][:3] == [
+        ('IDENTIFICADOR', 'x'), ('IGUAL', '='), ('CADENA', 'aa\nbbbbbbbbbbbb')]